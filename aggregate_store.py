@@ -0,0 +1,89 @@
+"""
+Persisted, incrementally updated aggregates of the dataset.
+
+Instead of recomputing every yearly mean, category mean, share table and country average from all of history,
+we keep the mergeable partial aggregates of streaming.py on disk and only fold in the rows of new files.
+An update therefore costs as much as reading the new file, however long the history is.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dataset import atomic_write, file_sha256
+from streaming import DEFAULT_CHUNK_SIZE, StreamingAggregates, aggregate_csv
+
+STORE_VERSION = 1
+
+
+class AggregateStore:
+    """
+    Aggregate store kept in a JSON file.
+
+    Every appended file is recorded with its SHA-256, so feeding the same file twice does not count its rows twice.
+
+    Parameters:
+        path (str or Path): Location of the store file. It is created on the first append.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.aggregates = None
+        self.sources = []
+        if self.path.exists():
+            self._load()
+
+    def _load(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get("version") != STORE_VERSION:
+            raise ValueError(
+                f"{self.path} was written by an incompatible version of the aggregate store, delete it to rebuild"
+            )
+        self.aggregates = StreamingAggregates.from_dict(data["aggregates"])
+        self.sources = data["sources"]
+
+    def save(self):
+        data = {
+            "version": STORE_VERSION,
+            "sources": self.sources,
+            "aggregates": self.aggregates.to_dict(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.path) as f:
+            json.dump(data, f)
+
+    def contains(self, sha256):
+        return any(source["sha256"] == sha256 for source in self.sources)
+
+    def append_csv(self, filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Fold the rows of a CSV into the store and save it.
+
+        Parameters:
+            filepath (str or Path): CSV with new rows (same columns as the dataset).
+            chunk_size (int): Rows read per chunk, the file never has to fit in memory.
+
+        Returns:
+            bool: False if this exact file had already been appended (nothing changes), True otherwise.
+        """
+        sha256 = file_sha256(filepath)
+        if self.contains(sha256):
+            return False
+
+        new_rows = aggregate_csv(filepath, chunk_size=chunk_size)
+        if self.aggregates is None:
+            self.aggregates = new_rows
+        else:
+            self.aggregates.merge(new_rows)
+
+        self.sources.append(
+            {
+                "file": str(filepath),
+                "sha256": sha256,
+                "rows": new_rows.rows,
+                "appended_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+        )
+        self.save()
+        return True
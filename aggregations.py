@@ -0,0 +1,162 @@
+"""
+Memoized aggregations behind the interactive charts of the app.
+
+Every function takes its filters (countries, year range, category, ...) as plain arguments, normalizes them into a
+hashable key and keeps the result in a bounded LRU cache. A repeated request with the same filters is a dictionary
+lookup, and the least recently used results are dropped once a cache is full.
+
+Results are shared between all callers, so treat the returned Series/DataFrames as read-only.
+"""
+
+import warnings
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dataset import TOTAL_COLUMN, LazyDataset
+from windows import YearWindows
+
+DATA_PATH = Path(__file__).with_name("processed_microplastics.csv")
+
+# entries per aggregation, a few hundred filter combinations are only a few MB
+CACHE_SIZE = 256
+
+# shared by every session of the app process, the dataset and its cube are loaded once
+dataset = LazyDataset(DATA_PATH)
+
+
+def normalize_filters(countries, years):
+    """Hashable cache key of a country selection and year range."""
+    # the same selection in a different order (or a list instead of a tuple) must hit the same cache entry
+    countries = None if not countries else tuple(sorted(countries))
+    years = None if years is None else (int(years[0]), int(years[1]))
+    return countries, years
+
+
+def _select(countries, years):
+    # cube values (countries, years, categories) restricted to the filters, plus the matching year labels
+    cube = dataset.cube
+    values, total = cube.values, cube.total
+    year_labels = cube.years
+
+    if countries is not None:
+        positions = cube.countries.get_indexer(list(countries))
+        if (positions < 0).any():
+            unknown = [c for c, p in zip(countries, positions) if p < 0]
+            raise ValueError(f"Unknown countries: {unknown}")
+        values, total = values[positions], total[positions]
+
+    if years is not None:
+        in_range = (year_labels >= years[0]) & (year_labels <= years[1])
+        values, total = values[:, in_range], total[:, in_range]
+        year_labels = year_labels[in_range]
+
+    return values, total, year_labels
+
+
+def yearly_average(category=TOTAL_COLUMN, countries=None, years=None):
+    """
+    Average of one category (or total_ug_per_kg) over the selected countries, per year.
+
+    Parameters:
+        category (str): Food category or "total_ug_per_kg".
+        countries (iterable): Countries to average over, None or empty for all of them.
+        years (tuple): Inclusive (first, last) year, None for all years.
+
+    Returns:
+        pd.Series: Average µg/kg per year.
+    """
+    return _yearly_average(category, *normalize_filters(countries, years))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _yearly_average(category, countries, years):
+    values, total, year_labels = _select(countries, years)
+    if category == TOTAL_COLUMN:
+        block = total
+    else:
+        block = values[:, :, dataset.cube.categories.get_loc(category)]
+    with warnings.catch_warnings():
+        # a year without any selected country simply gives NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        averages = np.nanmean(block, axis=0)
+    return pd.Series(averages, index=year_labels, name=category)
+
+
+def category_averages(countries=None, years=None):
+    """
+    Average of every food category over the selected countries and years, highest first.
+
+    Returns:
+        pd.Series: Average µg/kg per food category.
+    """
+    return _category_averages(*normalize_filters(countries, years))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _category_averages(countries, years):
+    values, _, _ = _select(countries, years)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        averages = np.nanmean(values, axis=(0, 1))
+    return pd.Series(averages, index=dataset.cube.categories, name="average").sort_values(ascending=False)
+
+
+def category_shares(countries=None, years=None):
+    """
+    Share (%) of every food category in the yearly sum over the selected countries.
+
+    Returns:
+        pd.DataFrame: Years as index, food categories as columns, every row adds up to 100.
+    """
+    return _category_shares(*normalize_filters(countries, years))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _category_shares(countries, years):
+    values, _, year_labels = _select(countries, years)
+    sums = np.nansum(values, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = sums / sums.sum(axis=1, keepdims=True) * 100
+    return pd.DataFrame(shares, index=year_labels, columns=dataset.cube.categories)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def country_breakdown(country, year):
+    """
+    Food category values of one country in one year, lowest first (NaN if the country has no data for that year).
+
+    Returns:
+        pd.Series: µg/kg per food category.
+    """
+    return dataset.cube.get(country, int(year)).sort_values()
+
+
+@lru_cache(maxsize=1)
+def year_windows():
+    """
+    Share, rank and CAGR comparisons between any two years (see windows.py), built once from the cube.
+
+    Returns:
+        YearWindows: Call .query(start_year, end_year) on it, every query is a handful of array operations.
+    """
+    return YearWindows.from_cube(dataset.cube)
+
+
+def cache_info():
+    """Hit and miss counts of every aggregation cache."""
+    return {
+        "yearly_average": _yearly_average.cache_info(),
+        "category_averages": _category_averages.cache_info(),
+        "category_shares": _category_shares.cache_info(),
+        "country_breakdown": country_breakdown.cache_info(),
+        "year_windows": year_windows.cache_info(),
+    }
+
+
+def clear_caches():
+    """Drop every memoized result (e.g. after the dataset changed)."""
+    for func in (_yearly_average, _category_averages, _category_shares, country_breakdown, year_windows):
+        func.cache_clear()
@@ -0,0 +1,70 @@
+"""
+Data access for the Streamlit pages.
+
+Every session of the app works on the same dataset and cube: shared_dataset() hands out the LazyDataset of
+aggregations.py through st.cache_resource, so the data is loaded once per process and never copied per session
+(st.cache_data would unpickle a fresh DataFrame for every caller on every rerun). The data is shared, treat it as
+read-only; the cube arrays are flagged read-only anyway. dataset_metadata() describes the dataset without loading it.
+
+Nothing in here draws anything, the pages decide how the data is shown.
+"""
+
+import io
+import os
+
+import streamlit as st
+
+import aggregations
+import charts
+from metadata import load_metadata
+
+
+@st.cache_resource(max_entries=1)
+def _shared_dataset(path, mtime_ns):
+    dataset = aggregations.dataset
+    # a new mtime means the file changed, so everything memoized from the old data goes as well
+    if dataset.refresh():
+        aggregations.clear_caches()
+        charts.clear_caches()
+    # load the frame and build the cube right away, instead of in the middle of some page
+    dataset.cube
+    return dataset
+
+
+def shared_dataset():
+    """
+    The dataset shared by all sessions, loaded once per process and file version.
+
+    Returns:
+        LazyDataset: Handle with the loaded `.df` and `.cube`.
+    """
+    path = aggregations.DATA_PATH
+    return _shared_dataset(str(path), os.stat(path).st_mtime_ns)
+
+
+@st.cache_data
+def _dataset_info(path, mtime_ns):
+    buffer = io.StringIO()
+    _shared_dataset(path, mtime_ns).df.info(buf=buffer)
+    return buffer.getvalue()
+
+
+def dataset_info():
+    """Text of DataFrame.info() for the shared dataset (column dtypes and memory usage)."""
+    path = aggregations.DATA_PATH
+    return _dataset_info(str(path), os.stat(path).st_mtime_ns)
+
+
+@st.cache_resource(max_entries=1)
+def _dataset_metadata(path, mtime_ns):
+    return load_metadata(path)
+
+
+def dataset_metadata():
+    """
+    Metadata index of the dataset (countries, years, categories, rows, per-country coverage), see metadata.py.
+
+    Read from its saved file once per process and file version, without loading the dataset itself.
+    """
+    path = aggregations.DATA_PATH
+    return _dataset_metadata(str(path), os.stat(path).st_mtime_ns)
@@ -0,0 +1,71 @@
+"""
+Bootstrap benchmark: a loop that draws one resample at a time against the vectorized batches of bootstrap.py.
+
+The loop resamples the countries of every year with rng.choice and averages the cube rows of every category, one
+resample and year at a time. Both give the yearly means of every category (and the total) for --resamples resamples;
+the intervals are compared (they only agree up to the Monte Carlo noise, the random draws differ) and the time per
+full run (median of --runs) is reported, for bootstrap.py also with --jobs processes.
+
+Usage:
+    python benchmarks/bench_bootstrap.py [--resamples N] [--jobs N] [--runs N]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bootstrap import bootstrap_intervals  # noqa: E402
+from common import median_time  # noqa: E402
+from dataset import LazyDataset  # noqa: E402
+
+
+def loop_bootstrap(cube, n_resamples, seed=0):
+    rng = np.random.default_rng(seed)
+    present = cube.present()
+    values = np.concatenate([cube.values, cube.total[:, :, np.newaxis]], axis=2).astype(np.float64)
+    means = np.empty((n_resamples, len(cube.years), values.shape[2]))
+    for b in range(n_resamples):
+        for y in range(len(cube.years)):
+            countries = np.flatnonzero(present[:, y])
+            drawn = rng.choice(countries, len(countries))
+            means[b, y] = values[drawn, y].mean(axis=0)
+    return np.percentile(means, [2.5, 97.5], axis=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resamples", type=int, default=2000, help="bootstrap resamples")
+    parser.add_argument("--jobs", type=int, default=4, help="processes for the parallel run of bootstrap.py")
+    parser.add_argument("--runs", type=int, default=1, help="timed runs per method (the median is reported)")
+    args = parser.parse_args()
+
+    cube = LazyDataset(PROJECT_ROOT / "processed_microplastics.csv").cube
+
+    loop_s, (low, high) = median_time(loop_bootstrap, args.runs, cube, args.resamples)
+    single_s, single = median_time(bootstrap_intervals, args.runs, cube, args.resamples)
+    parallel_s, parallel = median_time(bootstrap_intervals, args.runs, cube, args.resamples, n_jobs=args.jobs)
+
+    yearly = single["yearly_means"]
+    same = np.array_equal(yearly[["ci_low", "ci_high"]], parallel["yearly_means"][["ci_low", "ci_high"]])
+    # relative difference of the interval widths between the loop and bootstrap.py (Monte Carlo noise only)
+    loop_width = (high - low).ravel()
+    width = (yearly["ci_high"] - yearly["ci_low"]).to_numpy()
+    width_diff = np.abs(width - loop_width) / loop_width
+
+    print(
+        f"{args.resamples} resamples × {len(cube.years)} years × {cube.values.shape[2] + 1} categories "
+        f"(plus category means and trend slopes for bootstrap.py)"
+    )
+    print(f"  loop, one resample and year at a time:  {loop_s * 1000:8.1f} ms")
+    print(f"  bootstrap.py, 1 process:                {single_s * 1000:8.1f} ms")
+    print(f"  bootstrap.py, {args.jobs} processes:              {parallel_s * 1000:8.1f} ms (same intervals: {same})")
+    print(f"  speedup: {loop_s / single_s:.0f}x, interval widths differ from the loop by {np.median(width_diff):.1%} (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Concentration benchmark: the per-country loop main.py used to run against the vectorized pass of concentration.py.
+
+The loop takes one row at a time with .loc and computes idxmax, max, sum (plus the HHI and entropy) for it, the way
+contamination_in_countries did for its top 10 countries, here for every country-year of the dataset. Checks that
+both give the same metrics and reports the time per full pass (median of --runs).
+
+Usage:
+    python benchmarks/bench_concentration.py [--runs N]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from common import median_time  # noqa: E402
+from concentration import country_year_concentration  # noqa: E402
+from dataset import LazyDataset  # noqa: E402
+
+
+def loop_concentration(cube):
+    frame = pd.DataFrame(
+        cube.values.reshape(-1, len(cube.categories)),
+        index=pd.MultiIndex.from_product([cube.countries, cube.years]),
+        columns=cube.categories,
+    ).dropna(how="all")
+
+    rows = {}
+    for key in frame.index:
+        row = frame.loc[key]
+        shares = row / row.sum()
+        positive = shares[shares > 0]
+        rows[key] = {
+            "max_share": row.max() / row.sum(),
+            "top_category": row.idxmax(),
+            "hhi": (shares**2).sum(),
+            "entropy": -(positive * np.log(positive)).sum(),
+        }
+    return pd.DataFrame(rows).T
+
+
+def vectorized_concentration(cube):
+    return country_year_concentration(cube).set_index(["country", "year"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="timed passes per method (the median is reported)")
+    args = parser.parse_args()
+
+    cube = LazyDataset(PROJECT_ROOT / "processed_microplastics.csv").cube
+
+    loop_s, loop = median_time(loop_concentration, args.runs, cube)
+    vectorized_s, vectorized = median_time(vectorized_concentration, args.runs, cube)
+
+    vectorized = vectorized.loc[loop.index]
+    max_diff = max(
+        np.abs(loop[column].astype(np.float64) - vectorized[column]).max() for column in ("max_share", "hhi", "entropy")
+    )
+    same_top = (loop["top_category"] == vectorized["top_category"]).all()
+
+    print(f"{len(loop)} country-years, {len(cube.categories)} food categories each")
+    print(f"  .loc / idxmax per row:          {loop_s * 1000:8.1f} ms")
+    print(f"  concentration.py, one pass:     {vectorized_s * 1000:8.1f} ms")
+    print(f"  speedup: {loop_s / vectorized_s:.0f}x, largest difference: {max_diff:.2e}, same top categories: {same_top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Correlation benchmark: one df.corr() over the filtered table per view against the merged states of correlation.py.
+
+The views are what main.py and an analyst typically look at: the global matrix, one per year, one per continent and
+the rolling 3-survey windows. Checks that both give the same matrices and reports the time for all views
+(median of --runs), with the engine's one-off build (the only pass over the rows) timed on its own.
+--copies stacks the dataset on itself to see how both scale with the number of rows.
+
+Usage:
+    python benchmarks/bench_correlation.py [--runs N] [--method pearson|spearman] [--copies N]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from common import median_time  # noqa: E402
+from correlation import CorrelationEngine  # noqa: E402
+from countries import country_index  # noqa: E402
+from dataset import LazyDataset  # noqa: E402
+
+
+def views(years, continents):
+    yield "global", None, None
+    for year in years:
+        yield year, [year], None
+    for continent in continents:
+        yield continent, None, [continent]
+    for i in range(len(years) - 2):
+        yield (years[i], years[i + 2]), years[i : i + 3], None
+
+
+def rescan_views(df, method):
+    numeric = df.select_dtypes("number")
+    countries = df["country"].astype(str)
+    continents = country_index(countries.unique()).map(countries, "continent").fillna("unknown")
+    results = {}
+    for name, years, selected in views(sorted(df["year"].unique()), sorted(continents.unique())):
+        mask = np.ones(len(df), dtype=bool)
+        if years is not None:
+            mask &= df["year"].isin(years).to_numpy()
+        if selected is not None:
+            mask &= continents.isin(selected).to_numpy()
+        results[name] = numeric[mask].corr(method)
+    return results
+
+
+def engine_views(engine, method):
+    return {
+        name: engine.correlation(method, years=years, continents=selected)
+        for name, years, selected in views(engine.years, engine.continents)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="timed passes per method (the median is reported)")
+    parser.add_argument("--method", default="pearson", choices=["pearson", "spearman"])
+    parser.add_argument("--copies", type=int, default=1, help="stack the dataset this many times")
+    args = parser.parse_args()
+
+    df = LazyDataset(PROJECT_ROOT / "processed_microplastics.csv").df
+    if args.copies > 1:
+        df = pd.concat([df] * args.copies, ignore_index=True)
+
+    rescan_s, rescan = median_time(rescan_views, args.runs, df, args.method)
+    build_s, engine = median_time(CorrelationEngine.from_frame, args.runs, df)
+    # a fresh engine per timed pass, otherwise the cached spearman views would be timed instead
+    views_s, merged = median_time(lambda: engine_views(CorrelationEngine.from_frame(df), args.method), args.runs)
+    views_s -= build_s
+
+    max_diff = max(np.nanmax(np.abs(rescan[name].to_numpy() - merged[name].to_numpy())) for name in rescan)
+    print(f"{len(rescan)} {args.method} correlation views over {len(df)} rows × {len(engine.columns)} columns")
+    print(f"  df.corr() per view:             {rescan_s * 1000:8.1f} ms")
+    print(f"  correlation.py build (once):    {build_s * 1000:8.1f} ms")
+    print(f"  correlation.py views:           {views_s * 1000:8.1f} ms")
+    print(f"  speedup of the views: {rescan_s / views_s:.1f}x, with the build: {rescan_s / (build_s + views_s):.1f}x")
+    print(f"  largest difference: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
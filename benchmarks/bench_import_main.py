@@ -0,0 +1,82 @@
+"""
+Import-time benchmark for main.py.
+
+Imports main in a fresh interpreter with an audit hook installed and fails if the import
+touches the dataset (CSV or sidecar) or creates the output directory.
+It also reports how long `import main` takes.
+
+Usage:
+    python benchmarks/bench_import_main.py [--runs N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# runs inside the child interpreter, before main is imported
+CHILD_SCRIPT = r"""
+import json, os, sys, time
+
+watched = ("processed_microplastics", "output")
+events = []
+
+def hook(event, args):
+    if event == "open" and args and isinstance(args[0], (str, bytes, os.PathLike)):
+        path = os.fsdecode(args[0])
+        if any(os.path.basename(path).lstrip(".").startswith(w) for w in watched):
+            events.append([event, path])
+    elif event == "os.mkdir" and os.path.basename(os.fsdecode(args[0])) in watched:
+        events.append([event, os.fsdecode(args[0])])
+
+sys.addaudithook(hook)
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+
+# pyarrow memory-maps the sidecar without going through Python's open(), so also look at the module itself
+if "df" in vars(main) or (hasattr(main, "dataset") and main.dataset.loaded):
+    events.append(["load", "dataset loaded at import time"])
+print(json.dumps({"seconds": elapsed, "io_events": events}))
+"""
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters to time")
+    args = parser.parse_args()
+
+    timings = []
+    io_events = []
+    for _ in range(args.runs):
+        result = run_once()
+        timings.append(result["seconds"])
+        io_events.extend(result["io_events"])
+
+    print(f"import main: median {statistics.median(timings) * 1000:.1f} ms over {args.runs} runs")
+
+    if io_events:
+        print("import main performed dataset/output I/O:")
+        for event, path in io_events:
+            print(f"  {event}: {path}")
+        sys.exit(1)
+    print("import main performed no dataset/output I/O")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Load test of the Streamlit app: N concurrent sessions per page against a local server, no network needed.
+
+For every page and session count a fresh interpreter starts the app's server on a free localhost port and connects
+N simulated browser sessions to it over the websocket the real frontend uses. Every session opens the page and then
+reruns it --reruns times. Before each rerun it changes one of the page's widgets (a selectbox, slider, radio or
+multiselect, picked by a seeded random generator) the way a visitor would; pages without widgets are simply rerun.
+Like the frontend, a change of a widget inside an st.fragment only asks for a rerun of that fragment.
+(streamlit's AppTest cannot be used here, it swaps process-wide globals on every run and hangs as soon as two
+sessions run at the same time.)
+
+Recorded per page and session count:
+
+- latency percentiles (p50/p90/p99/max) of opening the page and of the reruns, from sending the request
+  until the script finished,
+- peak RSS of the interpreter (server plus the lightweight clients),
+- hit rates of the LRU caches behind the interactive charts (aggregations.py and charts.py),
+- number of st.cache_resource / st.cache_data entries left behind (one entry shared by all sessions is
+  what we want).
+
+Results are printed and saved as JSON (benchmarks/results/load_test.json by default), together with the git revision,
+so a later run can be compared with --compare PATH.
+
+Usage:
+    python benchmarks/bench_load.py [--sessions 1 5 10] [--reruns 10] [--pages Home Dataset Insights]
+                                    [--compare PATH] [--output PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+MAIN_SCRIPT = "🌐_Home.py"
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results" / "load_test.json"
+PAGES = ("Home", "Dataset", "Insights")
+PERCENTILES = (50, 90, 99)
+WIDGET_TYPES = ("selectbox", "radio", "slider", "multiselect")
+
+
+def percentiles(samples):
+    import numpy as np
+
+    if not samples:
+        return {}
+    stats = {f"p{p}": float(np.percentile(samples, p)) for p in PERCENTILES}
+    stats["max"] = float(max(samples))
+    stats["count"] = len(samples)
+    return stats
+
+
+def _change_widget(kind, widget, state, rng):
+    # fill a WidgetState with a new value for the widget, like the frontend does after a click
+    state.id = widget.id
+    if kind in ("selectbox", "radio"):
+        state.int_value = rng.randrange(len(widget.options))
+    elif kind == "multiselect":
+        picked = rng.sample(range(len(widget.options)), min(rng.randrange(4), len(widget.options)))
+        state.int_array_value.data.extend(picked)
+    else:
+        # a select_slider sends positions in its options, a plain slider the values themselves
+        first, last = (0, len(widget.options) - 1) if widget.options else (int(widget.min), int(widget.max))
+        low = rng.randint(first, last)
+        if len(widget.default) == 2:
+            high = rng.randint(low, last)
+            state.double_array_value.data.extend([low, high])
+        else:
+            state.double_array_value.data.append(low)
+
+
+async def _session(port, page, reruns, rng, opens, rerun_times):
+    import time
+
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+    from tornado.websocket import websocket_connect
+
+    ws = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"])
+    widgets = {}
+    states = {}
+
+    async def run(fragment_id=""):
+        msg = BackMsg()
+        msg.rerun_script.page_name = page
+        msg.rerun_script.widget_states.widgets.extend(states.values())
+        # a widget inside an st.fragment only reruns its fragment, the frontend says which one
+        msg.rerun_script.fragment_id = fragment_id
+        start = time.perf_counter()
+        await ws.write_message(msg.SerializeToString(), binary=True)
+        while True:
+            data = await ws.read_message()
+            if data is None:
+                raise RuntimeError(f"{page}: the server closed the connection")
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    raise RuntimeError(f"{page} raised {element.exception.type}: {element.exception.message}")
+                if element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    widgets[widget.id] = (element_type, widget, forward.delta.fragment_id)
+            elif kind == "script_finished":
+                return time.perf_counter() - start
+
+    opens.append(await run())
+    for _ in range(reruns):
+        fragment_id = ""
+        if widgets:
+            widget_id = rng.choice(sorted(widgets))
+            kind, widget, fragment_id = widgets[widget_id]
+            state = WidgetState()
+            _change_widget(kind, widget, state, rng)
+            states[widget_id] = state
+        rerun_times.append(await run(fragment_id))
+    ws.close()
+
+
+def _hit_rates(infos):
+    return {
+        name: {"hits": info.hits, "misses": info.misses, "hit_rate": info.hits / max(info.hits + info.misses, 1)}
+        for name, info in infos.items()
+    }
+
+
+def _streamlit_cache_entries():
+    from streamlit.runtime.caching import cache_data_api, cache_resource_api
+
+    # get_stats() would measure every cached object with pympler, which fails on some of ours,
+    # and all we want is the number of entries
+    entries = {}
+    for cache in cache_resource_api._resource_caches._function_caches.values():
+        entries[f"st_cache_resource:{cache.display_name}"] = len(cache._mem_cache)
+    for cache in cache_data_api._data_caches._function_caches.values():
+        entries[f"st_cache_data:{cache.display_name}"] = len(getattr(cache.storage, "_mem_cache", ()))
+    return entries
+
+
+async def _load_test(page, sessions, reruns, seed):
+    import asyncio
+    import random
+    import resource
+    import socket
+    import time
+
+    from streamlit.web import bootstrap
+    from streamlit.web.server import Server
+
+    import aggregations
+    import charts
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    bootstrap.load_config_options(
+        {
+            "server.address": "127.0.0.1",
+            "server.port": port,
+            "server.headless": True,
+            "server.fileWatcherType": "none",
+            "browser.gatherUsageStats": False,
+        }
+    )
+    server = Server(MAIN_SCRIPT, is_hello=False)
+    await server.start()
+
+    opens, rerun_times = [], []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(
+                _session(port, page, reruns, random.Random(seed + i), opens, rerun_times)
+                for i in range(sessions)
+            )
+        )
+    finally:
+        wall = time.perf_counter() - start
+        server.stop()
+
+    return {
+        "page": page,
+        "sessions": sessions,
+        "reruns_per_session": reruns,
+        "wall_s": wall,
+        "open_s": percentiles(opens),
+        "rerun_s": percentiles(rerun_times),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "lru_caches": _hit_rates({**aggregations.cache_info(), **charts.cache_info()}),
+        "streamlit_cache_entries": _streamlit_cache_entries(),
+    }
+
+
+def worker(page, sessions, reruns, seed):
+    """Run one measurement in this interpreter and print the result as JSON."""
+    import asyncio
+
+    print(json.dumps(asyncio.run(_load_test(page, sessions, reruns, seed)), ensure_ascii=False))
+
+
+def measure(page, sessions, reruns, seed):
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), MPLBACKEND="Agg")
+    result = subprocess.run(
+        [sys.executable, __file__, "--worker", page, str(sessions), str(reruns), str(seed)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{page} with {sessions} sessions failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def print_results(runs, previous=None):
+    # previous: (page, sessions) -> run of an earlier results file
+    print(f"  {'page':<10}{'sessions':>9}{'open p50':>10}{'rerun p50':>11}{'p90':>8}{'p99':>8}{'peak MB':>9}  LRU hit rate")
+    for run in runs:
+        lru = run["lru_caches"]
+        hits = sum(cache["hits"] for cache in lru.values())
+        calls = hits + sum(cache["misses"] for cache in lru.values())
+        hit_rate = f"{hits / calls:.0%}" if calls else "-"
+        rerun = run["rerun_s"]
+        print(
+            f"  {run['page']:<10}{run['sessions']:>9}{run['open_s']['p50'] * 1000:>8.0f}ms"
+            f"{rerun['p50'] * 1000:>9.0f}ms{rerun['p90'] * 1000:>6.0f}ms{rerun['p99'] * 1000:>6.0f}ms"
+            f"{run['peak_rss_mb']:>9.1f}  {hit_rate}"
+        )
+        before = (previous or {}).get((run["page"], run["sessions"]))
+        if before is not None:
+            change = rerun["p50"] / before["rerun_s"]["p50"] - 1
+            print(f"  {'':<10}{'':>9}  rerun p50 {change:+.0%} compared to the previous results")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        page, sessions, reruns, seed = sys.argv[2:6]
+        worker(page, int(sessions), int(reruns), int(seed))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10], help="concurrent session counts")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns per session after opening the page")
+    parser.add_argument("--pages", nargs="+", default=list(PAGES), help="page names to load test")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the simulated widget changes")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare the rerun latencies with")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="where to save the JSON results")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare is not None:
+        with open(args.compare) as f:
+            previous = {(run["page"], run["sessions"]): run for run in json.load(f)["runs"]}
+
+    runs = [
+        measure(page, sessions, args.reruns, args.seed)
+        for page in args.pages
+        for sessions in args.sessions
+    ]
+
+    print(f"Load test, {args.reruns} reruns per session:\n")
+    print_results(runs, previous)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "reruns_per_session": args.reruns,
+                "seed": args.seed,
+                "runs": runs,
+            },
+            f,
+            indent=2,
+            ensure_ascii=False,
+        )
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Memory per concurrent session of the Insights page.
+
+For every session count, a fresh interpreter first runs one session to fill the process-wide caches,
+then opens N more sessions (streamlit AppTest instances that all stay alive) and reruns each of them once.
+The resident memory (RSS, from /proc/self/status) before and after the N sessions gives the memory one more viewer
+costs; the peak RSS of the whole interpreter is recorded as well.
+
+Results are printed and saved as JSON (benchmarks/results/session_memory.json by default).
+
+Usage:
+    python benchmarks/bench_session_memory.py [--sessions 1 5 10 20] [--page PATH] [--output PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PAGE = "pages/📊_Insights.py"
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results" / "session_memory.json"
+
+# runs inside the fresh interpreter, prints one JSON line
+WORKER = """
+import gc, json, resource, sys
+from streamlit.testing.v1 import AppTest
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+page, sessions = sys.argv[1], int(sys.argv[2])
+AppTest.from_file(page, default_timeout=120).run()
+gc.collect()
+before = rss_kb()
+
+apps = []
+for _ in range(sessions):
+    app = AppTest.from_file(page, default_timeout=120).run()
+    assert not app.exception, app.exception
+    apps.append(app)
+for app in apps:
+    app.run()
+gc.collect()
+after = rss_kb()
+
+print(json.dumps({
+    "rss_before_kb": before,
+    "rss_after_kb": after,
+    "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def measure(page, sessions):
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER, str(page), str(sessions)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{sessions} sessions failed:\n{result.stderr[-2000:]}")
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    run["sessions"] = sessions
+    run["per_session_kb"] = (run["rss_after_kb"] - run["rss_before_kb"]) / sessions
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20], help="session counts to measure")
+    parser.add_argument("--page", default=DEFAULT_PAGE, help="page to open in every session")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="where to save the JSON results")
+    args = parser.parse_args()
+
+    runs = [measure(args.page, sessions) for sessions in args.sessions]
+
+    print(f"Memory of concurrent sessions of {args.page}:\n")
+    print(f"  {'sessions':>8}{'RSS before MB':>15}{'RSS after MB':>14}{'per session MB':>16}{'peak MB':>9}")
+    for run in runs:
+        print(
+            f"  {run['sessions']:>8}{run['rss_before_kb'] / 1024:>15.1f}{run['rss_after_kb'] / 1024:>14.1f}"
+            f"{run['per_session_kb'] / 1024:>16.2f}{run['peak_rss_kb'] / 1024:>9.1f}"
+        )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "page": args.page,
+                "runs": runs,
+            },
+            f,
+            indent=2,
+            ensure_ascii=False,
+        )
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Startup benchmark: `python -X importtime` for every entry point.
+
+Every entry point is started in fresh interpreters with -X importtime. The import log is summed up
+(total import time, number of modules, the heaviest top-level packages) and it is recorded which of the heavy
+libraries (matplotlib, seaborn, plotly, pycountry, pyarrow) were imported at all.
+The Streamlit pages are run headless through streamlit's AppTest; "AppTest (empty page)" is the
+baseline that every page pays anyway.
+
+Results are printed and saved as JSON (benchmarks/results/startup_importtime.json by default).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--output PATH]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "results" / "startup_importtime.json"
+
+HEAVY_MODULES = ("matplotlib", "seaborn", "plotly", "pycountry", "pycountry_convert", "pyarrow")
+
+APPTEST = "from streamlit.testing.v1 import AppTest; AppTest.from_file({page!r}, default_timeout=120).run()"
+
+
+def entry_points(empty_page):
+    return {
+        "import main": ["-c", "import main"],
+        "main.py --no-figures": ["main.py", "processed_microplastics.csv", "--no-figures"],
+        "AppTest (empty page)": ["-c", APPTEST.format(page=empty_page)],
+        "🌐_Home.py": ["-c", APPTEST.format(page="🌐_Home.py")],
+        "pages/📈_Dataset.py": ["-c", APPTEST.format(page="pages/📈_Dataset.py")],
+        "pages/📊_Insights.py": ["-c", APPTEST.format(page="pages/📊_Insights.py")],
+    }
+
+
+def parse_importtime(stderr):
+    """
+    Parse the -X importtime log.
+
+    Returns:
+        dict: total_ms (sum of all self times), modules, the 10 heaviest top-level packages (cumulative ms)
+        and the heavy libraries that were imported.
+    """
+    total_us = 0
+    modules = set()
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        total_us += int(self_us)
+        modules.add(module)
+        # the nesting depth is shown by the indentation of the name (one space, plus two per level)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            root = module.split(".")[0]
+            top_level[root] = max(top_level.get(root, 0), int(cumulative_us))
+
+    heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "total_ms": total_us / 1000,
+        "modules": len(modules),
+        "heaviest": {name: us / 1000 for name, us in heaviest},
+        "heavy_imported": sorted(
+            name for name in HEAVY_MODULES if any(m == name or m.startswith(name + ".") for m in modules)
+        ),
+    }
+
+
+def run_once(args):
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), MPLBACKEND="Agg")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per entry point (the median is kept)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="where to save the JSON results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        empty_page = os.path.join(tmp, "empty_page.py")
+        with open(empty_page, "w") as f:
+            f.write("import streamlit as st\n")
+
+        results = {}
+        for name, command in entry_points(empty_page).items():
+            runs = [run_once(command) for _ in range(args.runs)]
+            median_run = sorted(runs, key=lambda run: run["total_ms"])[len(runs) // 2]
+            median_run["runs_total_ms"] = [run["total_ms"] for run in runs]
+            results[name] = median_run
+
+    print(f"Import time per entry point (median of {args.runs} runs):\n")
+    print(f"  {'entry point':<26}{'import ms':>10}{'modules':>9}  heavy libraries imported")
+    for name, result in results.items():
+        heavy = ", ".join(result["heavy_imported"]) or "-"
+        print(f"  {name:<26}{result['total_ms']:>10.0f}{result['modules']:>9}  {heavy}")
+
+    print("\nHeaviest top-level packages (cumulative ms):")
+    for name, result in results.items():
+        heaviest = ", ".join(f"{module} {ms:.0f}" for module, ms in list(result["heaviest"].items())[:5])
+        print(f"  {name}: {heaviest}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "runs": args.runs,
+                "statistic": "median total import time",
+                "entry_points": results,
+            },
+            f,
+            indent=2,
+            ensure_ascii=False,
+        )
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Trend fitting benchmark: one np.polyfit call per series against the batched fit of trends.py.
+
+Fits a line through every country × category series of the dataset (NaN years dropped) both ways,
+checks that the slopes agree and reports the time per full pass (median of --runs).
+
+Usage:
+    python benchmarks/bench_trends.py [--runs N]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from common import median_time  # noqa: E402
+from dataset import LazyDataset  # noqa: E402
+from trends import country_trends  # noqa: E402
+
+
+def polyfit_slopes(cube):
+    # the way main.py used to do it: one series at a time
+    years = cube.years.to_numpy().astype(np.float64)
+    slopes = np.full((len(cube.countries), len(cube.categories)), np.nan)
+    for i in range(len(cube.countries)):
+        for j in range(len(cube.categories)):
+            series = cube.values[i, :, j].astype(np.float64)
+            present = ~np.isnan(series)
+            if present.sum() >= 2:
+                slopes[i, j] = np.polyfit(years[present], series[present], 1)[0]
+    return slopes
+
+
+def batched_slopes(cube):
+    table = country_trends(cube)
+    return table["slope_per_year"].to_numpy().reshape(len(cube.countries), -1)[:, : len(cube.categories)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="timed passes per method (the median is reported)")
+    args = parser.parse_args()
+
+    cube = LazyDataset(PROJECT_ROOT / "processed_microplastics.csv").cube
+    series = len(cube.countries) * len(cube.categories)
+
+    loop_s, loop = median_time(polyfit_slopes, args.runs, cube)
+    batched_s, batched = median_time(batched_slopes, args.runs, cube)
+
+    max_diff = np.nanmax(np.abs(loop - batched))
+    print(f"{series} country × category series, {len(cube.years)} years each")
+    print(f"  np.polyfit per series: {loop_s * 1000:8.1f} ms")
+    print(f"  trends.country_trends: {batched_s * 1000:8.1f} ms (also R², standard errors and the totals)")
+    print(f"  speedup: {loop_s / batched_s:.0f}x, largest slope difference: {max_diff:.2e} µg/kg per year")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Helpers shared by the benchmark scripts (they import it as `common`, the scripts' own directory is on sys.path).
+"""
+
+import statistics
+import time
+
+
+def median_time(func, runs, *args, **kwargs):
+    """
+    Time `runs` calls of func(*args, **kwargs).
+
+    Returns:
+        tuple: Median wall-clock time of the calls in seconds, and the result of the last call.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
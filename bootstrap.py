@@ -0,0 +1,154 @@
+"""
+Bootstrap confidence intervals for the yearly means, the category means and the trend slopes.
+
+Every resample draws, for each year, as many countries as that year has (with replacement) from the countries with
+data in that year, so years with fewer countries (1990-2005 have 99, 2010-2018 have 109) keep their size. All
+draws of a batch of resamples are one array of indices; they are turned into counts (how often every country was
+drawn) and the resampled means are a single batched matrix product of those counts with the data, no loop over
+resamples or categories.
+
+The batches are independent, so they can run in a process pool. Every batch gets its own child of one
+SeedSequence(seed), so the same seed gives the same intervals however many processes are used.
+
+The intervals are percentile intervals of the resampled statistic.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from dataset import TOTAL_COLUMN
+from trends import fit_lines
+
+DEFAULT_RESAMPLES = 2000
+# resamples per batch (and per task of the process pool)
+BATCH_SIZE = 250
+
+INTERVAL_COLUMNS = ["ci_low", "ci_high", "se"]
+
+
+def _year_blocks(cube):
+    # (years, slots, categories) array with the countries of every year in its first slots, zeros after them
+    values = cube.values
+    categories = list(cube.categories)
+    if cube.total is not None:
+        values = np.concatenate([values, cube.total[:, :, np.newaxis]], axis=2)
+        categories.append(TOTAL_COLUMN)
+
+    present = cube.present()
+    counts = present.sum(axis=0)
+    # a stable sort puts the present countries of every year first, in their original order
+    order = np.argsort(~present, axis=0, kind="stable")[: counts.max()]
+    blocks = values[order, np.arange(len(cube.years))].astype(np.float64).transpose(1, 0, 2)
+    blocks[np.arange(counts.max()) >= counts[:, np.newaxis]] = 0
+    return blocks, counts, categories
+
+
+def _resample_batch(blocks, counts, years, seed, size):
+    """
+    Yearly means and their trend slopes of `size` resamples.
+
+    Returns:
+        tuple: Means of shape (size, years, categories) and slopes of shape (size, categories).
+    """
+    rng = np.random.default_rng(seed)
+    n_years, n_slots, _ = blocks.shape
+
+    # all draws at once: resample × year × draw, the draws of a year pick one of its counts[year] countries
+    draws = (rng.random((size, n_years, n_slots)) * counts[:, np.newaxis]).astype(np.int64)
+    used = np.arange(n_slots) < counts[:, np.newaxis]
+    flat = (np.arange(size)[:, np.newaxis, np.newaxis] * n_years + np.arange(n_years)[:, np.newaxis]) * n_slots + draws
+    drawn = np.bincount(flat[:, used].ravel(), minlength=size * n_years * n_slots).reshape(size, n_years, n_slots)
+
+    # (years, resamples, slots) @ (years, slots, categories): the sums of every resample and year
+    sums = np.matmul(drawn.transpose(1, 0, 2).astype(np.float64), blocks)
+    means = sums.transpose(1, 0, 2) / counts[np.newaxis, :, np.newaxis]
+    return means, fit_lines(years, means.transpose(0, 2, 1))["slope_per_year"]
+
+
+def _interval(samples, confidence):
+    # percentile interval and standard error along the resample axis
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail], axis=0)
+    return {"ci_low": low, "ci_high": high, "se": samples.std(axis=0, ddof=1)}
+
+
+def bootstrap_intervals(cube, n_resamples=DEFAULT_RESAMPLES, seed=0, confidence=0.95, n_jobs=1):
+    """
+    Bootstrap intervals of the yearly means, category means and trend slopes, resampling countries per year.
+
+    Parameters:
+        cube (PanelCube): The dataset (total_ug_per_kg is included as its own category, if the cube has it).
+        n_resamples (int): Number of bootstrap resamples.
+        seed (int): Seed of the resamples, the same seed gives the same intervals.
+        confidence (float): Coverage of the intervals, e.g. 0.95 for 2.5% - 97.5%.
+        n_jobs (int): Number of processes to spread the batches of resamples over.
+
+    Returns:
+        dict: Three tables with the point estimate of the full data and its INTERVAL_COLUMNS:
+            "yearly_means": one row per year and category (long layout) with mean,
+            "category_means": one row per category with its mean over all countries and years,
+            "trend_slopes": one row per category with the slope (µg/kg per year) of its yearly mean.
+    """
+    blocks, counts, categories = _year_blocks(cube)
+    years = cube.years.to_numpy()
+
+    sizes = [BATCH_SIZE] * (n_resamples // BATCH_SIZE)
+    if n_resamples % BATCH_SIZE:
+        sizes.append(n_resamples % BATCH_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if n_jobs <= 1 or len(sizes) <= 1:
+        batches = [_resample_batch(blocks, counts, years, s, size) for s, size in zip(seeds, sizes)]
+    else:
+        n_jobs = min(n_jobs, len(sizes))
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            # one chunk of batches per process, the data is sent once per chunk instead of once per batch
+            batches = list(
+                pool.map(
+                    _resample_batch, repeat(blocks), repeat(counts), repeat(years), seeds, sizes,
+                    chunksize=-(-len(sizes) // n_jobs),
+                )
+            )
+    yearly = np.concatenate([means for means, _ in batches])
+    slopes = np.concatenate([batch_slopes for _, batch_slopes in batches])
+
+    # the point estimates are the same statistics of the data itself
+    yearly_point = blocks.sum(axis=1) / counts[:, np.newaxis]
+
+    # every year keeps its size in a resample, so the overall mean is the count-weighted mean of the years
+    weights = counts / counts.sum()
+    overall = np.einsum("y,byk->bk", weights, yearly)
+    overall_point = weights @ yearly_point
+
+    slopes_point = fit_lines(years, yearly_point.T)["slope_per_year"]
+
+    n_years, n_categories = yearly_point.shape
+    yearly_means = pd.DataFrame(
+        {
+            "year": np.repeat(years, n_categories),
+            "category": np.tile(categories, n_years),
+            "mean": yearly_point.ravel(),
+            **{column: values.ravel() for column, values in _interval(yearly, confidence).items()},
+        }
+    )
+    category_means = pd.DataFrame(
+        {"mean": overall_point, **_interval(overall, confidence)}, index=pd.Index(categories, name="category")
+    )
+    trend_slopes = pd.DataFrame(
+        {"slope_per_year": slopes_point, **_interval(slopes, confidence)}, index=pd.Index(categories, name="category")
+    )
+    return {"yearly_means": yearly_means, "category_means": category_means, "trend_slopes": trend_slopes}
+
+
+def yearly_interval(yearly_means, category):
+    """
+    One category of a "yearly_means" table (also the one loaded from the insights artifact).
+
+    Returns:
+        pd.DataFrame: Years as index with mean, ci_low and ci_high.
+    """
+    rows = yearly_means[yearly_means["category"] == category]
+    return rows.set_index("year")[["mean", "ci_low", "ci_high"]]
@@ -0,0 +1,145 @@
+"""
+Interactive Plotly versions of the main.py charts for the app.
+
+Each builder takes the same filters as its aggregation in aggregations.py and is memoized on them as well,
+so a repeated selection neither recomputes the data nor rebuilds the figure.
+The figures are shared between sessions; st.plotly_chart copies a figure before sending it, so they are never changed.
+"""
+
+from functools import lru_cache
+
+import aggregations
+from dataset import TOTAL_COLUMN
+
+CACHE_SIZE = aggregations.CACHE_SIZE
+
+
+def _layout(fig, xlabel, ylabel, legend_title=None):
+    fig.update_layout(
+        xaxis_title=xlabel,
+        yaxis_title=ylabel,
+        legend_title_text=legend_title,
+        margin={"r": 10, "t": 40, "l": 10, "b": 10},
+    )
+    return fig
+
+
+def trend_figure(category=TOTAL_COLUMN, countries=None, years=None, interval=None):
+    """
+    Line chart of the yearly average of one category (or the total) over the selected countries.
+
+    interval is an optional DataFrame with ci_low and ci_high per year (e.g. the bootstrap interval of all countries
+    from bootstrap.yearly_interval), drawn as a shaded band around the line.
+    """
+    band = None
+    if interval is not None:
+        # as a tuple, so the figure cache can use it as part of its key
+        band = tuple((int(year), float(row.ci_low), float(row.ci_high)) for year, row in interval.iterrows())
+    return _trend_figure(category, *aggregations.normalize_filters(countries, years), band)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _trend_figure(category, countries, years, band=None):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    trend = aggregations.yearly_average(category, countries, years)
+    if countries is None:
+        where = "all countries"
+    elif len(countries) <= 3:
+        where = ", ".join(countries)
+    else:
+        where = f"{len(countries)} countries"
+    fig = px.line(
+        x=trend.index,
+        y=trend.values,
+        markers=True,
+        title=f"Average {category} µg/kg ({where})",
+    )
+    fig.update_traces(hovertemplate="%{x}: %{y:.1f} µg/kg<extra></extra>")
+    if band:
+        band = [row for row in band if row[0] in trend.index]
+        band_years = [row[0] for row in band]
+        fig.add_trace(go.Scatter(x=band_years, y=[row[2] for row in band], mode="lines", line_width=0, showlegend=False, hoverinfo="skip"))
+        fig.add_trace(
+            go.Scatter(
+                x=band_years,
+                y=[row[1] for row in band],
+                mode="lines",
+                line_width=0,
+                fill="tonexty",
+                fillcolor="rgba(31, 119, 180, 0.2)",
+                name="95% bootstrap interval",
+                hovertemplate="%{x}: 95% interval<extra></extra>",
+            )
+        )
+    return _layout(fig, "Year", "Average µg/kg")
+
+
+def top_categories_figure(n=3, countries=None, years=None):
+    """Horizontal bar chart of the n food categories with the highest average µg/kg."""
+    return _top_categories_figure(int(n), *aggregations.normalize_filters(countries, years))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _top_categories_figure(n, countries, years):
+    import plotly.express as px
+
+    top_n = aggregations.category_averages(countries, years).head(n)[::-1]
+    fig = px.bar(
+        x=top_n.values,
+        y=top_n.index,
+        orientation="h",
+        title=f"Top {n} Food Categories by Microplastic Content",
+    )
+    fig.update_traces(hovertemplate="%{y}: %{x:.1f} µg/kg<extra></extra>")
+    return _layout(fig, "Average Microplastic Consumption (μg/kg)", None)
+
+
+def shares_figure(countries=None, years=None):
+    """Stacked area chart of every food category's share of the yearly total."""
+    return _shares_figure(*aggregations.normalize_filters(countries, years))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _shares_figure(countries, years):
+    import plotly.express as px
+
+    shares = aggregations.category_shares(countries, years)
+    long = shares.rename_axis(index="year", columns="category").stack().rename("share").reset_index()
+    fig = px.area(long, x="year", y="share", color="category", title="Evolution of Food Category Shares")
+    fig.update_traces(hovertemplate="%{x}: %{y:.2f}%<extra></extra>")
+    return _layout(fig, "Year", "Share of Total (%)", legend_title="Category")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def breakdown_figure(country, year, highlight_above=100):
+    """Bar chart of one country's food categories in one year, categories above highlight_above µg/kg in red."""
+    import plotly.express as px
+
+    breakdown = aggregations.country_breakdown(country, year)
+    # same colors as the matplotlib version (tab:red and tab:blue)
+    colors = ["#d62728" if value >= highlight_above else "#1f77b4" for value in breakdown.values]
+    fig = px.bar(
+        x=breakdown.index,
+        y=breakdown.values,
+        title=f"Microplastic Breakdown for {country} ({year})",
+    )
+    fig.update_traces(marker_color=colors, hovertemplate="%{x}: %{y:.1f} µg/kg<extra></extra>")
+    return _layout(fig, "Food Category", "Microplastics (µg/kg)")
+
+
+def cache_info():
+    """Hit and miss counts of the figure caches (see aggregations.cache_info for the data)."""
+    return {
+        "trend_figure": _trend_figure.cache_info(),
+        "top_categories_figure": _top_categories_figure.cache_info(),
+        "shares_figure": _shares_figure.cache_info(),
+        "breakdown_figure": breakdown_figure.cache_info(),
+    }
+
+
+def clear_caches():
+    """Drop every memoized figure (e.g. after the dataset changed)."""
+    for func in (_trend_figure, _top_categories_figure, _shares_figure, breakdown_figure):
+        func.cache_clear()
@@ -0,0 +1,117 @@
+"""
+How concentrated the contamination of a country is across the food categories.
+
+Every row of a (rows × categories) matrix is turned into shares of its row total once, and all metrics come out of
+that one share matrix with a few array reductions:
+    max_share: share of the biggest category (0-1),
+    top_category / top_value: which category that is and its value,
+    hhi: Herfindahl-Hirschman index, the sum of the squared shares (1/18 = perfectly even, 1 = a single category),
+    entropy: Shannon entropy of the shares in nats (0 = a single category, ln(18) ≈ 2.89 = perfectly even).
+
+The rows can be anything, e.g. the country averages or every country-year of a PanelCube at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+CONCENTRATION_COLUMNS = ["max_share", "top_category", "top_value", "hhi", "entropy"]
+
+
+def concentration(values, categories):
+    """
+    Concentration metrics of every row.
+
+    Parameters:
+        values (np.ndarray): Category values along the last axis, shape (..., n_categories). NaN = missing.
+        categories (list): Name of every category.
+
+    Returns:
+        dict: CONCENTRATION_COLUMNS -> array of shape values.shape[:-1]. Rows without any data (or a zero total)
+        get NaN, and None as top_category.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values).all(axis=-1)
+    totals = np.nansum(values, axis=-1)
+    valid &= totals > 0
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = values / totals[..., np.newaxis]
+        # 0 * log(0) counts as 0, missing categories are left out
+        logs = np.log(np.where(shares > 0, shares, 1))
+
+    filled = np.where(np.isnan(values), -np.inf, values)
+    top = filled.argmax(axis=-1)
+    top_value = np.take_along_axis(values, top[..., np.newaxis], axis=-1)[..., 0]
+
+    return {
+        "max_share": np.where(valid, top_value / np.where(valid, totals, 1), np.nan),
+        "top_category": np.where(valid, np.asarray(categories, dtype=object)[top], None),
+        "top_value": np.where(valid, top_value, np.nan),
+        "hhi": np.where(valid, np.nansum(shares * shares, axis=-1), np.nan),
+        "entropy": np.where(valid, -np.nansum(shares * logs, axis=-1), np.nan),
+    }
+
+
+def category_concentration(frame):
+    """
+    Concentration of every row of a table, e.g. the per-country averages of the food categories.
+
+    Parameters:
+        frame (pd.DataFrame): One row per country (or anything else), one column per food category.
+
+    Returns:
+        pd.DataFrame: Same index with mean_per_category, std_per_category and CONCENTRATION_COLUMNS.
+    """
+    metrics = pd.DataFrame(
+        {
+            "mean_per_category": frame.mean(axis=1),
+            "std_per_category": frame.std(axis=1),
+        }
+    )
+    for column, result in concentration(frame.to_numpy(dtype=np.float64), list(frame.columns)).items():
+        metrics[column] = result
+    return metrics
+
+
+def country_year_concentration(cube):
+    """
+    Concentration of every country-year of a PanelCube, all of them in one pass.
+
+    Returns:
+        pd.DataFrame: One row per country-year that exists in the dataset, with country, year and
+        CONCENTRATION_COLUMNS.
+    """
+    metrics = concentration(cube.values, list(cube.categories))
+    present = cube.present()
+    country_pos, year_pos = np.nonzero(present)
+
+    table = pd.DataFrame(
+        {
+            "country": cube.countries.to_numpy()[country_pos],
+            "year": cube.years.to_numpy()[year_pos],
+        }
+    )
+    for column in CONCENTRATION_COLUMNS:
+        table[column] = metrics[column][present]
+    return table
+
+
+def concentration_change(table, metric="hhi"):
+    """
+    Change of one metric between the first and the last year of every country in a country_year_concentration() table.
+
+    Returns:
+        pd.DataFrame: One row per country with first_year, last_year, first, last and change (last - first).
+    """
+    ordered = table.sort_values(["country", "year"])
+    grouped = ordered.groupby("country")
+    change = pd.DataFrame(
+        {
+            "first_year": grouped["year"].first(),
+            "last_year": grouped["year"].last(),
+            "first": grouped[metric].first(),
+            "last": grouped[metric].last(),
+        }
+    )
+    change["change"] = change["last"] - change["first"]
+    return change
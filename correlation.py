@@ -0,0 +1,232 @@
+"""
+Correlation matrices of the dataset for any slice of years and continents, without rescanning the data.
+
+A CovarianceState holds what a Pearson correlation needs: the number of rows, the column means and the co-moments
+(sum of (x - mean_x) * (y - mean_y) for every pair of columns). Two states can be merged exactly (Chan et al.'s
+parallel update, which also works for many states at once), so CorrelationEngine keeps one state per
+(year, continent) cell of the data and builds every view by merging cells:
+    per year = the cells of that year, per continent = the cells of that continent,
+    rolling windows = the cells of some consecutive years, global = all cells.
+Each of those is one weighted sum over the cell arrays instead of another df.corr() over the full table.
+
+Spearman is Pearson on the ranks, but the ranks depend on which rows are in the view, so those are computed once per
+view from the kept rows and cached. Rows with missing values are left out (the dataset has none).
+"""
+
+import numpy as np
+import pandas as pd
+
+from countries import country_index
+from dataset import COUNTRY_COLUMN, YEAR_COLUMN
+
+
+class CovarianceState:
+    """
+    Mergeable count, means and co-moments of a set of rows.
+
+    Parameters:
+        columns (list): Column names.
+        count (int): Number of rows.
+        mean (np.ndarray): Mean of every column, shape (n_columns,).
+        comoment (np.ndarray): Co-moment matrix, shape (n_columns, n_columns).
+    """
+
+    def __init__(self, columns, count=0, mean=None, comoment=None):
+        self.columns = pd.Index(columns)
+        k = len(self.columns)
+        self.count = count
+        self.mean = np.zeros(k) if mean is None else mean
+        self.comoment = np.zeros((k, k)) if comoment is None else comoment
+
+    @classmethod
+    def from_array(cls, values, columns):
+        """State of the rows of a (rows × columns) array."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values) == 0:
+            return cls(columns)
+        mean = values.mean(axis=0)
+        centered = values - mean
+        return cls(columns, len(values), mean, centered.T @ centered)
+
+    def merge(self, other):
+        """State of the rows of both states together (neither of them is changed)."""
+        if self.count == 0:
+            return other
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.count * other.count / count
+        return CovarianceState(self.columns, count, mean, comoment)
+
+    __add__ = merge
+
+    @classmethod
+    def combine(cls, columns, counts, means, comoments):
+        """
+        Merge many states in one step.
+
+        Parameters:
+            columns (list): Column names.
+            counts (np.ndarray): Row count of every state, shape (n_states,).
+            means (np.ndarray): Column means of every state, shape (n_states, n_columns).
+            comoments (np.ndarray): Co-moments of every state, shape (n_states, n_columns, n_columns).
+
+        Returns:
+            CovarianceState: State of all their rows together.
+        """
+        count = counts.sum()
+        if count == 0:
+            return cls(columns)
+        mean = counts @ means / count
+        # the co-moments around the common mean: each state's own plus its mean offset, weighted by its rows
+        offsets = means - mean
+        comoment = comoments.sum(axis=0) + np.einsum("s,si,sj->ij", counts, offsets, offsets)
+        return cls(columns, int(count), mean, comoment)
+
+    def covariance(self, ddof=1):
+        """Covariance matrix as a DataFrame (NaN with too few rows)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = self.comoment / (self.count - ddof) if self.count > ddof else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(covariance, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Pearson correlation matrix as a DataFrame (NaN for constant columns, like df.corr())."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = np.sqrt(np.diag(self.comoment))
+            correlation = self.comoment / np.outer(scale, scale)
+        # rounding can push a perfect correlation just past 1
+        correlation = np.clip(correlation, -1, 1)
+        return pd.DataFrame(correlation, index=self.columns, columns=self.columns)
+
+
+class CorrelationEngine:
+    """
+    Covariance states per (year, continent) cell of the long dataset, merged on demand.
+
+    Parameters:
+        values (np.ndarray): Numeric rows, shape (rows, columns).
+        columns (list): Column names.
+        years (np.ndarray): Year of every row.
+        continents (np.ndarray): Continent code of every row (NaN for an unknown country).
+    """
+
+    def __init__(self, values, columns, years, continents):
+        self.columns = pd.Index(columns)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.row_years = np.asarray(years)
+        self.row_continents = pd.Series(continents, dtype=object).fillna("unknown").to_numpy()
+        self.years = sorted(set(self.row_years.tolist()))
+        self.continents = sorted(set(self.row_continents.tolist()))
+
+        # one state per cell, the only pass over the rows; kept as stacked arrays so any set of cells merges at once
+        cells = pd.DataFrame({"year": self.row_years, "continent": self.row_continents})
+        states = {
+            key: CovarianceState.from_array(self.values[rows], self.columns)
+            for key, rows in cells.groupby(["year", "continent"]).indices.items()
+        }
+        self._cell_years = np.array([year for year, _ in states])
+        self._cell_continents = np.array([continent for _, continent in states], dtype=object)
+        self._counts = np.array([state.count for state in states.values()], dtype=np.float64)
+        self._means = np.stack([state.mean for state in states.values()])
+        self._comoments = np.stack([state.comoment for state in states.values()])
+        self._ranked = {}
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        """
+        Build the engine from the long dataset.
+
+        Parameters:
+            df (pd.DataFrame): Dataset with country and year columns.
+            columns (list): Columns to correlate, all numeric columns by default (like df.corr(numeric_only=True)).
+
+        Returns:
+            CorrelationEngine: The engine.
+        """
+        if columns is None:
+            columns = list(df.select_dtypes("number").columns)
+        countries = df[COUNTRY_COLUMN].astype(str)
+        continents = country_index(countries.unique()).map(countries, "continent").to_numpy()
+        return cls(df[columns].to_numpy(dtype=np.float64), columns, df[YEAR_COLUMN].to_numpy(), continents)
+
+    def _select(self, years, continents):
+        years = self.years if years is None else list(np.atleast_1d(years))
+        continents = self.continents if continents is None else list(np.atleast_1d(continents))
+        return tuple(years), tuple(continents)
+
+    def state(self, years=None, continents=None):
+        """Merged CovarianceState of the given years and continents (all of them by default)."""
+        years, continents = self._select(years, continents)
+        cells = np.isin(self._cell_years, years) & np.isin(self._cell_continents, continents)
+        return CovarianceState.combine(
+            self.columns, self._counts[cells], self._means[cells], self._comoments[cells]
+        )
+
+    def _spearman(self, years, continents):
+        key = self._select(years, continents)
+        if key not in self._ranked:
+            rows = np.isin(self.row_years, key[0]) & np.isin(self.row_continents, key[1])
+            ranks = pd.DataFrame(self.values[rows]).rank().to_numpy()
+            self._ranked[key] = CovarianceState.from_array(ranks, self.columns).correlation()
+        return self._ranked[key]
+
+    def correlation(self, method="pearson", years=None, continents=None):
+        """
+        Correlation matrix of the rows of some years and continents.
+
+        Parameters:
+            method (str): "pearson" (from the merged states) or "spearman" (from the cached ranks of the view).
+            years (int or list): Year(s) to include, all by default.
+            continents (str or list): Continent code(s) to include (e.g. "AF"), all by default.
+
+        Returns:
+            pd.DataFrame: Columns × columns correlation matrix.
+        """
+        if method == "pearson":
+            return self.state(years, continents).correlation()
+        if method == "spearman":
+            return self._spearman(years, continents)
+        raise ValueError(f"Unknown method {method!r}, expected 'pearson' or 'spearman'")
+
+    def by_year(self, method="pearson"):
+        """Correlation matrix of every year, as a dict year -> DataFrame."""
+        return {year: self.correlation(method, years=year) for year in self.years}
+
+    def by_continent(self, method="pearson"):
+        """Correlation matrix of every continent, as a dict continent -> DataFrame."""
+        return {continent: self.correlation(method, continents=continent) for continent in self.continents}
+
+    def rolling(self, window=3, method="pearson"):
+        """
+        Correlation matrix of every run of `window` consecutive survey years.
+
+        Returns:
+            dict: (first_year, last_year) -> DataFrame.
+        """
+        return {
+            (self.years[i], self.years[i + window - 1]): self.correlation(method, years=self.years[i : i + window])
+            for i in range(len(self.years) - window + 1)
+        }
+
+    def with_column(self, column, views):
+        """
+        Correlation of every other column with one column, for several views at once.
+
+        Parameters:
+            column (str): Column to correlate with, e.g. "total_ug_per_kg".
+            views (dict): View name -> correlation matrix, e.g. the result of by_year().
+
+        Returns:
+            pd.DataFrame: The other columns as rows, one column per view.
+        """
+        return pd.DataFrame({name: matrix[column].drop(column) for name, matrix in views.items()})
+
+
+def as_correlations(data):
+    """Return data unchanged if it already is a CorrelationEngine, otherwise build one from the long frame."""
+    if isinstance(data, CorrelationEngine):
+        return data
+    return CorrelationEngine.from_frame(data)
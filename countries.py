@@ -0,0 +1,161 @@
+"""
+Country identity index: ISO-2, ISO-3 and continent code for every country name in the dataset.
+
+Resolving names with pycountry_convert is slow and a few of our names are not spelled the way the library expects,
+so the lookups used to fail silently for them (their continent was simply None). The index is built once,
+saved as country_index.csv next to this file, and every later lookup is a vectorized pandas map.
+
+Names that are not in the file yet are resolved in memory only; the file itself is only written by regenerating it:
+
+    python countries.py [processed_microplastics.csv]
+
+A name that cannot be resolved at all gets a warning and NaN codes, it never stops an analysis.
+"""
+
+import argparse
+import threading
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+INDEX_PATH = Path(__file__).with_name("country_index.csv")
+INDEX_FIELDS = ("iso2", "iso3", "continent")
+
+# dataset spellings that pycountry_convert does not recognize -> ISO-2 code
+ALIASES = {
+    "Antigua And Barbuda": "AG",
+    "Bosnia And Herzegovina": "BA",
+    "Cote D'Ivoire": "CI",
+    "The Gambia": "GM",
+    "Trinidad And Tobago": "TT",
+}
+
+
+def _resolve(name):
+    import pycountry
+    import pycountry_convert as pc
+
+    # any step can fail: an unknown name, a code pycountry does not know (get() gives None)
+    # or a code without a continent (e.g. AQ, TL, EH); CountryIndex.build warns about all of them
+    try:
+        iso2 = ALIASES.get(name) or pc.country_name_to_country_alpha2(name)
+        return {
+            "iso2": iso2,
+            "iso3": pycountry.countries.get(alpha_2=iso2).alpha_3,
+            "continent": pc.country_alpha2_to_continent_code(iso2),
+        }
+    except (LookupError, AttributeError):
+        return None
+
+
+class CountryIndex:
+    """
+    Lookup table from dataset country name to ISO-2, ISO-3 and continent code.
+
+    Parameters:
+        table (pd.DataFrame): Country names as index, INDEX_FIELDS as columns.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def build(cls, names):
+        """
+        Resolve every name once (this is the only place that talks to pycountry).
+
+        Names that cannot be resolved are left out with a warning, so map() gives NaN for them.
+        """
+        resolved = {name: _resolve(name) for name in sorted(set(names))}
+        unknown = [name for name, codes in resolved.items() if codes is None]
+        if unknown:
+            warnings.warn(
+                f"Cannot resolve countries {unknown}, their codes and continent are NaN "
+                f"(add their ISO-2 codes to countries.ALIASES)",
+                stacklevel=3,
+            )
+        resolved = {name: codes for name, codes in resolved.items() if codes is not None}
+        table = pd.DataFrame(
+            list(resolved.values()), index=pd.Index(list(resolved), name="country"), columns=list(INDEX_FIELDS)
+        )
+        return cls(table)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        return cls(pd.read_csv(path, index_col="country", keep_default_na=False))
+
+    def save(self, path=INDEX_PATH):
+        self.table.to_csv(path)
+
+    def __contains__(self, name):
+        return name in self.table.index
+
+    def map(self, names, field="iso3"):
+        """
+        Look up one field for many names at once.
+
+        Parameters:
+            names (iterable): Country names as they are spelled in the dataset.
+            field (str): "iso2", "iso3" or "continent".
+
+        Returns:
+            pd.Series: The field for every name (same order and index as a Series input), NaN for unknown names.
+        """
+        if field not in INDEX_FIELDS:
+            raise ValueError(f"Unknown field {field!r}, expected one of {INDEX_FIELDS}")
+        if not isinstance(names, pd.Series):
+            names = pd.Series(list(names), dtype=object)
+        return names.astype(object).map(self.table[field])
+
+
+_index = None
+# names that could not be resolved, so they are only tried (and warned about) once per process
+_unresolved = set()
+# the Streamlit sessions run on their own threads and share the index
+_lock = threading.Lock()
+
+
+def country_index(names=None):
+    """
+    The shared index, loaded from country_index.csv on first use.
+
+    Parameters:
+        names (iterable): Optional names that must be in the index. Missing ones are resolved and added
+            in memory, so a new country in the data is picked up without touching country_index.csv.
+
+    Returns:
+        CountryIndex: The index.
+    """
+    global _index
+    with _lock:
+        if _index is None:
+            _index = CountryIndex.load() if INDEX_PATH.exists() else CountryIndex(
+                pd.DataFrame(columns=list(INDEX_FIELDS), index=pd.Index([], name="country"))
+            )
+
+        missing = [] if names is None else sorted(
+            {name for name in names if name not in _index and name not in _unresolved}
+        )
+        if missing:
+            added = CountryIndex.build(missing).table
+            _unresolved.update(set(missing) - set(added.index))
+            _index = CountryIndex(pd.concat([_index.table, added]).sort_index())
+        return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate country_index.csv from the country names of the dataset")
+    parser.add_argument("filepath", nargs="?", default="processed_microplastics.csv", help="dataset CSV")
+    args = parser.parse_args()
+
+    from dataset import COUNTRY_COLUMN
+
+    names = pd.read_csv(args.filepath, usecols=[COUNTRY_COLUMN])[COUNTRY_COLUMN].unique()
+    index = CountryIndex.build(names)
+    index.save()
+    print(f"Saved {len(index.table)} countries to {INDEX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Dense country × year × category representation of the dataset.
+
+The long-format DataFrame is convenient to load, but most of our questions slice it by country and year again and again,
+and every boolean mask like df[(df["country"] == c) & (df["year"] == y)] scans the whole table.
+A PanelCube is built once from the loaded frame and turns those slices into plain array indexing.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from dataset import COUNTRY_COLUMN, FOOD_COLUMNS, TOTAL_COLUMN, YEAR_COLUMN
+
+AXES = ("country", "year", "category")
+
+
+class PanelCube:
+    """
+    Dense ndarray of shape (countries, years, categories) with label indexes.
+
+    Country-years that are missing from the dataset are NaN, so every reduction is NaN-aware
+    and gives the same numbers as the matching groupby on the long frame.
+
+    Parameters:
+        values (np.ndarray): Array of shape (countries, years, categories).
+        countries (pd.Index): Country labels of the first axis.
+        years (pd.Index): Year labels of the second axis (sorted).
+        categories (pd.Index): Category labels of the third axis.
+        total (np.ndarray): Optional (countries, years) array with total_ug_per_kg.
+    """
+
+    def __init__(self, values, countries, years, categories, total=None):
+        self.values = values
+        self.countries = pd.Index(countries, name="country")
+        self.years = pd.Index(years, name="year")
+        self.categories = pd.Index(categories, name="category")
+        self.total = total
+
+        # label -> position lookups, so get() is O(1) instead of a search through the index
+        self._country_pos = {country: i for i, country in enumerate(self.countries)}
+        self._year_pos = {year: i for i, year in enumerate(self.years)}
+
+    @classmethod
+    def from_frame(cls, df, categories=None):
+        """
+        Build a cube from the long-format dataset.
+
+        Parameters:
+            df (pd.DataFrame): Dataset with one row per (country, year).
+            categories (list): Value columns to put on the category axis, the 18 food columns by default.
+
+        Returns:
+            PanelCube: The cube.
+        """
+        if categories is None:
+            categories = [col for col in FOOD_COLUMNS if col in df.columns]
+
+        country_codes, countries = pd.factorize(df[COUNTRY_COLUMN], sort=True)
+        year_codes, years = pd.factorize(df[YEAR_COLUMN], sort=True)
+
+        if pd.MultiIndex.from_arrays([country_codes, year_codes]).has_duplicates:
+            raise ValueError("PanelCube needs at most one row per (country, year)")
+
+        block = df[categories].to_numpy()
+        dtype = block.dtype if np.issubdtype(block.dtype, np.floating) else np.float64
+        values = np.full((len(countries), len(years), len(categories)), np.nan, dtype=dtype)
+        values[country_codes, year_codes] = block
+
+        total = None
+        if TOTAL_COLUMN in df.columns:
+            total = np.full((len(countries), len(years)), np.nan, dtype=dtype)
+            total[country_codes, year_codes] = df[TOTAL_COLUMN].to_numpy()
+
+        return cls(values, np.asarray(countries), np.asarray(years), categories, total)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def present(self):
+        """Boolean (countries, years) mask of the country-years that exist in the dataset."""
+        return ~np.isnan(self.values).all(axis=2)
+
+    def get(self, country, year):
+        """Category values for one country and year as a Series (all NaN if the pair is missing)."""
+        row = self.values[self._country_pos[country], self._year_pos[year]]
+        return pd.Series(row, index=self.categories, name=(country, year))
+
+    def column(self, name):
+        """One category (or total_ug_per_kg) as a countries × years DataFrame."""
+        if name == TOTAL_COLUMN and self.total is not None:
+            block = self.total
+        else:
+            block = self.values[:, :, self.categories.get_loc(name)]
+        return pd.DataFrame(block, index=self.countries, columns=self.years)
+
+    def _axes(self, over):
+        over = (over,) if isinstance(over, str) else tuple(over)
+        unknown = set(over) - set(AXES)
+        if unknown:
+            raise ValueError(f"Unknown axis {sorted(unknown)}, expected one of {AXES}")
+        return tuple(AXES.index(axis) for axis in over)
+
+    def _label(self, array, kept_axes):
+        labels = {"country": self.countries, "year": self.years, "category": self.categories}
+        indexes = [labels[AXES[axis]] for axis in kept_axes]
+        if len(indexes) == 0:
+            return float(array)
+        if len(indexes) == 1:
+            return pd.Series(array, index=indexes[0])
+        if len(indexes) == 2:
+            return pd.DataFrame(array, index=indexes[0], columns=indexes[1])
+        return array
+
+    def _reduce(self, func, over):
+        axes = self._axes(over)
+        kept = tuple(axis for axis in range(3) if axis not in axes)
+        with warnings.catch_warnings():
+            # all-NaN slices (e.g. a country missing a whole year) are allowed and simply give NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            result = func(self.values, axis=axes)
+        return self._label(result, kept)
+
+    def mean(self, over):
+        """
+        NaN-aware mean over one or more axes.
+
+        Parameters:
+            over (str or tuple): Axis name(s) to reduce, out of "country", "year" and "category".
+
+        Returns:
+            Labelled result for the remaining axes: DataFrame for two, Series for one, float for none.
+            For example mean(over="country") equals df.groupby("year")[food_columns].mean().
+        """
+        return self._reduce(np.nanmean, over)
+
+    def sum(self, over):
+        """NaN-aware sum over one or more axes, see mean()."""
+        return self._reduce(np.nansum, over)
+
+    def share(self, along="category"):
+        """
+        Every cell divided by the sum of its slice along an axis.
+
+        share("category") gives the contribution of each category to its country-year total,
+        share("country") gives each country's part of the yearly category total.
+
+        Returns:
+            PanelCube: Cube with the same labels holding the shares (0-1).
+        """
+        (axis,) = self._axes(along)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = self.values / np.nansum(self.values, axis=axis, keepdims=True)
+        return PanelCube(shares, self.countries, self.years, self.categories)
+
+    def rank(self, along="category", ascending=False):
+        """
+        Rank the cells within each slice along an axis (1 = largest by default, ties get the average rank).
+
+        Returns:
+            PanelCube: Cube with the same labels holding the ranks, NaN stays NaN.
+        """
+        (axis,) = self._axes(along)
+        moved = np.moveaxis(self.values, axis, -1)
+        flat = moved.reshape(-1, moved.shape[-1])
+        ranks = pd.DataFrame(flat).rank(axis=1, ascending=ascending).to_numpy()
+        ranks = np.moveaxis(ranks.reshape(moved.shape), -1, axis)
+        return PanelCube(ranks, self.countries, self.years, self.categories)
+
+    def growth(self, start_year=None, end_year=None):
+        """
+        Growth of every (country, category) pair between a start and an end year, in one vectorized pass.
+
+        Parameters:
+            start_year (int): First year to compare. None uses the first year each country has data for.
+            end_year (int): Last year to compare. None uses the last year each country has data for.
+
+        Returns:
+            pd.DataFrame: One row per country × category (total_ug_per_kg included as its own category, if the cube has it)
+            with start/end year and value, period_years, slope_per_year, slope_percent_per_year and CAGR.
+            Values are NaN where a country has no data for its start or end year.
+        """
+        values = self.values
+        categories = list(self.categories)
+        if self.total is not None:
+            values = np.concatenate([values, self.total[:, :, np.newaxis]], axis=2)
+            categories.append(TOTAL_COLUMN)
+
+        present = self.present()
+        n_countries, n_years = present.shape
+        year_labels = self.years.to_numpy().astype(np.int64)
+
+        def year_positions(year, last):
+            if year is not None:
+                pos = np.full(n_countries, self._year_pos.get(year, -1))
+            elif last:
+                pos = n_years - 1 - present[:, ::-1].argmax(axis=1)
+            else:
+                pos = present.argmax(axis=1)
+            # a country without any data (or a year that is not in the cube) has no position
+            return np.where(present.any(axis=1) & (pos >= 0), pos, -1)
+
+        start_pos = year_positions(start_year, last=False)
+        end_pos = year_positions(end_year, last=True)
+
+        rows = np.arange(n_countries)
+        start_ok = (start_pos >= 0) & present[rows, start_pos]
+        end_ok = (end_pos >= 0) & present[rows, end_pos]
+
+        start_values = np.where(start_ok[:, np.newaxis], values[rows, start_pos], np.nan)
+        end_values = np.where(end_ok[:, np.newaxis], values[rows, end_pos], np.nan)
+
+        start_years = year_labels[start_pos] if start_year is None else np.full(n_countries, start_year)
+        end_years = year_labels[end_pos] if end_year is None else np.full(n_countries, end_year)
+        period = (end_years - start_years)[:, np.newaxis]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            slope = np.where(period > 0, (end_values - start_values) / period, np.nan)
+            slope_percent = np.where(end_values != 0, slope / end_values * 100, np.nan)
+            cagr = np.where(
+                (start_values > 0) & (end_values >= 0) & (period > 0),
+                (end_values / start_values) ** (1 / np.where(period > 0, period, 1)) - 1,
+                np.nan,
+            )
+
+        n_categories = len(categories)
+        return pd.DataFrame(
+            {
+                "country": np.repeat(self.countries.to_numpy(), n_categories),
+                "food_category": np.tile(categories, n_countries),
+                "start_year": np.repeat(start_years, n_categories),
+                "end_year": np.repeat(end_years, n_categories),
+                "start_value": start_values.ravel(),
+                "end_value": end_values.ravel(),
+                "period_years": np.repeat(period.ravel(), n_categories),
+                "slope_per_year": slope.ravel(),
+                "slope_percent_per_year": slope_percent.ravel(),
+                "CAGR": cagr.ravel(),
+            }
+        )
+
+
+def as_cube(data):
+    """Return data unchanged if it already is a PanelCube, otherwise build one from the long frame."""
+    if isinstance(data, PanelCube):
+        return data
+    return PanelCube.from_frame(data)
@@ -0,0 +1,380 @@
+"""
+Dataset loading with a binary sidecar cache.
+
+Parsing the CSV is the slowest part of every run (and every Streamlit session pays it again),
+so the first load writes an Arrow IPC file next to the CSV. Later loads memory-map that file instead.
+The sidecar holds the frame exactly as load_dataset returns it (float32 by default), so a load copies nothing;
+asking for float64 parses the CSV once more and keeps its own sidecar.
+The sidecar remembers the size, mtime and SHA-256 of the CSV it was built from and is rebuilt as soon as the CSV changes.
+
+Every loaded frame goes through a declared schema: `country` is categorical, `year` is int16 and the
+food columns plus `total_ug_per_kg` are float32 (float64 on request), sorted by (country, year).
+"""
+
+import gzip
+import hashlib
+import io
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+SIDECAR_SUFFIX = ".arrow"
+
+COUNTRY_COLUMN = "country"
+YEAR_COLUMN = "year"
+TOTAL_COLUMN = "total_ug_per_kg"
+FOOD_COLUMNS = [
+    "cheese",
+    "yoghurt",
+    "total_milk",
+    "fruits",
+    "refined_grains",
+    "whole_grains",
+    "nuts_and_seeds",
+    "total_processed_meats",
+    "unprocessed_red_meats",
+    "fish",
+    "shellfish",
+    "eggs",
+    "total_salt",
+    "added_sugars",
+    "non-starchy_vegetables",
+    "potatoes",
+    "other_starchy_vegetables",
+    "beans_and_legumes",
+]
+VALUE_COLUMNS = FOOD_COLUMNS + [TOTAL_COLUMN]
+
+# float32 halves the memory of the value columns and is more than precise enough for µg/kg figures
+DEFAULT_FLOAT_DTYPE = "float32"
+
+# keys stored in the Arrow schema metadata to describe the source CSV
+_META_SIZE = b"source_size"
+_META_MTIME = b"source_mtime_ns"
+_META_SHA256 = b"source_sha256"
+_META_SCHEMA = b"schema_version"
+_META_FLOAT = b"float_dtype"
+
+# bump whenever apply_schema changes, so old sidecars get rebuilt
+SCHEMA_VERSION = "2"
+
+# formats offered for download: name -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "csv.gz": ("application/gzip", ".csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def sidecar_path(filepath, float_dtype=DEFAULT_FLOAT_DTYPE):
+    """Return the path of the binary sidecar belonging to a CSV file (and float dtype)."""
+    filepath = Path(filepath)
+    if float_dtype == DEFAULT_FLOAT_DTYPE:
+        return filepath.with_name(f".{filepath.stem}{SIDECAR_SUFFIX}")
+    return filepath.with_name(f".{filepath.stem}.{float_dtype}{SIDECAR_SUFFIX}")
+
+
+def apply_schema(df, float_dtype=DEFAULT_FLOAT_DTYPE):
+    """
+    Cast the dataset to its declared compact schema and sort it by (country, year).
+
+    Parameters:
+        df (pd.DataFrame): Dataset as parsed from the CSV.
+        float_dtype (str): dtype for the food and total columns, "float32" (default) or "float64".
+
+    Returns:
+        pd.DataFrame: Typed and sorted copy of the dataset. Columns keep their order.
+    """
+    dtypes = {COUNTRY_COLUMN: "category", YEAR_COLUMN: "int16"}
+    dtypes.update({col: float_dtype for col in VALUE_COLUMNS if col in df.columns})
+
+    df = df.astype(dtypes)
+    return df.sort_values([COUNTRY_COLUMN, YEAR_COLUMN], ignore_index=True)
+
+
+def memory_report(df):
+    """
+    Compare the memory of a typed dataset with the same data in the default CSV dtypes.
+
+    Returns:
+        dict: "before_bytes" (object strings, int64, float64), "after_bytes" (current dtypes) and "saved_percent".
+    """
+    untyped = {COUNTRY_COLUMN: object, YEAR_COLUMN: "int64"}
+    untyped.update({col: "float64" for col in VALUE_COLUMNS if col in df.columns})
+
+    before = int(df.astype(untyped).memory_usage(deep=True).sum())
+    after = int(df.memory_usage(deep=True).sum())
+    return {
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_percent": (1 - after / before) * 100 if before else 0.0,
+    }
+
+
+def file_sha256(filepath, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def unchanged_source(source, filepath, stat):
+    """
+    Check whether a file is still the one a cache file was built from.
+
+    Parameters:
+        source (dict): "size", "mtime_ns" and "sha256" of the file, as saved with the cache.
+        filepath (str or Path): Path to the file.
+        stat (os.stat_result): Current stat of the file.
+
+    Returns:
+        tuple: (unchanged, sha256). unchanged is True if size and mtime match, or if only the mtime differs and the
+        SHA-256 still matches. sha256 is the file's hash when it had to be computed (then the cache should be saved
+        again with the new mtime), otherwise None.
+    """
+    if source.get("size") != stat.st_size:
+        return False, None
+    if source.get("mtime_ns") == stat.st_mtime_ns:
+        return True, None
+    # the mtime alone changes on a plain copy or checkout, so only a different hash means different data
+    sha256 = file_sha256(filepath)
+    return source.get("sha256") == sha256, sha256
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    """
+    Open a temporary file next to `path`, which replaces `path` once the block finishes without an error.
+
+    A concurrent reader (another process, the app) never sees a half written file.
+
+    Parameters:
+        path (str or Path): File to write.
+        mode (str): "w" for text, "wb" for bytes.
+    """
+    path = Path(path)
+    # one name per process and thread, two sessions of the app can rebuild the same file at the same time
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        # only left over if writing failed
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _read_sidecar(path):
+    # memory-map the IPC file, so the column buffers are paged in from the OS cache instead of being copied
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table
+
+
+def _write_sidecar(df, path, size, mtime_ns, sha256, float_dtype):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update(
+        {
+            _META_SIZE: str(size).encode(),
+            _META_MTIME: str(mtime_ns).encode(),
+            _META_SHA256: sha256.encode(),
+            _META_SCHEMA: SCHEMA_VERSION.encode(),
+            _META_FLOAT: float_dtype.encode(),
+        }
+    )
+    table = table.replace_schema_metadata(metadata)
+
+    with atomic_write(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _parse_csv(filepath, float_dtype):
+    return apply_schema(pd.read_csv(filepath), float_dtype=float_dtype)
+
+
+def load_dataset(filepath, use_cache=True, float_dtype=DEFAULT_FLOAT_DTYPE):
+    """
+    Load the microplastics CSV, going through the binary sidecar whenever possible.
+
+    Parameters:
+        filepath (str or Path): Path to the CSV file.
+        use_cache (bool): Set to False to always parse the CSV and never touch the sidecar.
+        float_dtype (str): dtype for the food and total columns, "float32" (default) or "float64".
+
+    Returns:
+        pd.DataFrame: The dataset in its declared schema (see apply_schema).
+    """
+    filepath = Path(filepath)
+    if not use_cache:
+        return _parse_csv(filepath, float_dtype)
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        # without pyarrow there is no sidecar, we simply parse the CSV
+        return _parse_csv(filepath, float_dtype)
+
+    stat = filepath.stat()
+    cache = sidecar_path(filepath, float_dtype)
+    sha256 = None
+
+    if cache.exists():
+        try:
+            table = _read_sidecar(cache)
+        except (OSError, ValueError):
+            # broken or foreign file, it gets rebuilt below
+            table = None
+
+        metadata = (table.schema.metadata or {}) if table is not None else {}
+        same_schema = metadata.get(_META_SCHEMA) == SCHEMA_VERSION.encode()
+        if same_schema and metadata.get(_META_FLOAT) == float_dtype.encode():
+            unchanged, sha256 = unchanged_source(_sidecar_source(metadata), filepath, stat)
+            if unchanged and sha256 is None:
+                return table.to_pandas(split_blocks=True)
+            if unchanged:
+                # same data under a new mtime, the sidecar is saved again with it
+                df = table.to_pandas()
+                _try_write_sidecar(df, cache, stat, sha256, float_dtype)
+                return df
+
+    df = _parse_csv(filepath, float_dtype)
+    if sha256 is None:
+        sha256 = file_sha256(filepath)
+    _try_write_sidecar(df, cache, stat, sha256, float_dtype)
+    return df
+
+
+def _sidecar_source(metadata):
+    # the Arrow schema metadata holds bytes, unchanged_source compares numbers
+    try:
+        return {
+            "size": int(metadata[_META_SIZE]),
+            "mtime_ns": int(metadata[_META_MTIME]),
+            "sha256": metadata[_META_SHA256].decode(),
+        }
+    except (KeyError, ValueError):
+        return {}
+
+
+def _try_write_sidecar(df, cache, stat, sha256, float_dtype):
+    # a read-only checkout (e.g. a deployed app) still works, it just never gets the cache
+    try:
+        _write_sidecar(df, cache, stat.st_size, stat.st_mtime_ns, sha256, float_dtype)
+    except OSError:
+        pass
+
+
+def export_bytes(filepath, fmt="csv"):
+    """
+    The dataset as the bytes of a downloadable file.
+
+    Parameters:
+        filepath (str or Path): Path to the CSV file.
+        fmt (str): "csv" (the file as it is), "csv.gz" (gzip-compressed CSV) or "parquet" (typed columns, needs pyarrow).
+
+    Returns:
+        bytes: File content.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {list(EXPORT_FORMATS)}")
+
+    if fmt == "parquet":
+        buffer = io.BytesIO()
+        # float64 keeps the values exactly as they are in the CSV
+        df = load_dataset(filepath, float_dtype="float64")
+        df.to_parquet(buffer, index=False, compression="zstd")
+        return buffer.getvalue()
+
+    with open(filepath, "rb") as f:
+        data = f.read()
+    if fmt == "csv.gz":
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return data
+
+
+class LazyDataset:
+    """
+    Shared handle to the dataset that only loads it on first access.
+
+    Importing a module that holds a LazyDataset costs nothing, the CSV (or its sidecar) is read the first time
+    someone asks for `.df`, and every caller after that gets the same DataFrame.
+
+    Parameters:
+        filepath (str or Path): Path to the CSV file.
+        float_dtype (str): dtype for the food and total columns, "float32" (default) or "float64".
+    """
+
+    def __init__(self, filepath, float_dtype=DEFAULT_FLOAT_DTYPE):
+        self.filepath = Path(filepath)
+        self.float_dtype = float_dtype
+        self._df = None
+        self._cube = None
+        self._mtime_ns = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._df is not None
+
+    @property
+    def df(self):
+        if self._df is None:
+            # several Streamlit sessions can ask at the same time, only one of them should parse the file
+            with self._lock:
+                if self._df is None:
+                    self._mtime_ns = self.filepath.stat().st_mtime_ns
+                    self._df = load_dataset(self.filepath, float_dtype=self.float_dtype)
+        return self._df
+
+    @property
+    def cube(self):
+        """PanelCube of the dataset, built once on first access. Its arrays are read-only, every caller shares them."""
+        if self._cube is None:
+            from cube import PanelCube
+
+            df = self.df
+            with self._lock:
+                if self._cube is None:
+                    cube = PanelCube.from_frame(df)
+                    cube.values.setflags(write=False)
+                    if cube.total is not None:
+                        cube.total.setflags(write=False)
+                    self._cube = cube
+        return self._cube
+
+    def refresh(self):
+        """
+        Drop the loaded data if the file changed since it was loaded, so the next access reads the new version.
+
+        Returns:
+            bool: True if loaded data was dropped.
+        """
+        with self._lock:
+            if self._df is None or self.filepath.stat().st_mtime_ns == self._mtime_ns:
+                return False
+            self._df = None
+            self._cube = None
+            return True
+
+    def configure(self, filepath=None, float_dtype=None):
+        """Point the handle to another file or dtype, dropping the loaded data if anything changed."""
+        filepath = self.filepath if filepath is None else Path(filepath)
+        float_dtype = self.float_dtype if float_dtype is None else float_dtype
+        if (filepath, float_dtype) != (self.filepath, self.float_dtype):
+            with self._lock:
+                self.filepath = filepath
+                self.float_dtype = float_dtype
+                self._df = None
+                self._cube = None
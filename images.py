@@ -0,0 +1,40 @@
+"""
+Display versions of the main.py chart images for the app.
+
+The charts are saved by matplotlib at 1000-1200 px wide, while the centered page layout shows them at about 700 px.
+chart_variant() scales a chart down to the display width once and stores it as a 256-color PNG, which is 3-4 times
+smaller than the original and looks the same for flat-colored charts.
+
+PNG on purpose: st.image passes PNG bytes through untouched, but converts every other format (WebP included) back
+to PNG or JPEG on every call.
+"""
+
+import io
+
+# content width of layout="centered"
+DISPLAY_WIDTH = 704
+
+
+def chart_variant(path, width=DISPLAY_WIDTH):
+    """
+    Chart image scaled down to the display width.
+
+    Parameters:
+        path (str): Path to the PNG written by main.py.
+        width (int): Maximum width in pixels, narrower images keep their size.
+
+    Returns:
+        bytes: The image as a palette PNG.
+    """
+    from PIL import Image
+
+    with Image.open(path) as image:
+        # the charts have a plain white background, the alpha channel only adds bytes
+        image = image.convert("RGB")
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    image.quantize(colors=256).save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
@@ -0,0 +1,79 @@
+"""
+Precomputed results of main.py for the Streamlit pages.
+
+main.py writes every table and number the Insights page shows into one small, versioned JSON file
+(output/insights.json by default). The page only reads that file, so it never recomputes anything per request
+and never shows numbers that were copied by hand from an older run.
+"""
+
+import json
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from dataset import atomic_write
+
+INSIGHTS_VERSION = 2
+INSIGHTS_NAME = "insights.json"
+
+
+def _table_to_dict(table):
+    # a Series is stored as a one column table, so every table has the same layout on disk
+    if isinstance(table, pd.Series):
+        table = table.to_frame(table.name if table.name is not None else "value")
+    split = json.loads(table.to_json(orient="split", double_precision=10))
+    return {
+        "index_name": table.index.name,
+        "index": split["index"],
+        "columns": split["columns"],
+        "data": split["data"],
+    }
+
+
+def _table_from_dict(data):
+    return pd.DataFrame(
+        data["data"],
+        index=pd.Index(data["index"], name=data["index_name"]),
+        columns=data["columns"],
+    )
+
+
+def save_insights(path, values, tables, source=None):
+    """
+    Write the results artifact.
+
+    Parameters:
+        path (str or Path): Where to write the JSON file.
+        values (dict): Single numbers and labels (plain JSON types), e.g. the overall average.
+        tables (dict): pd.DataFrame or pd.Series per table name.
+        source (dict): Optional description of the data the results were computed from (file, sha256, rows).
+    """
+    data = {
+        "version": INSIGHTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": source or {},
+        "values": values,
+        "tables": {name: _table_to_dict(table) for name, table in tables.items()},
+    }
+    # the app never reads a half written artifact
+    with atomic_write(path) as f:
+        json.dump(data, f, indent=1)
+
+
+def load_insights(path):
+    """
+    Read the results artifact written by save_insights().
+
+    Returns:
+        dict: "created_at", "source", "values" and "tables" (every table as a pd.DataFrame).
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != INSIGHTS_VERSION:
+        raise ValueError(
+            f"{path} was written by an incompatible version of main.py, run main.py again to rebuild it"
+        )
+    data["tables"] = {
+        name: _table_from_dict(table) for name, table in data["tables"].items()
+    }
+    return data
@@ -1,19 +1,43 @@
 # Basic imports
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import sys
+import argparse
 import os
-import pycountry_convert as pc
+import time
+from dataset import LazyDataset, file_sha256, memory_report
+from cube import as_cube
+from streaming import DEFAULT_CHUNK_SIZE, StreamingAggregates, aggregate_csv
+from aggregate_store import AggregateStore
+from rendering import collect_charts, print_render_report, render_charts, submit_chart
+from insights import INSIGHTS_NAME, save_insights
+from countries import country_index
+from trends import country_trends, fit_columns
+from bootstrap import DEFAULT_RESAMPLES, bootstrap_intervals, yearly_interval
+from correlation import as_correlations
+from concentration import category_concentration, concentration_change, country_year_concentration
+from windows import YearWindows
 
 pd.set_option("display.max_columns", None)
 pd.set_option("display.width", 1000)
 
-df = pd.read_csv("processed_microplastics.csv")
+DATA_PATH = "processed_microplastics.csv"
+OUTPUT_DIR = "output"
 
-if not os.path.exists("output"):
-    os.makedirs("output")
+# Nothing is read at import time. The dataset is parsed the first time an analysis asks for it,
+# and all of them share that one copy.
+dataset = LazyDataset(DATA_PATH)
+
+
+def __getattr__(name):
+    # `main.df` used to be loaded at import time, we keep it working but load it on first access
+    if name == "df":
+        return dataset.df
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def ensure_output_dir():
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
 
 
 """
@@ -25,11 +49,17 @@ if not os.path.exists("output"):
 """
 
 
-def load_and_inspect_data(filepath):
-    df = pd.read_csv(filepath)
+def load_and_inspect_data(filepath, float_dtype="float32"):
+    dataset.configure(filepath, float_dtype)
+    df = dataset.df
     print("\n")
     print("Taking a first look at the dataset:\n", df.head())
     print("Data types:\n", df.dtypes)
+    memory = memory_report(df)
+    print(
+        f"Memory usage: {memory['before_bytes'] / 1024:.1f} KiB with default dtypes, "
+        f"{memory['after_bytes'] / 1024:.1f} KiB with the declared schema ({memory['saved_percent']:.0f}% less)"
+    )
     print("\n")
     print("Checking for null values...\n", "Null values found:\n", df.isnull().sum())
     print("\n")
@@ -50,6 +80,7 @@ def create_lineplot(
     xlabel="X-axis",
     ylabel="Y-axis",
     marker="o",
+    band=None,
 ):
     """
     Create a line plot from a pandas Series or DataFrame with annotations for all lines.
@@ -60,8 +91,15 @@ def create_lineplot(
         xlabel (str): Label for x-axis.
         ylabel (str): Label for y-axis.
         marker (str): Marker style for plot lines.
+        band (pd.DataFrame): Optional interval to shade, with ci_low and ci_high for every x value.
     """
-    ax = input_data.plot(marker=marker, figsize=(10, 6))
+    # plotting libraries are only imported when a figure is actually drawn, runs without figures never pay for them
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if band is not None:
+        ax.fill_between(band.index, band["ci_low"], band["ci_high"], alpha=0.2, label="95% bootstrap interval")
+    input_data.plot(ax=ax, marker=marker)
 
     plt.title(title, fontsize=14)
     plt.xlabel(xlabel)
@@ -72,6 +110,8 @@ def create_lineplot(
     if isinstance(input_data, pd.Series):
         for x, y in zip(input_data.index, input_data.values):
             plt.text(x, y, f"{y:.1f}", ha="center", va="bottom", fontsize=9)
+        if band is not None:
+            plt.legend()
 
     # Add annotations for each column in a DataFrame
     elif isinstance(input_data, pd.DataFrame):
@@ -83,6 +123,7 @@ def create_lineplot(
 
     plt.tight_layout()
     plt.savefig(png_title)
+    plt.close(fig)
 
 
 """
@@ -97,31 +138,55 @@ Beginner Tasks:
 """
 
 
-def analyze_and_plot_microplastic_trends(df):
+def analyze_and_plot_microplastic_trends(df, intervals=None):
     """
     Prints the overall average microplastic content and plots yearly trends.
 
     Parameters:
-        df (pd.DataFrame): DataFrame containing 'year' and 'total_ug_per_kg' columns.
+        df (pd.DataFrame or StreamingAggregates): DataFrame containing 'year' and 'total_ug_per_kg' columns,
+            or the aggregates of a streamed CSV.
+        intervals (dict): Optional result of bootstrap_intervals(), adds the confidence intervals to the output.
+
+    Returns:
+        float: The overall average total_ug_per_kg.
     """
-    # 1. Overall average
-    overall_avg = df["total_ug_per_kg"].mean()
+    if isinstance(df, StreamingAggregates):
+        # streaming mode: both averages come from the merged per-year aggregates
+        overall_avg = df.overall("mean")["total_ug_per_kg"]
+        yearaverage = df.stat("year", "mean")["total_ug_per_kg"]
+    else:
+        # 1. Overall average
+        overall_avg = df["total_ug_per_kg"].mean()
+        # 2. Yearly average
+        yearaverage = df.groupby("year")["total_ug_per_kg"].mean()
+
     print(
         f"\nOverall average total_ug_per_kg across all countries and years: {overall_avg:.2f}\n"
     )
 
-    # 2. Yearly average
-    yearaverage = df.groupby("year")["total_ug_per_kg"].mean()
+    band = None
+    if intervals is not None:
+        # how sure we can be about these averages, given which countries happen to be in the data
+        overall_ci = intervals["category_means"].loc["total_ug_per_kg"]
+        print(f"95% bootstrap interval of the overall average: {overall_ci['ci_low']:.2f} - {overall_ci['ci_high']:.2f}\n")
+        band = yearly_interval(intervals["yearly_means"], "total_ug_per_kg")
+        print("Yearly average with its 95% bootstrap interval:\n")
+        print(band.round(2))
 
     # 3. Plot using existing custom function
-    create_lineplot(
+    submit_chart(
+        "output/1_total_ug_kg_year.png",
+        create_lineplot,
         input_data=yearaverage,
         png_title="output/1_total_ug_kg_year.png",
         title="Average total µg/kg (by Year)",
         xlabel="Year",
         ylabel="Average total µg/kg",
+        band=band,
     )
 
+    return float(overall_avg)
+
 
 """
 - Top Food Contributors:
@@ -146,9 +211,15 @@ def calculate_top_n_contaminated_categories(df, n, start_food_col, end_food_col,
         return key[1]
 
     food_columns = df.columns[start_food_col:end_food_col]
-   
+
+    # in streaming mode the column means come from the aggregates instead of the rows
+    if isinstance(df, StreamingAggregates):
+        column_means = df.overall("mean")
+    else:
+        column_means = df
+
     for column in food_columns:
-        mean_list.append([column, float(df[column].mean())])
+        mean_list.append([column, float(column_means[column].mean())])
     mean_list.sort(key=sorting_by_avg, reverse=True)
     if verbose:
         print("\nThree food categories with the highest microplastic content: \n", mean_list[:n])
@@ -160,6 +231,19 @@ def plot_top_n_contaminated_categories(df, n, mean_list):
     top_n_categories = [category for category, average in mean_list[:n]]
     top_n_averages = [average for category, average in mean_list[:n]]
 
+    submit_chart(
+        "output/2_average_consumption_top_n_food_categories.png",
+        render_top_n_contaminated_categories,
+        top_n_categories,
+        top_n_averages,
+    )
+
+    return top_n_categories
+
+
+def render_top_n_contaminated_categories(top_n_categories, top_n_averages):
+    import matplotlib.pyplot as plt
+
     # plotting a bar chart
     plt.figure(figsize=(10, 6))
     plt.barh(top_n_categories[::-1], top_n_averages[::-1])
@@ -167,8 +251,7 @@ def plot_top_n_contaminated_categories(df, n, mean_list):
     plt.title("Top Food Categories by Microplastic Content")
     plt.tight_layout()
     plt.savefig("output/2_average_consumption_top_n_food_categories.png")
-
-    return top_n_categories
+    plt.close()
 
 
 """
@@ -183,28 +266,42 @@ Since what we need is over the entire period, we will group the data by the coun
 """
 
 
-def highest_lowest_high_low_countries(
-    df: pd.DataFrame,
-    avg_high_low_column: str,
-    value_to_check: str,
-    number_of_high_low_countries: int,
-):
-    df_high_low_countries = (
-        df.groupby("country")[["country", avg_high_low_column]]
-        .describe()[avg_high_low_column]
-        .sort_values(by=value_to_check, ascending=False)[value_to_check]
-    )
+def rank_countries(df, avg_high_low_column: str, value_to_check: str, number_of_high_low_countries: int):
+    # the countries with the highest and lowest value_to_check (e.g. "mean") of a column, without printing them
+    if isinstance(df, StreamingAggregates):
+        # streaming mode supports the mergeable statistics: count, mean, std, min and max
+        described = df.describe("country", avg_high_low_column)
+    else:
+        described = df.groupby("country", observed=True)[
+            ["country", avg_high_low_column]
+        ].describe()[avg_high_low_column]
+
+    df_high_low_countries = described.sort_values(
+        by=value_to_check, ascending=False
+    )[value_to_check]
 
     highest_high_low_countries = df_high_low_countries.head(
         number_of_high_low_countries
     )
 
     lowest_high_low_countries = df_high_low_countries.tail(number_of_high_low_countries)
+    return (highest_high_low_countries, lowest_high_low_countries)
+
+
+def highest_lowest_high_low_countries(
+    df,
+    avg_high_low_column: str,
+    value_to_check: str,
+    number_of_high_low_countries: int,
+):
+    highest_high_low_countries, lowest_high_low_countries = rank_countries(
+        df, avg_high_low_column, value_to_check, number_of_high_low_countries
+    )
 
     print(
-        "5 countries with the highest average consumption: \n",
+        f"{number_of_high_low_countries} countries with the highest average consumption: \n",
         highest_high_low_countries,
-        "\n\n 5 countries with the lowest average consumption: \n",
+        f"\n\n {number_of_high_low_countries} countries with the lowest average consumption: \n",
         lowest_high_low_countries,
     )
     return (highest_high_low_countries, lowest_high_low_countries)
@@ -216,12 +313,34 @@ def highest_lowest_high_low_countries(
 """
 
 
-def plot_food_category_trend(df, food_category_col):
-    # Group df by year and calculate mean for the specified food category
-    trend_data = df.groupby("year")[food_category_col].mean().reset_index()
+def plot_food_category_trend(df, food_category_col, intervals=None):
+    # df can be the long DataFrame or an already built PanelCube
+    cube = as_cube(df)
+
+    # Average the specified food category over all countries of each year (same as a groupby("year").mean())
+    trend_data = cube.column(food_category_col).mean(axis=0).rename(food_category_col).to_frame()
+
+    # with bootstrap intervals (see bootstrap.py) the chart also shows how certain every yearly average is
+    if intervals is not None:
+        trend_data = trend_data.join(yearly_interval(intervals["yearly_means"], food_category_col)[["ci_low", "ci_high"]])
+    trend_data = trend_data.reset_index()
+
+    submit_chart(
+        "output/3_global_average_one_category.png",
+        render_food_category_trend,
+        trend_data,
+        food_category_col,
+    )
+
+
+def render_food_category_trend(trend_data, food_category_col):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     # Create plot
     plt.figure(figsize=(10, 6))
+    if "ci_low" in trend_data:
+        plt.fill_between(trend_data["year"], trend_data["ci_low"], trend_data["ci_high"], alpha=0.2, label="95% bootstrap interval")
     sns.lineplot(data=trend_data, x="year", y=food_category_col, marker="o")
     plt.title(
         f"Global Average Microplastic Content in {food_category_col.capitalize()} (1990–2018)",
@@ -232,6 +351,7 @@ def plot_food_category_trend(df, food_category_col):
     plt.grid(True)
     plt.tight_layout()
     plt.savefig("output/3_global_average_one_category.png")
+    plt.close()
 
 
 """
@@ -246,14 +366,23 @@ Intermediate Tasks
 """
 
 
-def analyze_microplastic_trends(df, mean_list, top_n_categories):
+def yearly_sums(df, columns):
+    # Sum per year of one or more columns, from the rows or from streamed/stored aggregates
+    if isinstance(df, StreamingAggregates):
+        return df.stat("year", "sum")[columns]
+    return df.groupby("year")[columns].sum()
+
+
+def analyze_microplastic_trends(df, mean_list, top_n_categories, start_year=1990, end_year=2018):
     mean_list = calculate_top_n_contaminated_categories(df, 3, 2, -1)
     top_n_categories = plot_top_n_contaminated_categories(df, 3, mean_list)
     # Find out the total per year of all countries together for the top 3 food categories
-    total_highest = df.groupby("year")[top_n_categories[0:3]].sum()
+    total_highest = yearly_sums(df, top_n_categories[0:3])
 
     # Plot a line chart to visualize the trends of each category
-    create_lineplot(
+    submit_chart(
+        "output/4_analyze_microplastic_trends.png",
+        create_lineplot,
         input_data=total_highest,
         png_title="output/4_analyze_microplastic_trends.png",
         title="Microplastic Content of Top 3 Food Categories (1990–2018)",
@@ -261,15 +390,13 @@ def analyze_microplastic_trends(df, mean_list, top_n_categories):
         ylabel="Total µg/kg",
     )
 
-    # Create a new dictionary for the results
-    results = {}
+    # Filter the food columns (first 2 columns and last column are no food)
+    food_columns = df.columns[2:-1]
 
-    # Use slope to calculate the increase
-    for cat in top_n_categories[0:3]:
-        y = total_highest[cat].values
-        x = total_highest.index.values
-        slope = np.polyfit(x, y, 1)[0]
-        results[cat] = slope
+    # Use slope to calculate the increase. All categories are fitted at once (see trends.py),
+    # the top 3 are the ones we look at here
+    category_trends = fit_columns(yearly_sums(df, list(food_columns)))
+    results = category_trends.loc[top_n_categories[0:3], "slope_per_year"].to_dict()
 
     # Make an order from fastest to slowest increase
     sorted_results = dict(
@@ -284,37 +411,26 @@ def analyze_microplastic_trends(df, mean_list, top_n_categories):
     fastest = max(results, key=results.get)
     print(f"Fastest increase: {fastest} ({results[fastest]:.2f} µg/kg per year)")
 
-    # Compare the contribution of different food categories to the total_ug_per_kg in the earliest (1990) and latest (2018) years
+    print("\n Trends of all food categories (yearly sums of all countries):\n")
+    print(category_trends.sort_values("slope_per_year", ascending=False).round(3))
 
-    # Filter the food columns (first 2 columns and last column are no food)
-    food_columns = df.columns[2:-1]
-
-    # Add the contribution of each country together and group only for 1990 and 2018
-    total_cat_year = df.groupby("year")[food_columns].sum().loc[[1990, 2018]]
-    total_per_year = df.groupby("year")["total_ug_per_kg"].sum().loc[[1990, 2018]]
-
-    # Calculate the contribution of each food to the total per year (1990, 2018) and give out in %
-
-    percentage_dec = total_cat_year.div(total_per_year, axis=0) * 100
-    percentage_p = percentage_dec.applymap(lambda x: f"{x:.2f}%")
-
-    # Extract data for 1990 and 2018 Daten
-    p_1990 = percentage_p.loc[1990].rename("1990")
-    p_2018 = percentage_p.loc[2018].rename("2018")
+    # Compare the contribution of different food categories to the total_ug_per_kg in the earliest (1990) and latest (2018) years
+    # (any other pair of years works as well, every comparison is a query on the yearly totals, see windows.py)
+    windows = YearWindows(yearly_sums(df, list(food_columns)), yearly_sums(df, "total_ug_per_kg"))
+    window = windows.query(start_year, end_year)
 
-    # Put them next to each other in comparison
-    p_compare = pd.concat([p_1990, p_2018], axis=1)
-    print("\n Microplastic Contribution per Food Category (1990 vs. 2018):\n")
+    # Contribution of each food to the total per year, in %
+    p_compare = pd.DataFrame(
+        {
+            str(start_year): window["start_share"].map(lambda x: f"{x:.2f}%"),
+            str(end_year): window["end_share"].map(lambda x: f"{x:.2f}%"),
+        }
+    )
+    print(f"\n Microplastic Contribution per Food Category ({start_year} vs. {end_year}):\n")
     print(p_compare)
 
-    # Describe the shifts in contribution / changes
-    change_dec = (
-        (percentage_dec.loc[2018] - percentage_dec.loc[1990]) / percentage_dec.loc[1990]
-    ) * 100
-    change_p = change_dec.map(lambda x: f"{x:.2f}%")
-
-    # Sort in decreasing order
-    change_dec_sorted = change_dec.sort_values(ascending=False)
+    # Describe the shifts in contribution / changes, sorted in decreasing order
+    change_dec_sorted = window["share_change_percent"].sort_values(ascending=False)
     change_p_sorted = change_dec_sorted.map(lambda x: f"{x:.2f}%")
 
     # Visualize change_p_sorted as a table
@@ -322,7 +438,7 @@ def analyze_microplastic_trends(df, mean_list, top_n_categories):
     change_p_sorted_table.columns = ["Food Category", "Percentage Change"]
 
     # Print the table
-    print("\n Percentage Change in Food Category Contribution (1990 → 2018):\n")
+    print(f"\n Percentage Change in Food Category Contribution ({start_year} → {end_year}):\n")
     print(change_p_sorted_table)
 
     """
@@ -333,15 +449,8 @@ def analyze_microplastic_trends(df, mean_list, top_n_categories):
     """
 
     ## 1) Rank shift analysis
-    # Rank food categories by contribution in 1990 and 2018
-    rank_1990 = percentage_dec.loc[1990].rank(ascending=False)
-    rank_2018 = percentage_dec.loc[2018].rank(ascending=False)
-
-    # Rank food categories by contribution in 1990 and 2018
-    rank_1990 = percentage_dec.loc[1990].rank(ascending=False)
-    rank_2018 = percentage_dec.loc[2018].rank(ascending=False)
-
-    rank_shift = (rank_1990 - rank_2018).sort_values()
+    # Rank food categories by contribution in the start and end year
+    rank_shift = window["rank_change"].sort_values()
 
     print(
         "\n Rank shifts (Positive numbers show that the category has gained a higher share of the total, and vice versa.): \n\n",
@@ -352,46 +461,55 @@ def analyze_microplastic_trends(df, mean_list, top_n_categories):
 
     # I want to see how each food category's share changes over time.
     # First I group the data by year and sum up the values for each category
-    shares_over_time = df.groupby("year")[food_columns].sum()
+    shares_over_time = yearly_sums(df, food_columns)
 
     # I realized these are absolute totals, and I want percentages. So, I divide each row by the row sum (total across all food categories for that year).
     shares_over_time = shares_over_time.div(shares_over_time.sum(axis=1), axis=0) * 100
 
     # Now I can make a stacked area chart. I tried line plot first, but it looked messy since all categories overlapped.
-    shares_over_time.plot.area(figsize=(12, 6), alpha=0.7)
-    plt.title("Evolution of Food Category Shares (1990–2018)")
-    plt.ylabel("Share of Total (%)")
-    plt.xlabel("Year")
-    plt.tight_layout()
-    plt.savefig("output/9_food_category_shares_over_time.png")
+    submit_chart(
+        "output/9_food_category_shares_over_time.png",
+        render_food_category_shares,
+        shares_over_time,
+    )
 
     ## 3) Calculating CAGR
-
-    cagr_results = {}
-    for cat in food_columns:
-        first = total_cat_year.loc[1990, cat]
-        last = total_cat_year.loc[2018, cat]
-        years = 2018 - 1990
-        cagr = ((last / first) ** (1 / years) - 1) * 100
-        cagr_results[cat] = cagr
-
-    cagr_sorted = pd.Series(cagr_results).sort_values(ascending=False)
-    print("\n\n Compound Annual Growth Rate (CAGR) 1990–2018 (%):\n\n", cagr_sorted)
+    cagr_sorted = window["cagr_percent"].sort_values(ascending=False)
+    print(f"\n\n Compound Annual Growth Rate (CAGR) {start_year}–{end_year} (%):\n\n", cagr_sorted)
 
     # Making a nice summary of all data for better viewing
     summary = pd.DataFrame(
         {
-            "1990 Share": percentage_dec.loc[1990],
-            "2018 Share": percentage_dec.loc[2018],
-            "Rank 1990": rank_1990,
-            "Rank 2018": rank_2018,
-            "Rank Change": rank_1990 - rank_2018,
-            "CAGR %": pd.Series(cagr_results),
+            f"{start_year} Share": window["start_share"],
+            f"{end_year} Share": window["end_share"],
+            f"Rank {start_year}": window["start_rank"],
+            f"Rank {end_year}": window["end_rank"],
+            "Rank Change": window["rank_change"],
+            "CAGR %": window["cagr_percent"],
         }
     ).sort_values("CAGR %", ascending=False)
+    summary.index.name = None
 
     print("\n\n Which categories are overtaking the other?\n\n ", summary)
 
+    return {
+        "top_category_slopes": pd.Series(sorted_results, name="slope_per_year"),
+        "category_trends": category_trends,
+        "share_summary": summary,
+    }
+
+
+def render_food_category_shares(shares_over_time):
+    import matplotlib.pyplot as plt
+
+    shares_over_time.plot.area(figsize=(12, 6), alpha=0.7)
+    plt.title("Evolution of Food Category Shares (1990–2018)")
+    plt.ylabel("Share of Total (%)")
+    plt.xlabel("Year")
+    plt.tight_layout()
+    plt.savefig("output/9_food_category_shares_over_time.png")
+    plt.close()
+
 
 """
 - Country-Specific Microplastic Profiles:
@@ -416,12 +534,10 @@ def visualize_breakdown_for_highest_and_lowest_countries_in_a_specific_year(
     df_specific_year = df[df["year"] == specific_year]
 
     # restricting the data to two countries with highest and lowest average consumption
-    df_specific_year_high_country = df_specific_year[
-        df_specific_year["country"] == highest_high_low_countries.index[0]
-    ]
-    df_specific_year_low_country = df_specific_year[
-        df_specific_year["country"] == lowest_high_low_countries.index[-1]
-    ]
+    high_country = highest_high_low_countries.index[0]
+    low_country = lowest_high_low_countries.index[-1]
+    df_specific_year_high_country = df_specific_year[df_specific_year["country"] == high_country]
+    df_specific_year_low_country = df_specific_year[df_specific_year["country"] == low_country]
 
     # dropping the unwanted columns
     df_foods_high_country = df_specific_year_high_country.drop(
@@ -464,14 +580,15 @@ def visualize_breakdown_for_highest_and_lowest_countries_in_a_specific_year(
         else:
             bar_colors_high.append("tab:blue")
 
-    plt.figure(figsize=(12, 6))
-    plt.bar(high_country_food_category, high_country_value, color=bar_colors_high)
-    plt.xticks(rotation=90)
-    plt.title("Microplastic Breakdown for Greece (2018)")
-    plt.xlabel("Food Category")
-    plt.ylabel("Microplastics (µg/kg)")
-    plt.tight_layout()
-    plt.savefig("output/5_microplastic_breakdown_high_country")
+    submit_chart(
+        "output/5_microplastic_breakdown_high_country.png",
+        render_breakdown,
+        high_country_food_category,
+        high_country_value,
+        bar_colors_high,
+        f"Microplastic Breakdown for {high_country} ({specific_year})",
+        "output/5_microplastic_breakdown_high_country.png",
+    )
 
     # plotting for the country with the lowest microplastic intake
     bar_colors_low = []
@@ -482,14 +599,39 @@ def visualize_breakdown_for_highest_and_lowest_countries_in_a_specific_year(
         else:
             bar_colors_low.append("tab:blue")
 
+    submit_chart(
+        "output/6_microplastic_breakdown_low_country.png",
+        render_breakdown,
+        low_country_food_category,
+        low_country_value,
+        bar_colors_low,
+        f"Microplastic Breakdown for {low_country} ({specific_year})",
+        "output/6_microplastic_breakdown_low_country.png",
+    )
+
+    # the breakdowns themselves (largest category first), the app describes them in its text
+    return {
+        "highest_country_breakdown": pd.Series(
+            high_country_value.to_numpy(), index=high_country_food_category.to_numpy(), name="value"
+        ).iloc[::-1],
+        "lowest_country_breakdown": pd.Series(
+            low_country_value.to_numpy(), index=low_country_food_category.to_numpy(), name="value"
+        ).iloc[::-1],
+    }
+
+
+def render_breakdown(food_category, value, bar_colors, title, png_title):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
-    plt.bar(low_country_food_category, low_country_value, color=bar_colors_low)
+    plt.bar(food_category, value, color=bar_colors)
     plt.xticks(rotation=90)
-    plt.title("Microplastic Breakdown for Bangladesh (2018)")
+    plt.title(title)
     plt.xlabel("Food Category")
     plt.ylabel("Microplastics (µg/kg)")
     plt.tight_layout()
-    plt.savefig("output/6_microplastic_breakdown_low_country")
+    plt.savefig(png_title)
+    plt.close()
 
 
 """
@@ -502,128 +644,64 @@ def visualize_breakdown_for_highest_and_lowest_countries_in_a_specific_year(
 def analyze_growth_rate(
     df, start_year=None, end_year=2018, top_n_countries=5, top_n_food_categories=3
 ):
-    # Determine earliest year per country if start_year not provided, since not all countries provide data for 1990
-    if start_year is None:
-        first_year = (
-            df.groupby("country")["year"].min().rename("first_year").reset_index()
+    # df can be the long DataFrame or an already built PanelCube
+    cube = as_cube(df)
+
+    # Start/end values, slope and CAGR for every country and every food category (plus the total) in one pass.
+    # If start_year is not provided, the earliest year per country is used, since not all countries provide data for 1990
+    all_growth = cube.growth(start_year=start_year, end_year=end_year)
+
+    # The country growth rate is the CAGR of total_ug_per_kg
+    df_growth = (
+        all_growth[all_growth["food_category"] == "total_ug_per_kg"]
+        .rename(
+            columns={
+                "start_year": "starting_year",
+                "start_value": "first_value",
+                "end_year": "finishing_year",
+                "end_value": "last_value",
+            }
         )
-    else:
-        first_year = pd.Series(
-            start_year, index=df["country"].unique(), name="first_year"
-        ).reset_index()
-        first_year.columns = ["country", "first_year"]
-
-    df_first = pd.merge(
-        first_year,
-        df,
-        left_on=["country", "first_year"],
-        right_on=["country", "year"],
-        how="left",
-    )
-    df_first = df_first[["country", "first_year", "total_ug_per_kg"]].rename(
-        columns={"first_year": "year", "total_ug_per_kg": "first_value"}
-    )
-
-    # Get last year per country (or use fixed end_year if specified)
-    if end_year is None:
-        last_year = (
-            df.groupby("country")["year"].max().rename("last_year").reset_index()
-        )
-    else:
-        last_year = pd.Series(
-            end_year, index=df["country"].unique(), name="last_year"
-        ).reset_index()
-        last_year.columns = ["country", "last_year"]
-
-    df_last = pd.merge(
-        last_year,
-        df,
-        left_on=["country", "last_year"],
-        right_on=["country", "year"],
-        how="left",
-    )
-    df_last = df_last[["country", "last_year", "total_ug_per_kg"]].rename(
-        columns={"last_year": "year", "total_ug_per_kg": "last_value"}
-    )
-
-    # Merge for growth calculation
-    df_growth = pd.merge(df_first, df_last, on="country")
-
-    # Rename for clarity
-    df_growth = df_growth.rename(
-        columns={"year_x": "starting_year", "year_y": "finishing_year"}
+        .reset_index(drop=True)
     )
-
-    # Now compute period length
-    df_growth["period_years"] = df_growth["finishing_year"] - df_growth["starting_year"]
-
-    # CAGR calculation with safety checks to avoid division by zero
     df_growth["growth_rate"] = np.where(
         (df_growth["first_value"] > 0) & (df_growth["period_years"] > 0),
         (df_growth["last_value"] / df_growth["first_value"])
-        ** (1 / df_growth["period_years"])
+        ** (1 / df_growth["period_years"].where(df_growth["period_years"] > 0))
         - 1,
         np.nan,
     )
+    df_growth = df_growth[
+        [
+            "country",
+            "starting_year",
+            "first_value",
+            "finishing_year",
+            "last_value",
+            "period_years",
+            "growth_rate",
+        ]
+    ]
 
-    # Get top N countries by growth_rate
-    top_growth = df_growth.sort_values("growth_rate", ascending=False).head(
-        top_n_countries
-    )
+    # Get top N countries by growth_rate (None keeps all countries)
+    top_growth = df_growth.sort_values("growth_rate", ascending=False)
+    if top_n_countries is not None:
+        top_growth = top_growth.head(top_n_countries)
     top_countries = top_growth["country"].tolist()
 
-    # Identify food columns (excluding country, year, total_ug_per_kg)
-    food_categories = [
-        col for col in df.columns if col not in ["country", "year", "total_ug_per_kg"]
+    # Keep the food categories of the top countries that have data in both years, ordered like top_countries
+    country_order = pd.Series(range(len(top_countries)), index=top_countries)
+    df_growth_rates = all_growth[
+        all_growth["country"].isin(top_countries)
+        & (all_growth["food_category"] != "total_ug_per_kg")
+        & all_growth["start_value"].notna()
+        & all_growth["end_value"].notna()
     ]
-
-    # Prepare results container, used to collect the stats below
-    results = []
-
-    for country in top_countries:
-        start_y = first_year.loc[first_year["country"] == country, "first_year"].values[
-            0
-        ]
-        end_y = last_year.loc[last_year["country"] == country, "last_year"].values[0]
-        years = end_y - start_y
-
-        for food in food_categories:
-            start_val = df.loc[
-                (df["country"] == country) & (df["year"] == start_y), food
-            ].values
-            end_val = df.loc[
-                (df["country"] == country) & (df["year"] == end_y), food
-            ].values
-
-            if len(start_val) == 0 or len(end_val) == 0:
-                continue
-            start_val = start_val[0]
-            end_val = end_val[0]
-
-            slope = (end_val - start_val) / years if years > 0 else np.nan
-            slope_percent = (slope / end_val) * 100 if end_val != 0 else np.nan
-
-            if start_val > 0 and end_val >= 0 and years > 0:
-                cagr = (end_val / start_val) ** (1 / years) - 1
-            else:
-                cagr = np.nan
-
-            results.append(
-                {
-                    "country": country,
-                    "food_category": food,
-                    "start_year": start_y,
-                    "end_year": end_y,
-                    "start_value": start_val,
-                    "end_value": end_val,
-                    "period_years": years,
-                    "slope_per_year": slope,
-                    "slope_percent_per_year": slope_percent,
-                    "CAGR": cagr,
-                }
-            )
-
-    df_growth_rates = pd.DataFrame(results)
+    df_growth_rates = df_growth_rates.iloc[
+        np.argsort(
+            df_growth_rates["country"].map(country_order).to_numpy(), kind="stable"
+        )
+    ].reset_index(drop=True)
 
     # Pivot for convenience: CAGR and slope percent per food category by country
     growth_pivot = df_growth_rates.pivot(
@@ -635,14 +713,14 @@ def analyze_growth_rate(
     # Extract top food categories by CAGR and slope percent per country
     top_drivers_cagr = (
         df_growth_rates.sort_values(["country", "CAGR"], ascending=[True, False])
-        .groupby("country")
+        .groupby("country", observed=True)
         .head(top_n_food_categories)
     )
     top_drivers_slope = (
         df_growth_rates.sort_values(
             ["country", "slope_percent_per_year"], ascending=[True, False]
         )
-        .groupby("country")
+        .groupby("country", observed=True)
         .head(top_n_food_categories)
     )
 
@@ -661,21 +739,30 @@ def analyze_growth_rate(
 """
 
 
-def get_correlation_regarding_a_column(
-    df: pd.DataFrame, corr_check_method: str, corr_check_col: str
-) -> None:
-    # Get the correlation matrix
-    df.corr
+def get_correlation_regarding_a_column(df, corr_check_method: str, corr_check_col: str) -> pd.Series:
+    # df can be the long DataFrame or an already built CorrelationEngine (correlation.py),
+    # which keeps the covariance states of the data so the matrix isn't recomputed from the full table every call
+    correlations = as_correlations(df)
 
     # define a vairable with the correlation regardint numerics only.
-    corr = df.corr(method=corr_check_method, min_periods=1, numeric_only=True)
-
-    # define a variable to check the correlation with regards to it
-    corr_check_col = "total_ug_per_kg"
+    corr = correlations.correlation(corr_check_method)
 
     # Extract correlations with 'A' since it is always 1
     corr_with_A = corr[corr_check_col].drop(corr_check_col)
 
+    submit_chart(
+        "output/7_intermediate_correlation_of_microplastics.png",
+        render_correlation,
+        corr_with_A,
+        corr_check_col,
+    )
+
+    return corr_with_A
+
+
+def render_correlation(corr_with_A, corr_check_col):
+    import matplotlib.pyplot as plt
+
     # Plot as horizontal bar chart, since a vertical bar in this case makes lees sense and is harder on the eyes to follow
     plt.figure()
     corr_with_A.sort_values().plot(kind="barh", color="skyblue", edgecolor="black")
@@ -684,8 +771,7 @@ def get_correlation_regarding_a_column(
     plt.ylabel("Variables")
     plt.tight_layout()
     plt.savefig("output/7_intermediate_correlation_of_microplastics.png")
-
-    return None
+    plt.close()
 
 
 # ### Public Health Implications & Recommendations (Qualitative):
@@ -713,50 +799,35 @@ This would give us a clearer picture of whether high totals are due to a single
 """
 I write a function that takes a country name and gives me back the continent
 to be honest, I wasn't sure which functions from the library to use. so I had to look up that first I need the alpha2 country code(the official two-letter code for a country), and then from there I can get the continent code.
+The codes now come from the country index (countries.py), which resolves every name once and knows the names the library
+does not match (like "The Gambia"). A name it cannot resolve at all gets a warning and no continent (NaN).
 """
 
 
-def get_continent(country: str):
-    # Some country names in my data don’t match perfectly with the library, so I have to use try/except and return None if it fails
-    try:
-        # First I convert the country name to a 2-letter code (like 'DE' for Germany).
-        code = pc.country_name_to_country_alpha2(country)
-        # Then I convert that code to a continent code (like 'EU' for Europe).
-        return pc.country_alpha2_to_continent_code(code)
-    except:
-        return None
-
-
 """
-We will use three concentration metrics:
+We will use these concentration metrics (computed in concentration.py):
 1. Mean per category: the average contamination across food groups.
 2. Standard deviation across categories: higher std means big differences between categories, therefore more concentration.
 3. Max share: share of the biggest contributing category.
+4. HHI (sum of the squared shares) and Shannon entropy: how evenly the contamination is spread over all 18 categories.
 """
 
 
-def contamination_in_countries(df: pd.DataFrame) -> None:
-    food_categories = [
-        col for col in df.columns if col not in ["country", "year", "total_ug_per_kg"]
-    ]
-
+def contamination_in_countries(df) -> dict:
     # calulating average microplastic content across all food categories for each country
-    country_avgs = df.groupby("country")[food_categories].mean()
+    if isinstance(df, StreamingAggregates):
+        # the per-country means of streamed/stored aggregates
+        country_avgs = df.stat("country", "mean")[df.columns[2:-1]]
+    else:
+        # df can be the long DataFrame or an already built PanelCube
+        # (averaging the cube over the year axis is the same as df.groupby("country").mean())
+        country_avgs = as_cube(df).mean(over="year")
 
-    # caluclating the concentration_metrics
-    # setting the axis=1, so it does the calculations for each row (not column)
-    concentration_metrics = pd.DataFrame(
-        {
-            "mean_per_category": country_avgs.mean(axis=1),
-            "std_per_category": country_avgs.std(axis=1),
-            "max_share": country_avgs.max(axis=1) / country_avgs.sum(axis=1),
-        }
-    )
+    # caluclating the concentration_metrics, all countries at once from their category shares
+    metrics = category_concentration(country_avgs)
 
     # sorting the results by max share and printing it
-    concentration_metrics = concentration_metrics.sort_values(
-        "max_share", ascending=False
-    )
+    concentration_metrics = metrics.sort_values("max_share", ascending=False)
     print(
         "\n 10 Countries with most concentrated contamination: \n ",
         concentration_metrics.head(10),
@@ -773,9 +844,10 @@ def contamination_in_countries(df: pd.DataFrame) -> None:
     # I reset the index so that I can work with the names of the countries
     concentration_metrics = concentration_metrics.reset_index()
 
-    concentration_metrics["continent"] = concentration_metrics["country"].apply(
-        get_continent
-    )
+    # one vectorized lookup for all countries (unknown names are resolved once and added to the index)
+    concentration_metrics["continent"] = country_index(
+        concentration_metrics["country"]
+    ).map(concentration_metrics["country"], "continent")
     continent_breakdown = (
         concentration_metrics.groupby("continent")["max_share"]
         .mean()
@@ -788,41 +860,18 @@ def contamination_in_countries(df: pd.DataFrame) -> None:
 
     """
     Now, I want to see which single category has the max share in my top 10 countries.
-    I thought I can just loop through them one by one.
+    The top category and its value are already part of the metrics, so it's just the first 10 rows.
     """
-
-    # putting top 10 most concentrated countries into a variable
-    top10_countries = concentration_metrics.head(10)["country"]
-
-    # I decided to make a dictionary, because I want to store multiple things for each country
-    top10_biggest_contributors = {}
-
-    for country in top10_countries:
-        # I take the row for that country (all the categories with their values)
-        country_data = country_avgs.loc[country]
-
-        # I wasn’t sure how to find the category with the max value, at first I thought about sorting, but then I learned there is .idxmax() which directly gives the category name
-        top_category = country_data.idxmax()
-
-        # here I just get the actual value of that max contamination
-        top_value = country_data.max()
-
-        # and the sum across all categories (I need this to calculate the share)
-        total_value = country_data.sum()
-
-        share = top_value / total_value
-
-        # I put the results into the dictionary under the country name
-        # I wasn’t sure whether to use a list or dictionary here — I picked dictionary because I want to access results by country name later, not just by position
-        # also rounded the share to make it cleaner
-        top10_biggest_contributors[country] = {
-            "top_category": top_category,
-            "share": round(share, 3),
-            "value": round(top_value, 2),
+    top10_contributors = concentration_metrics.head(10).set_index("country")
+    top10_contributors_df = pd.DataFrame(
+        {
+            "top_category": top10_contributors["top_category"],
+            "share": top10_contributors["max_share"].round(3),
+            "value": top10_contributors["top_value"].round(2),
         }
+    )
+    top10_contributors_df.index.name = None
 
-    # I convert results to a dataframe for a better view
-    top10_contributors_df = pd.DataFrame(top10_biggest_contributors).T
     print("\n Top contributors in top 10 most concentrated countries:\n")
     print(top10_contributors_df)
 
@@ -831,9 +880,8 @@ def contamination_in_countries(df: pd.DataFrame) -> None:
     I want to check this across all countries. I will count how many times each category is the top contributor.
     """
 
-    # To find the top contributor for each country I again use idxmax() that returns the index for the maximum value in each column
-    # By setting the axis to 1, it will do it for each row
-    top_category_per_country = country_avgs.idxmax(axis=1)
+    # the top contributor of every country is in the metrics as well (in the original country order)
+    top_category_per_country = metrics["top_category"]
 
     # Counting frequencies
     top_category_counts = top_category_per_country.value_counts()
@@ -841,6 +889,41 @@ def contamination_in_countries(df: pd.DataFrame) -> None:
         "\n How often each category is the biggest contributor:\n", top_category_counts
     )
 
+    submit_chart(
+        "output/8_biggest_contributors_count.png",
+        render_contributor_counts,
+        top_category_counts,
+    )
+
+    results = {
+        "concentration_metrics": concentration_metrics.set_index("country"),
+        "continent_max_share": continent_breakdown,
+        "top10_contributors": top10_contributors_df,
+        "top_category_counts": top_category_counts.rename("countries"),
+    }
+
+    if isinstance(df, StreamingAggregates):
+        # the aggregates only keep per-country and per-year statistics, not every country-year
+        return results
+
+    """
+    The averages hide how this changed over time, so the same metrics for every country-year as well.
+    """
+    yearly_concentration = country_year_concentration(as_cube(df))
+    hhi_change = concentration_change(yearly_concentration, "hhi").sort_values("change")
+    print("\n Countries whose contamination became more evenly spread (HHI change, first to last year):\n")
+    print(hhi_change.head(5))
+    print("\n Countries whose contamination became more concentrated (HHI change, first to last year):\n")
+    print(hhi_change.tail(5))
+
+    results["country_year_concentration"] = yearly_concentration
+    results["hhi_change"] = hhi_change
+    return results
+
+
+def render_contributor_counts(top_category_counts):
+    import matplotlib.pyplot as plt
+
     # Plotting a bar chart: I found out I can work with .plot() and I don't have to put each column into a list (as I used to do when plotting with plt.bar())!
     plt.figure(figsize=(10, 6))
     top_category_counts.plot(kind="bar")
@@ -848,20 +931,50 @@ def contamination_in_countries(df: pd.DataFrame) -> None:
     plt.ylabel("Number of countries")
     plt.xlabel("Food category")
     plt.tight_layout()
-    plt.savefig("output/8_biggest_contributors_count")
+    plt.savefig("output/8_biggest_contributors_count.png")
+    plt.close()
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Please provide the filepath as an argument.")
-        sys.exit(1)
-    filepath = sys.argv[1]
-    df = load_and_inspect_data(filepath)
+def run_from_aggregates(aggregates):
+    """
+    Run the analyses that only need aggregates (streamed CSV or aggregate store).
+    Memory stays bounded by the number of years and countries, however large the data is.
+    """
+    analyze_and_plot_microplastic_trends(aggregates)
+
+    mean_list = calculate_top_n_contaminated_categories(aggregates, 3, 2, -1)
+    top_n_categories = plot_top_n_contaminated_categories(aggregates, 3, mean_list)
+
     print("\n")
-    analyze_and_plot_microplastic_trends(df)
+    highest_lowest_high_low_countries(aggregates, "total_ug_per_kg", "mean", 5)
+
+    analyze_microplastic_trends(aggregates, mean_list, top_n_categories)
+
+    # the top 10 chart comes after analyze_microplastic_trends, which draws the same file with the top 3
+    # (the last submission of a file wins, same order as in run_analyses)
+    plot_top_n_contaminated_categories(aggregates, 10, mean_list)
+
+    contamination_in_countries(aggregates)
+
+
+def run_analyses(filepath, float_dtype="float32", n_jobs=1, n_resamples=DEFAULT_RESAMPLES):
+    df = load_and_inspect_data(filepath, float_dtype)
+
+    # the country × year × category cube is built once and shared by the functions that can use it
+    cube = dataset.cube
+
+    # confidence intervals of the yearly means, category means and trend slopes (countries resampled per year),
+    # always with the same seed so a rerun gives the same intervals
+    intervals = bootstrap_intervals(cube, n_resamples=n_resamples, seed=0, n_jobs=n_jobs)
 
     print("\n")
-    plot_food_category_trend(df, "total_milk")
+    overall_avg = analyze_and_plot_microplastic_trends(df, intervals)
+
+    print("\n")
+    plot_food_category_trend(cube, "total_milk", intervals)
+
+    print(f"\nTrend of the yearly average per category with its 95% bootstrap interval ({n_resamples} resamples):\n")
+    print(intervals["trend_slopes"].sort_values("slope_per_year", ascending=False).round(3))
 
     # - Detailed Food Category Analysis:
     #     - For the top 3 food categories with the highest microplastic content, analyze their individual trends over time (1990-2018). Are some increasing more rapidly than others?
@@ -873,10 +986,21 @@ def main():
     mean_list = calculate_top_n_contaminated_categories(df, 3, 2, -1, verbose=False)
     top_n_categories = plot_top_n_contaminated_categories(df, 3, mean_list)
 
-    analyze_microplastic_trends(df, mean_list, top_n_categories)
+    trends = analyze_microplastic_trends(df, mean_list, top_n_categories)
+
+    # trend of every country's total (all categories are fitted in the same pass)
+    total_trends = country_trends(cube)
+    total_trends = (
+        total_trends[total_trends["food_category"] == "total_ug_per_kg"]
+        .drop(columns="food_category")
+        .set_index("country")
+        .sort_values("slope_per_year", ascending=False)
+    )
+    print("\n Countries with the fastest rising total (µg/kg per year):\n")
+    print(total_trends.head(10).round(3))
 
     print("\n")
-    results = analyze_growth_rate(df)
+    results = analyze_growth_rate(cube)
 
     print("Top countries by growth rate:\n")
     print(results["top_countries_growth"])
@@ -896,9 +1020,28 @@ def main():
     highest_high_low_countries, lowest_high_low_countries = (
         highest_lowest_high_low_countries(df, "total_ug_per_kg", "mean", 5)
     )
+    # the app shows the top and bottom 10 on its map
+    map_highest_countries, map_lowest_countries = rank_countries(df, "total_ug_per_kg", "mean", 10)
+
+    # the covariance states are collected once, every correlation view below is merged from them
+    correlation_engine = as_correlations(df)
 
     # here for the wanted effect I already set the parameters, is changeable however to anything one wants.
-    get_correlation_regarding_a_column(df, "pearson", "total_ug_per_kg")
+    correlations = get_correlation_regarding_a_column(correlation_engine, "pearson", "total_ug_per_kg")
+
+    # the same correlations with the total, split by year, by continent and over rolling 3-survey windows
+    correlation_by_year = correlation_engine.with_column("total_ug_per_kg", correlation_engine.by_year())
+    correlation_by_continent = correlation_engine.with_column(
+        "total_ug_per_kg", correlation_engine.by_continent()
+    )
+    correlation_rolling = correlation_engine.with_column(
+        "total_ug_per_kg",
+        {f"{first}-{last}": matrix for (first, last), matrix in correlation_engine.rolling(3).items()},
+    )
+    print("\nCorrelation with total_ug_per_kg per continent:\n")
+    print(correlation_by_continent.round(2))
+    print("\nCorrelation with total_ug_per_kg over rolling 3-survey windows:\n")
+    print(correlation_rolling.round(2))
 
     # calculate_top_n_contaminated_categories(df, n, start_food_col, end_food_col)
     calculate_top_n_contaminated_categories(df, 3, 2, -1, verbose=False)
@@ -907,11 +1050,132 @@ def main():
     plot_top_n_contaminated_categories(df, 10, mean_list)
 
     # visualize_breakdown_for_highest_and_lowest_countries_in_a_specific_year(df, specific_year, highest_high_low_countries, lowest_high_low_countries)
-    visualize_breakdown_for_highest_and_lowest_countries_in_a_specific_year(
+    breakdowns = visualize_breakdown_for_highest_and_lowest_countries_in_a_specific_year(
         df, 2018, highest_high_low_countries, lowest_high_low_countries
     )
 
-    contamination_in_countries(df)
+    concentration = contamination_in_countries(cube)
+
+    # everything the Insights page shows goes into one artifact, so the page never recomputes or copies numbers
+    save_insights(
+        os.path.join(OUTPUT_DIR, INSIGHTS_NAME),
+        values={
+            "overall_average": overall_avg,
+            "highest_country": str(highest_high_low_countries.index[0]),
+            "lowest_country": str(lowest_high_low_countries.index[-1]),
+            "breakdown_year": 2018,
+            "bootstrap_resamples": n_resamples,
+            "bootstrap_seed": 0,
+        },
+        tables={
+            "highest_countries": map_highest_countries.rename("average"),
+            "lowest_countries": map_lowest_countries.rename("average"),
+            "category_averages": pd.Series(dict(mean_list), name="average"),
+            "top_category_slopes": trends["top_category_slopes"],
+            "category_trends": trends["category_trends"],
+            "country_total_trends": total_trends,
+            "share_summary": trends["share_summary"],
+            "top_countries_growth": results["top_countries_growth"].set_index("country"),
+            "top_drivers_cagr": results["top_drivers_cagr"].reset_index(drop=True),
+            **breakdowns,
+            "correlation_with_total": correlations.rename("correlation"),
+            "bootstrap_yearly_means": intervals["yearly_means"],
+            "bootstrap_category_means": intervals["category_means"],
+            "bootstrap_trend_slopes": intervals["trend_slopes"],
+            "correlation_with_total_by_year": correlation_by_year.drop(index="year", errors="ignore"),
+            "correlation_with_total_by_continent": correlation_by_continent,
+            **concentration,
+        },
+        source={"file": str(filepath), "sha256": file_sha256(filepath), "rows": len(df)},
+    )
+    print(f"\nSaved the results for the app to {os.path.join(OUTPUT_DIR, INSIGHTS_NAME)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microplastics analysis")
+    parser.add_argument("filepath", help="path to processed_microplastics.csv")
+    parser.add_argument(
+        "--float64",
+        action="store_true",
+        help="keep the food columns in float64 instead of the compact float32",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="read the CSV in chunks for files larger than RAM (runs the aggregate-based analyses only)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"rows per chunk in --stream mode (default {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--store",
+        metavar="PATH",
+        help="append the rows of filepath to the aggregate store at PATH and run the aggregate-based analyses from it",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render the figures and run the bootstrap in N parallel processes (default 1)",
+    )
+    parser.add_argument(
+        "--resamples",
+        type=int,
+        default=DEFAULT_RESAMPLES,
+        metavar="N",
+        help=f"bootstrap resamples for the confidence intervals (default {DEFAULT_RESAMPLES})",
+    )
+    parser.add_argument(
+        "--no-figures",
+        action="store_true",
+        help="headless fast path: only compute and print the tables and results, draw no figures (matplotlib is never imported)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="redraw every figure, even the ones whose data, parameters and code did not change",
+    )
+    args = parser.parse_args()
+
+    ensure_output_dir()
+
+    # the analyses only queue their figures, so computing and rendering are separate steps
+    with collect_charts() as charts:
+        if args.store:
+            store = AggregateStore(args.store)
+            if store.append_csv(args.filepath, chunk_size=args.chunksize):
+                print(f"\nAppended {store.sources[-1]['rows']} rows to {args.store}.")
+            else:
+                print(
+                    f"\n{args.filepath} is already part of {args.store}, nothing appended."
+                )
+            run_from_aggregates(store.aggregates)
+
+        elif args.stream:
+            aggregates = aggregate_csv(args.filepath, chunk_size=args.chunksize)
+            print(f"\nStreamed {aggregates.rows} rows in chunks of {args.chunksize}.")
+            run_from_aggregates(aggregates)
+
+        else:
+            run_analyses(
+                args.filepath, "float64" if args.float64 else "float32", args.jobs, args.resamples
+            )
+
+    if args.no_figures:
+        print(f"\nSkipped {len(charts)} figures (--no-figures).")
+        return
+
+    # all analyses are done, now the queued figures are drawn (in parallel with --jobs > 1),
+    # skipping the ones that are still up to date
+    start = time.perf_counter()
+    timings = render_charts(
+        charts, n_jobs=args.jobs, manifest_dir=OUTPUT_DIR, force=args.force
+    )
+    print_render_report(timings, time.perf_counter() - start, args.jobs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""
+Metadata index of the dataset: which countries, years and food categories it covers, and how completely.
+
+The index is computed once per version of the CSV and saved as a small JSON file next to it
+(.processed_microplastics.meta.json for processed_microplastics.csv). Like the Arrow sidecar it remembers the size,
+mtime and SHA-256 of the CSV it describes, so a different export gets a new index automatically and the pages never
+have to scan the data (or keep hardcoded counts) to describe it.
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dataset import (
+    COUNTRY_COLUMN,
+    FOOD_COLUMNS,
+    YEAR_COLUMN,
+    atomic_write,
+    file_sha256,
+    load_dataset,
+    unchanged_source,
+)
+
+METADATA_VERSION = 1
+METADATA_SUFFIX = ".meta.json"
+
+
+def metadata_path(filepath):
+    """Return the path of the metadata index belonging to a CSV file."""
+    filepath = Path(filepath)
+    return filepath.with_name(f".{filepath.stem}{METADATA_SUFFIX}")
+
+
+def build_metadata(df):
+    """
+    Describe a loaded dataset.
+
+    Parameters:
+        df (pd.DataFrame): The dataset, one row per (country, year).
+
+    Returns:
+        dict: rows, countries, years, first_year, last_year, categories and per-country coverage
+        (number of years, first and last year, missing years).
+    """
+    years = sorted(int(year) for year in df[YEAR_COLUMN].unique())
+    per_country = df.groupby(COUNTRY_COLUMN, observed=True)[YEAR_COLUMN]
+
+    coverage = {}
+    for country, country_years in per_country:
+        present = sorted(int(year) for year in country_years)
+        coverage[str(country)] = {
+            "years": len(present),
+            "first_year": present[0],
+            "last_year": present[-1],
+            "missing_years": [year for year in years if year not in set(present)],
+        }
+
+    return {
+        "rows": len(df),
+        "countries": sorted(coverage),
+        "years": years,
+        "first_year": years[0] if years else None,
+        "last_year": years[-1] if years else None,
+        "categories": [col for col in FOOD_COLUMNS if col in df.columns],
+        "coverage": coverage,
+    }
+
+
+def load_metadata(filepath):
+    """
+    Metadata index of the CSV, read from its saved file or computed (and saved) if the CSV changed.
+
+    Parameters:
+        filepath (str or Path): Path to the CSV file.
+
+    Returns:
+        dict: The index (see build_metadata), plus "version" and "source" (size, mtime_ns, sha256 of the CSV).
+    """
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    path = metadata_path(filepath)
+    sha256 = None
+
+    if path.exists():
+        try:
+            with open(path) as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            # broken file, it gets rebuilt below
+            metadata = {}
+
+        if metadata.get("version") == METADATA_VERSION:
+            unchanged, sha256 = unchanged_source(metadata.get("source", {}), filepath, stat)
+            if unchanged and sha256 is None:
+                return metadata
+            if unchanged:
+                return _save(metadata, path, stat, sha256)
+
+    metadata = build_metadata(load_dataset(filepath))
+    metadata["version"] = METADATA_VERSION
+    return _save(metadata, path, stat, sha256 or file_sha256(filepath))
+
+
+def _save(metadata, path, stat, sha256):
+    metadata["source"] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    # a read-only checkout (e.g. a deployed app) still works, the index is then computed once per process
+    try:
+        with atomic_write(path) as f:
+            json.dump(metadata, f, indent=1, ensure_ascii=False)
+    except OSError:
+        pass
+    return metadata
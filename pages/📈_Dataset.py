@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import pycountry
 from streamlit.components.v1 import html
 from pathlib import Path
+from maps import highlight_map
+from countries import country_index
+from dataset import EXPORT_FORMATS, export_bytes
+from app_data import dataset_metadata
 
 st.set_page_config(
     page_title="Dataset", page_icon="📈", layout="centered"
@@ -11,7 +12,10 @@ st.set_page_config(
 
 st.title("📈 Our Dataset")
 
-st.markdown("""
+# counts, years and countries come from the metadata index of the current data file (see metadata.py)
+meta = dataset_metadata()
+
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif; 
     color: #2e3d49; 
@@ -21,7 +25,7 @@ st.markdown("""
 ">
 The dataset used for this analysis was provided by the <strong>PurePlate Initiative</strong>, a global non-profit advocacy group dedicated to promoting food safety and raising awareness about emerging contaminants in the human diet. 
 The initiative focuses on the growing presence of <strong>microplastics in our food</strong> and their potential long-term health implications. 
-The dataset includes information spanning from 1990 to 2018.
+The dataset includes information spanning from {meta["first_year"]} to {meta["last_year"]}.
 </p>
 """, unsafe_allow_html=True)
 
@@ -44,10 +48,14 @@ def stat_card(title, value, icon="", subtitle=""):
     """, unsafe_allow_html=True)
 
 
+complete = sum(coverage["years"] == len(meta["years"]) for coverage in meta["coverage"].values())
+
 stats = [
-    {"title": "Countries", "value": 109, "icon": "🌍"},
-    {"title": "Food Categories", "value": 18, "icon": "🌽"},
-    {"title": "Years of Data", "value": 28, "icon": "⏳"},
+    {"title": "Countries", "value": len(meta["countries"]), "icon": "🌍",
+     "subtitle": f"{complete} with all {len(meta['years'])} survey years"},
+    {"title": "Food Categories", "value": len(meta["categories"]), "icon": "🌽"},
+    {"title": "Years of Data", "value": meta["last_year"] - meta["first_year"], "icon": "⏳",
+     "subtitle": f"{meta['first_year']}–{meta['last_year']}"},
 ]
 
 cols = st.columns(len(stats), gap="medium")
@@ -56,60 +64,24 @@ for col, stat in zip(cols, stats):
         stat_card(stat['title'], stat['value'], stat.get('icon', ""), stat.get('subtitle', ""))
 
 # World map
-countries = [
-    "Angola", "Benin", "Burkina Faso", "Central African Republic", "Cote D'Ivoire", 
-    "Cameroon", "Congo", "Djibouti", "Algeria", "Egypt", "Ethiopia", "Gabon", 
-    "Ghana", "Guinea", "The Gambia", "Guinea-Bissau", "Kenya", "Lesotho", "Morocco",
-    "Madagascar", "Mali", "Mozambique", "Mauritania", "Mauritius", "Malawi", 
-    "Namibia", "Niger", "Nigeria", "Rwanda", "Senegal", "Chad", "Togo", "Tunisia",
-    "Tanzania", "Uganda", "South Africa", "Zambia", "Zimbabwe", "Albania", "Argentina",
-    "Antigua And Barbuda", "Australia", "Austria", "Bangladesh", "Bulgaria", "Bolivia",
-    "Brazil", "Barbados", "Canada", "Switzerland", "China", "Colombia", "Cuba",
-    "Germany", "Dominica", "Denmark", "Dominican Republic", "Spain", "France",
-    "United Kingdom", "Greece", "Grenada", "Hungary", "Indonesia", "India", "Ireland",
-    "Iran", "Iraq", "Iceland", "Jordan", "Japan", "Cambodia", "South Korea", "Kuwait",
-    "Laos", "Saint Lucia", "Sri Lanka", "Mexico", "Myanmar", "Mongolia", "Malaysia",
-    "Netherlands", "Norway", "Pakistan", "Peru", "Philippines", "Portugal", "Paraguay",
-    "Romania", "Saudi Arabia", "Slovakia", "Sweden", "Thailand", "Trinidad And Tobago",
-    "Turkey", "Uruguay", "United States", "Venezuela", "Vietnam", "Belgium", 
-    "Bosnia And Herzegovina", "Croatia", "Luxembourg", "Montenegro", "Russia", 
-    "Serbia", "Slovenia", "Syria", "Ukraine"
-]
-
-all_countries = [country.name for country in pycountry.countries]
-
-df = pd.DataFrame({
-    "country": all_countries,
-})
-df["highlight"] = df["country"].apply(lambda x: 1 if x in countries else 0)
-
-fig = px.choropleth(
-    df,
-    locations="country",
-    locationmode="country names",
-    color="highlight",
-    hover_name="country",  
-    color_continuous_scale=["#eeeeee", "#FF6B6B"],
-)
-
-fig.update_layout(
-    coloraxis_showscale=False,
-    margin={"r": 0, "t": 0, "l": 0, "b": 0}
-)
+# built once per process and shared by all sessions, every rerun only sends the finished figure
+@st.cache_resource
+def build_dataset_map(countries):
+    return highlight_map({"In dataset": countries}, {"In dataset": "#FF6B6B"})
 
-fig.update_traces(
-    hovertemplate="%{location}<extra></extra>"
-)
-
-fig.update_geos(projection_type="natural earth", fitbounds="locations", visible=False)
+countries = meta["countries"]
+fig = build_dataset_map(tuple(country_index(countries).map(countries, "iso3")))
 
 st.plotly_chart(fig, use_container_width=True, height=600)
 
 project_root = Path(__file__).resolve().parents[1]
 file_path = project_root / "processed_microplastics.csv"
 
-with open(file_path, "rb") as f:
-    csv_data = f.read()
+# Download payloads are built once per file version and format and shared by all sessions.
+# mtime_ns is only part of the cache key, so a new version of the file gets new payloads.
+@st.cache_resource(max_entries=len(EXPORT_FORMATS) * 2)
+def download_payload(path, mtime_ns, fmt):
+    return export_bytes(path, fmt)
 
 CARD_STYLE = (
     "background-color:#fffafa; padding:18px; border-radius:12px; "
@@ -182,9 +154,21 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+download_formats = {
+    "CSV": "csv",
+    "CSV (gzip)": "csv.gz",
+    "Parquet": "parquet",
+}
+
+# only the chosen format is built
+choice = st.radio("Format", list(download_formats), horizontal=True, label_visibility="collapsed")
+fmt = download_formats[choice]
+mime, extension = EXPORT_FORMATS[fmt]
+payload = download_payload(str(file_path), file_path.stat().st_mtime_ns, fmt)
+
 st.download_button(
-    label="📥 Download the dataset",
-    data=csv_data,
-    file_name="microplastics_dataset.csv",
-    mime="text/csv"
+    label=f"📥 Download the dataset ({len(payload) / 1024:.0f} KB)",
+    data=payload,
+    file_name=f"microplastics_dataset{extension}",
+    mime=mime
 )
\ No newline at end of file
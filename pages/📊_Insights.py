@@ -1,14 +1,27 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import pycountry
-import io
+import functools
+import os
+import time
+from app_data import dataset_info, shared_dataset
+from insights import INSIGHTS_NAME, load_insights
+from maps import highlight_map
+from countries import country_index
+from images import DISPLAY_WIDTH, chart_variant
+from bootstrap import yearly_interval
+import aggregations
+import charts
+import timing
+
+# written by main.py, next to the charts
+RESULTS_PATH = os.path.join("output", INSIGHTS_NAME)
 
 
 st.set_page_config(
     page_title="Insights", page_icon="🔎", layout="centered"
 )
 
+page_start = time.perf_counter()
+
 st.title("📊 Key Insights")
 
 st.markdown("""
@@ -38,24 +51,86 @@ def insight_section(title, icon, text):
     </div>
     """, unsafe_allow_html=True)
 
-def display_chart(chart_path):
-    st.image(chart_path)
+# Chart images are read and scaled down once per file version and shared by all sessions,
+# a rerun only looks at the file's mtime (a new chart from main.py gets a new cache entry).
+@st.cache_resource(max_entries=32)
+def load_chart(path, mtime_ns, width):
+    return chart_variant(path, width)
 
-# Function to load & inspect
+def display_chart(chart_path):
+    # main.py --no-figures writes the results but no charts, the rest of the page still works without them
+    if not os.path.exists(chart_path):
+        st.info(f"{chart_path} not found. Run `python main.py processed_microplastics.csv` without --no-figures to draw the charts.")
+        return
+    image = load_chart(chart_path, os.stat(chart_path).st_mtime_ns, DISPLAY_WIDTH)
+    # output_format="PNG" lets st.image send the cached bytes as they are
+    st.image(image, output_format="PNG")
+
+def section(func):
+    # every interactive chart is a fragment: a widget inside it only reruns that function, not the whole page,
+    # and every run of it is timed (see ?timings=1 at the bottom of the page)
+    @st.fragment
+    @functools.wraps(func)
+    def run_section(*args, **kwargs):
+        with timing.timed(func.__name__):
+            func(*args, **kwargs)
+    return run_section
+
+def chart_filters(key):
+    # country and year range filters of an interactive chart, every chart gets its own widgets
+    cube = shared_dataset().cube
+    # only the years in the data can be picked (every 5 years), a free range like 1991-1994 would select nothing
+    year_options = [int(year) for year in cube.years]
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        countries = st.multiselect("Countries (empty = all)", list(cube.countries), key=f"{key}_countries")
+    with col2:
+        years = st.select_slider("Years", year_options, (year_options[0], year_options[-1]), key=f"{key}_years")
+    return countries, years
+
+@section
+def breakdown_chart(key, default_country, default_year):
+    # interactive version of the country breakdown charts, the results are the default selection
+    cube = shared_dataset().cube
+    country_options = list(cube.countries)
+    year_options = [int(year) for year in cube.years]
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        country = st.selectbox("Country", country_options, index=country_options.index(default_country), key=f"{key}_country")
+    with col2:
+        year = st.selectbox("Year", year_options, index=year_options.index(default_year), key=f"{key}_year")
+    st.plotly_chart(charts.breakdown_figure(country, year), use_container_width=True)
+
+def html_table(rows, headers, style="width: 100%;"):
+    # same look as the tables we used to write by hand, built from the rows of the results artifact
+    header_cells = "".join(f'<th style="border: 1px solid #ddd; padding: 8px;">{header}</th>' for header in headers)
+    body = "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows)
+    return (
+        f'<table style="font-family: Arial, sans-serif; border-collapse: collapse; {style}">'
+        f'<tr style="background-color:#f2f2f2;">{header_cells}</tr>{body}</table>'
+    )
+
+def category_label(category):
+    # "non-starchy_vegetables" -> "Non-Starchy Vegetables", with a few names shortened like in our charts
+    labels = {"total_milk": "Milk", "total_processed_meats": "Processed Meats", "total_salt": "Salt"}
+    return labels.get(category, category.replace("_", " ").title())
+
+def category_name(category):
+    # the label as it reads inside a sentence, "non-starchy vegetables" (.capitalize() it at the start of one)
+    return category_label(category).lower()
+
+def and_list(items):
+    # ["a", "b", "c"] -> "a, b, and c", for names taken from the results in the text
+    items = list(items)
+    if len(items) <= 2:
+        return " and ".join(items)
+    return ", ".join(items[:-1]) + ", and " + items[-1]
+
+# Results of main.py, the page only reads them and never recomputes anything
 @st.cache_data
-def load_and_inspect_data(filepath):
-    df = pd.read_csv(filepath)
-
-    st.subheader("➡️ A first look at the dataset")
-    st.dataframe(df.head())
-
-    st.subheader("➡️ Data types and memory usage")
-    buffer = io.StringIO()
-    df.info(buf=buffer)
-    s = buffer.getvalue()
-    st.code(s)
-
-    return df
+def load_results(path, mtime_ns):
+    # mtime_ns is only part of the cache key, so a new run of main.py is picked up without restarting the app
+    return load_insights(path)
 
 insight_section(
     "Data Loading and Initial Exploration",
@@ -63,8 +138,27 @@ insight_section(
     "We began by loading the dataset, inspecting its structure, and performing basic cleaning steps. Since the dataset did not include any null or NaN values, no targeted preprocessing measures were needed."
 )
 
-# Replace with actual df.head()
-load_and_inspect_data("processed_microplastics.csv")
+# one dataset for every session (see app_data.py)
+data = shared_dataset()
+
+st.subheader("➡️ A first look at the dataset")
+st.dataframe(data.df.head())
+
+st.subheader("➡️ Data types and memory usage")
+st.code(dataset_info())
+
+if not os.path.exists(RESULTS_PATH):
+    st.error(f"{RESULTS_PATH} not found. Run `python main.py processed_microplastics.csv` first, it writes the results and charts shown below.")
+    st.stop()
+
+try:
+    results = load_results(RESULTS_PATH, os.stat(RESULTS_PATH).st_mtime_ns)
+except ValueError as error:
+    # written by an older main.py that does not have every table the page needs
+    st.error(str(error))
+    st.stop()
+values = results["values"]
+tables = results["tables"]
 
 insight_section(
     "Overall Trends in Microplastic Consumption",
@@ -72,9 +166,12 @@ insight_section(
     "We wanted to understand the big picture: what does global microplastic exposure look like over time?"
 )
 
-st.subheader("➡️ Rising Trend of Global Food Microplastic Intake")
+total_slope = tables["bootstrap_trend_slopes"].loc["total_ug_per_kg", "slope_per_year"]
+total_direction = "rising" if total_slope > 0 else "falling"
 
-st.markdown("""
+st.subheader(f"➡️ {total_direction.capitalize()} Trend of Global Food Microplastic Intake")
+
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif; 
     color: #2e3d49; 
@@ -82,11 +179,30 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 26px;
 ">
-Microplastic contamination in our food is visibly rising, the overall average consumption across all countries and years being <strong>1600.6 µg/kg</strong>.
+Microplastic contamination in our food is visibly {total_direction} (by {abs(total_slope):.1f} µg/kg per year on average), the overall average consumption across all countries and years being <strong>{values["overall_average"]:.1f} µg/kg</strong>.
 </p>
 """, unsafe_allow_html=True)
 
-display_chart("output/1_total_ug_kg_year.png")
+@section
+def trend_chart():
+    category = st.selectbox(
+        "Food category",
+        ["total_ug_per_kg"] + list(shared_dataset().cube.categories),
+        key="trend_category",
+    )
+    countries, years = chart_filters("trend")
+    # the bootstrap intervals in the results are for all countries, so the band is only shown without a country filter
+    interval = None
+    if not countries and "bootstrap_yearly_means" in tables:
+        interval = yearly_interval(tables["bootstrap_yearly_means"], category)
+    st.plotly_chart(charts.trend_figure(category, countries, years, interval), use_container_width=True)
+    if interval is not None:
+        st.caption(
+            f"Shaded: 95% bootstrap interval of the yearly average "
+            f"({results['values']['bootstrap_resamples']} resamples of the countries of every year)."
+        )
+
+trend_chart()
 
 insight_section(
     "High-Risk Food Categories",
@@ -94,7 +210,12 @@ insight_section(
     "Which foods contribute the most to microplastic intake?"
 )
 
-st.subheader("➡️ Refined Grains, Milk, and Vegetables Dominate Global Microplastic Intake")
+category_averages = tables["category_averages"]["average"]
+global_leader = category_averages.idxmax()
+
+top_three = list(category_averages.nlargest(3).index)
+
+st.subheader(f"➡️ {and_list(category_label(c) for c in top_three)} Dominate Global Microplastic Intake")
 
 st.markdown("""
 <p style="
@@ -104,14 +225,34 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 26px;
 ">
-Across all countries and years, these three categories show the highest average contamination levels (μg/kg)</strong>.
+Across all countries and years, these three categories show the highest average contamination levels (μg/kg).
 </p>
 """, unsafe_allow_html=True)
 
-display_chart("output/2_average_consumption_top_n_food_categories.png")
+@section
+def top_categories_chart():
+    n = st.slider("Number of categories", 1, len(shared_dataset().cube.categories), 3, key="top_n")
+    countries, years = chart_filters("top_categories")
+    st.plotly_chart(charts.top_categories_figure(n, countries, years), use_container_width=True)
+
+top_categories_chart()
 
 st.subheader("➡️ How the Top Three Categories Have Evolved")
 
+yearly_means = tables["bootstrap_yearly_means"]
+
+def evolution_item(category):
+    # first and last year, and the peak in between, of the category's yearly average
+    means = yearly_interval(yearly_means, category)["mean"]
+    change = means.iloc[-1] / means.iloc[0] - 1
+    peak = ""
+    if means.idxmax() not in (means.index[0], means.index[-1]):
+        peak = f", after peaking at {means.max():.0f} μg/kg in {means.idxmax()}"
+    return (
+        f"<li><strong>{category_name(category).capitalize()}</strong> went from {means.iloc[0]:.0f} μg/kg in "
+        f"{means.index[0]} to {means.iloc[-1]:.0f} μg/kg in {means.index[-1]} ({change:+.0%}){peak}.</li>"
+    )
+
 st.markdown("""
 <style>
 .custom-text {
@@ -124,17 +265,18 @@ st.markdown("""
 </style>
 
 <p class="custom-text">
-The three biggest contributors tell three very different stories of risk.
+This is how the three biggest contributors have developed from the first to the last year of the data.
 </p>
 
 <ul class="custom-text">
-  <li><strong>Refined grains</strong> looked stable at first, but after 2005 contamination spiked and has stayed dangerously high ever since.</li>
-  <li><strong>Milk</strong> rose for years, then dropped sharply around 2005. Even with a partial rebound, today’s levels remain lower than before, making milk the only one moving in a less alarming direction.</li>
-  <li><strong>Non-starchy vegetables</strong> are the most concerning: contamination has climbed relentlessly across the whole period, with no sign of slowing down.</li>
+""" + "".join(evolution_item(category) for category in top_three) + """
 </ul>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+slopes = tables["top_category_slopes"]["slope_per_year"].sort_values(ascending=False)
+slowest_direction = "decreasing" if slopes.iloc[-1] < 0 else "rising the slowest"
+
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif; 
     color: #2e3d49; 
@@ -142,13 +284,30 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 26px;
 ">
-Overall, non-starchy vegetables exhibit the fastest increase in microplastic content (351.41 µg/kg per year), followed by refined grains (220.60 µg/kg per year). Milk, in contrast, is decreasing slightly (-17.32 µg/kg per year).
+Overall, {category_name(slopes.index[0])} show the fastest increase in microplastic content ({slopes.iloc[0]:.2f} µg/kg per year), followed by {category_name(slopes.index[1])} ({slopes.iloc[1]:.2f} µg/kg per year). {category_name(slopes.index[-1]).capitalize()}, in contrast, is {slowest_direction} ({slopes.iloc[-1]:.2f} µg/kg per year).
 </p>
 """, unsafe_allow_html=True)
 
 display_chart("output/4_analyze_microplastic_trends.png")
 
-st.subheader("➡️ The Usual Suspects Haven’t Changed")
+shares = tables["share_summary"]
+# the share columns are named after the compared years, e.g. "1990 Share" and "2018 Share"
+start_share, end_share = [column for column in shares.columns if column.endswith(" Share")]
+start_year, end_year = start_share.split()[0], end_share.split()[0]
+share_changes = (shares[end_share] - shares[start_share]) / shares[start_share] * 100
+lost_share = [category for category in top_three if share_changes[category] < 0]
+# the same three categories on top in both years, and the largest move of any category in the ranking
+same_leaders = set(shares[f"Rank {start_year}"].nsmallest(3).index) == set(shares[f"Rank {end_year}"].nsmallest(3).index)
+largest_move = int(shares["Rank Change"].abs().max())
+
+st.subheader("➡️ The Usual Suspects Haven’t Changed" if same_leaders else "➡️ The Usual Suspects Are Changing")
+
+def share_item(category):
+    steepest = ", the steepest drop of any category" if category == share_changes.idxmin() else ""
+    return (
+        f"<li><strong>{category_name(category).capitalize()}</strong> fell from {shares.loc[category, start_share]:.2f}% "
+        f"to {shares.loc[category, end_share]:.2f}%{steepest} ({share_changes[category]:.1f}%).</li>"
+    )
 
 st.markdown("""
 <style>
@@ -168,25 +327,26 @@ st.markdown("""
     margin-bottom: 20px !important;
 }
 </style>
+""", unsafe_allow_html=True)
 
+st.markdown(f"""
 <p class="custom-text">
-When we compare how different food categories contributed to total microplastic intake in 1990 and 2018, at first glance, there seems to be a shift in the story. Two of the three categories with the highest average contamination (refined grains and milk) have actually lost share since 1990.
+When we compare how different food categories contributed to total microplastic intake in {start_year} and {end_year}, at first glance, there seems to be a shift in the story. {len(lost_share)} of the three categories with the highest average contamination{f" ({and_list(category_name(c) for c in lost_share)})" if lost_share else ""} have actually lost share since {start_year}.
 </p>
 
 <ul class="custom-list">
-    <li><strong>Milk</strong> fell from 17.18% to 13.24%, the steepest drop of any category (−17.1%).</li>
-    <li><strong>Refined grains</strong> slipped from 20.36% to 19.03% (−6.5%).</li>
+    {"".join(share_item(category) for category in lost_share)}
 </ul>
 """, unsafe_allow_html=True)
 
-st.markdown("""
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
     font-size: 17px;
     line-height: 1.7;
 ">
-This decline might suggest that other foods are catching up and could become bigger threats in the future. But when we dig deeper, the picture turns out to be different. Rankings across food categories have barely changed in these years.
+This decline might suggest that other foods are catching up and could become bigger threats in the future. When we dig deeper, no category moved more than {largest_move} place{"" if largest_move == 1 else "s"} in the ranking between {start_year} and {end_year}, and {"the top three are still the same" if same_leaders else "the top three are no longer the same"}.
 </p>
             
 <p style="
@@ -196,43 +356,43 @@ This decline might suggest that other foods are catching up and could become big
     line-height: 1.7;
     margin-bottom: 20px;
 ">
-The table below shows how the share of different food categories has shifted from 1990 to 2018. 
+The table below shows how the share of different food categories has shifted from {start_year} to {end_year} (pick any other two years with the slider). 
 Columns show the percentage share in each year, the rank in both years, the rank change, and the compound annual growth rate (CAGR %).
 </p>
 
-<table style="
-    font-family: 'Arial', sans-serif; 
-    border-collapse: collapse; 
-    width: 100%; 
-    margin-bottom: 20px;">
-    <tr style="background-color:#f2f2f2;">
-        <th style="border: 1px solid #ddd; padding: 8px;">Food Category</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">1990 Share</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">2018 Share</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Rank 1990</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Rank 2018</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Rank Change</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">CAGR %</th>
-    </tr>
-    <tr><td>eggs</td><td>0.99%</td><td>1.23%</td><td>14</td><td>13</td><td>+1</td><td>1.57</td></tr>
-    <tr><td>non-starchy_vegetables</td><td>12.96%</td><td>15.58%</td><td>3</td><td>2</td><td>+1</td><td>1.44</td></tr>
-    <tr><td>added_sugars</td><td>5.03%</td><td>6.02%</td><td>6</td><td>5</td><td>+1</td><td>1.43</td></tr>
-    <tr><td>nuts_and_seeds</td><td>0.70%</td><td>0.82%</td><td>15</td><td>15</td><td>0</td><td>1.37</td></tr>
-    <tr><td>cheese</td><td>0.38%</td><td>0.42%</td><td>18</td><td>17</td><td>+1</td><td>1.13</td></tr>
-    <tr><td>fish</td><td>2.38%</td><td>2.60%</td><td>12</td><td>12</td><td>0</td><td>1.10</td></tr>
-    <tr><td>unprocessed_red_meats</td><td>5.43%</td><td>5.88%</td><td>5</td><td>6</td><td>-1</td><td>1.06</td></tr>
-    <tr><td>total_processed_meats</td><td>2.65%</td><td>2.74%</td><td>11</td><td>11</td><td>0</td><td>0.91</td></tr>
-    <tr><td>shellfish</td><td>0.46%</td><td>0.47%</td><td>16</td><td>16</td><td>0</td><td>0.87</td></tr>
-    <tr><td>potatoes</td><td>4.89%</td><td>4.97%</td><td>8</td><td>7</td><td>+1</td><td>0.83</td></tr>
-    <tr><td>beans_and_legumes</td><td>1.19%</td><td>1.19%</td><td>13</td><td>14</td><td>-1</td><td>0.76</td></tr>
-    <tr><td>fruits</td><td>12.47%</td><td>12.41%</td><td>4</td><td>4</td><td>0</td><td>0.76</td></tr>
-    <tr><td>other_starchy_vegetables</td><td>4.06%</td><td>3.97%</td><td>9</td><td>9</td><td>0</td><td>0.70</td></tr>
-    <tr><td>whole_grains</td><td>4.89%</td><td>4.67%</td><td>7</td><td>8</td><td>-1</td><td>0.61</td></tr>
-    <tr><td>yoghurt</td><td>3.55%</td><td>3.32%</td><td>10</td><td>10</td><td>0</td><td>0.54</td></tr>
-    <tr><td>refined_grains</td><td>20.36%</td><td>19.03%</td><td>1</td><td>1</td><td>0</td><td>0.53</td></tr>
-    <tr><td>total_salt</td><td>0.45%</td><td>0.41%</td><td>17</td><td>18</td><td>-1</td><td>0.44</td></tr>
-    <tr><td>total_milk</td><td>17.18%</td><td>14.25%</td><td>2</td><td>3</td><td>-1</td><td>0.10</td></tr>
-</table>
+""", unsafe_allow_html=True)
+
+@section
+def share_window_table():
+    # any two years of the data, the default is the comparison of the results above
+    year_options = [int(year) for year in shared_dataset().cube.years]
+    start, end = st.select_slider(
+        "Compare the years", year_options, (year_options[0], year_options[-1]), key="share_window"
+    )
+    if start == end:
+        st.info("Pick two different years to compare.")
+        return
+    window = aggregations.year_windows().query(start, end).sort_values("cagr_percent", ascending=False)
+    st.markdown(html_table(
+        [
+            [
+                category,
+                f"{row['start_share']:.2f}%",
+                f"{row['end_share']:.2f}%",
+                f"{row['start_rank']:.0f}",
+                f"{row['end_rank']:.0f}",
+                f"{row['rank_change']:+.0f}" if row["rank_change"] else "0",
+                f"{row['cagr_percent']:.2f}",
+            ]
+            for category, row in window.iterrows()
+        ],
+        ["Food Category", f"{start} Share", f"{end} Share", f"Rank {start}", f"Rank {end}", "Rank Change", "CAGR %"],
+        style="width: 100%; margin-bottom: 20px;",
+    ), unsafe_allow_html=True)
+
+share_window_table()
+
+st.markdown("""
 
 
 <p style="
@@ -241,12 +401,24 @@ Columns show the percentage share in each year, the rank in both years, the rank
     font-size: 17px;
     line-height: 1.7;
 ">         
-In other words, while shares have shifted slightly, the hierarchy of contamination is remarkably stable and persistent. The same foods that dominated three decades ago still dominate today. <strong>This stability suggests that contamination patterns are structurally persistent, and interventions so far have not significantly changed which foods dominate contamination risks</strong>.
+""" + (
+    "In other words, while shares have shifted slightly, the hierarchy of contamination is remarkably stable and persistent. "
+    f"The same foods that dominated in {start_year} still dominate in {end_year}. <strong>This stability suggests that "
+    "contamination patterns are structurally persistent, and interventions so far have not significantly changed which "
+    "foods dominate contamination risks</strong>."
+    if same_leaders else
+    f"In other words, the foods that dominate contamination risks in {end_year} are not all the ones that did in {start_year}."
+) + """
 
 </p>
 """, unsafe_allow_html=True)
 
-display_chart("output/9_food_category_shares_over_time.png")
+@section
+def shares_chart():
+    countries, years = chart_filters("shares")
+    st.plotly_chart(charts.shares_figure(countries, years), use_container_width=True)
+
+shares_chart()
 
 insight_section(
     "Geographical Variations in Microplastic Intake",
@@ -258,62 +430,27 @@ st.subheader("➡️ Record setters in average consumption")
 
 ## World map for countries with the highest and lowest average microplastic contamination
 
+highest_countries = tables["highest_countries"]["average"]
+lowest_countries = tables["lowest_countries"]["average"]
+
 # Top 10 highest average consumption
-top_10 = [
-    "Greece", "Montenegro", "Dominica", "Barbados", "Albania",
-    "Bosnia And Herzegovina", "Turkey", "United States",
-    "Ukraine", "Netherlands"
-]
+top_10 = highest_countries.index.tolist()
 
 # Bottom 10 lowest average consumption
-bottom_10 = [
-    "Djibouti", "Myanmar", "Cambodia", "Zimbabwe", "Ethiopia",
-    "The Gambia", "Guinea-Bissau", "Burkina Faso", "Chad", "Bangladesh"
-]
-
-# All recognized country names from pycountry
-all_countries = [country.name for country in pycountry.countries]
-
-# Create dataframe
-df = pd.DataFrame({"country": all_countries})
-
-# Add highlight categories
-def classify_country(x):
-    if x in top_10:
-        return "High (Top 10)"
-    elif x in bottom_10:
-        return "Low (Bottom 10)"
-    else:
-        return "Other"
-
-df["highlight"] = df["country"].apply(classify_country)
-
-# Color mapping: grey = others, red = high, blue = low
-color_map = {
-    "Other": "#eeeeee",
-    "High (Top 10)": "#FF6B6B",
-    "Low (Bottom 10)": "#4C9AFF"
-}
-
-fig = px.choropleth(
-    df,
-    locations="country",
-    locationmode="country names",
-    color="highlight",
-    hover_name="country",
-    color_discrete_map=color_map
-)
+bottom_10 = lowest_countries.index.tolist()
 
-fig.update_layout(
-    legend_title_text="Microplastic Level",
-    margin={"r": 0, "t": 0, "l": 0, "b": 0}
-)
-
-fig.update_traces(
-    hovertemplate="%{location}<extra></extra>"
-)
+# The map only changes when the results change, so it is built once per process and shared by all sessions
+@st.cache_resource
+def build_level_map(top_10, bottom_10):
+    # Color mapping: grey = others, red = high, blue = low
+    return highlight_map(
+        {"High (Top 10)": top_10, "Low (Bottom 10)": bottom_10},
+        {"High (Top 10)": "#FF6B6B", "Low (Bottom 10)": "#4C9AFF"},
+        legend_title="Microplastic Level",
+    )
 
-fig.update_geos(projection_type="natural earth", fitbounds="locations", visible=False)
+iso3 = country_index().map(top_10 + bottom_10, "iso3").tolist()
+fig = build_level_map(tuple(iso3[:len(top_10)]), tuple(iso3[len(top_10):]))
 
 st.plotly_chart(fig, use_container_width=True, height=600)
 
@@ -321,39 +458,21 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown('<p style="text-align:center; font-size:16px; font-weight:bold;">5 Countries with Lowest Average Consumption</p>', unsafe_allow_html=True)
-    st.markdown("""
-    <table style="font-family: Arial, sans-serif; border-collapse: collapse; width: 100%;">
-        <tr style="background-color:#f2f2f2;">
-            <th style="border: 1px solid #ddd; padding: 8px;">Country</th>
-            <th style="border: 1px solid #ddd; padding: 8px;">Average Consumption</th>
-        </tr>
-        <tr><td>The Gambia</td><td>746.80</td></tr>
-        <tr><td>Guinea-Bissau</td><td>738.99</td></tr>
-        <tr><td>Burkina Faso</td><td>726.80</td></tr>
-        <tr><td>Chad</td><td>717.14</td></tr>
-        <tr><td>Bangladesh</td><td>634.60</td></tr>
-    </table>
-    """, unsafe_allow_html=True)
+    st.markdown(html_table(
+        [[country, f"{average:.2f}"] for country, average in lowest_countries.tail(5).items()],
+        ["Country", "Average Consumption"],
+    ), unsafe_allow_html=True)
 
 with col2:
     st.markdown('<p style="text-align:center; font-size:16px; font-weight:bold;">5 Countries with Highest Average Consumption</p>', unsafe_allow_html=True)
-    st.markdown("""
-    <table style="font-family: Arial, sans-serif; border-collapse: collapse; width: 100%;">
-        <tr style="background-color:#f2f2f2;">
-            <th style="border: 1px solid #ddd; padding: 8px;">Country</th>
-            <th style="border: 1px solid #ddd; padding: 8px;">Average Consumption</th>
-        </tr>
-        <tr><td>Greece</td><td>2844.98</td></tr>
-        <tr><td>Montenegro</td><td>2601.90</td></tr>
-        <tr><td>Dominica</td><td>2584.91</td></tr>
-        <tr><td>Barbados</td><td>2504.98</td></tr>
-        <tr><td>Albania</td><td>2454.38</td></tr>
-    </table>
-    """, unsafe_allow_html=True)
+    st.markdown(html_table(
+        [[country, f"{average:.2f}"] for country, average in highest_countries.head(5).items()],
+        ["Country", "Average Consumption"],
+    ), unsafe_allow_html=True)
 
 st.markdown("---")
 st.markdown("## Geographical Patterns and Possible Explanations")
-st.markdown("""
+st.markdown(f"""
 <div style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -361,25 +480,30 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 20px;
 ">
-<p>When comparing countries with the highest and lowest average microplastic contamination, certain patterns emerge that may point to underlying causes.</p>
+<p>When comparing countries with the highest and lowest average microplastic contamination (highest: {and_list(top_10)}; lowest: {and_list(bottom_10)}), a few possible causes come to mind. They are hypotheses to check against these lists, the dataset itself does not contain geography or economic data.</p>
 
 <p><strong>1. Marine Geography</strong><br>
-Many of the highest-consuming countries are located around <strong>semi-enclosed or enclosed seas</strong> such as the Mediterranean, Black Sea, and Caribbean. These waters have limited circulation, which may allow plastics to accumulate more than in open oceans.<br>
-In contrast, several of the lowest-consuming countries are either <strong>landlocked</strong> (e.g., Chad, Burkina Faso, Ethiopia) or situated on coastlines linked to <strong>more open seas</strong> (e.g., Bay of Bengal, Gulf of Thailand), where pollutants may disperse more widely.</p>
+Countries around <strong>semi-enclosed or enclosed seas</strong> may see more contamination: these waters have limited circulation, which may allow plastics to accumulate more than in open oceans.<br>
+In contrast, <strong>landlocked</strong> countries or coastlines linked to <strong>more open seas</strong>, where pollutants may disperse more widely, may see less.</p>
 
 <p><strong>2. Industrialization and Trade</strong><br>
-Industrial and highly connected economies (e.g., the Netherlands, the United States, and Turkey) appear among the high-consumption group. This could reflect greater levels of plastic production, waste generation, and shipping activity, which are known sources of microplastics.<br>
-Many of the countries with the lowest plastic consumption are <strong>less industrialized</strong> and generate less plastic waste overall, which may contribute to lower contamination levels.</p>
+Industrial and highly connected economies could have higher levels because of greater plastic production, waste generation, and shipping activity, which are known sources of microplastics.<br>
+<strong>Less industrialized</strong> countries generate less plastic waste overall, which may contribute to lower contamination levels.</p>
 
 <p><strong>3. Food Packaging</strong><br>
-In lower-income or less industrialized countries (e.g., Chad, Burkina Faso), foods are often sold fresh in markets with minimal plastic packaging, thereby reducing exposure to packaging sources.</p>
+Where foods are mostly sold fresh in markets with minimal plastic packaging, exposure to packaging sources is lower.</p>
 </div>
 """, unsafe_allow_html=True)
 
 
 st.subheader("➡️ Different Countries, Different Main Threats")
 
-st.markdown("""
+high = tables["highest_country_breakdown"]["value"]
+low = tables["lowest_country_breakdown"]["value"]
+high_overlap = len(set(high.head(10).index) & set(category_averages.nlargest(10).index))
+leader_rank = list(high.index).index(global_leader) + 1
+
+st.markdown(f"""
 <div style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -390,13 +514,13 @@ st.markdown("""
 
 <p>When we look at the countries with the highest and lowest average microplastic consumption, two very different stories appear.</p>
 
-<p>In <strong>Greece</strong>, which sits at the top of the ranking, contamination is spread across many foods. Seven categories show levels above 100 μg/kg, and 9 out of the top 10 overlap with the global picture. But the real surprise is milk: with more than 600 μg/kg, it overshadows every other category and becomes Greece’s biggest threat. Even refined grains, usually the global leader, only come in seventh here.</p>
+<p>In <strong>{values["highest_country"]}</strong>, which sits at the top of the ranking, contamination is spread across many foods. In {values["breakdown_year"]}, {(high > 100).sum()} categories show levels above 100 μg/kg, and {high_overlap} out of the top 10 overlap with the global picture. Its biggest threat is {category_name(high.index[0])}, with {high.iloc[0]:.0f} μg/kg. {category_name(global_leader).capitalize()}, the global leader, {"leads here too" if leader_rank == 1 else f"only comes in at number {leader_rank} here"}.</p>
 </div>
 """, unsafe_allow_html=True)
 
-display_chart("output/5_microplastic_breakdown_high_country.png")
+breakdown_chart("breakdown_high", values["highest_country"], values["breakdown_year"])
 
-st.markdown("""
+st.markdown(f"""
 <div style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -404,15 +528,20 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 20px;
 ">
-<p>At the other end of the spectrum lies <strong>Bangladesh</strong>, the country with the lowest average consumption. Here, the picture looks simpler. Refined grains dominate the contamination profile with values above 300 μg/kg, while the next category, potatoes, lags far behind at almost half that level.</p>
+<p>At the other end of the spectrum lies <strong>{values["lowest_country"]}</strong>, the country with the lowest average consumption. Here, the picture looks simpler. {category_name(low.index[0]).capitalize()} lead the contamination profile with {low.iloc[0]:.0f} μg/kg, while the next category, {category_name(low.index[1])}, is at {low.iloc[1]:.0f} μg/kg ({low.iloc[1] / low.iloc[0]:.0%} of that level).</p>
 </div>
 """, unsafe_allow_html=True)
 
-display_chart("output/6_microplastic_breakdown_low_country.png")
+breakdown_chart("breakdown_low", values["lowest_country"], values["breakdown_year"])
 
 st.subheader("➡️ Countries with the Fastest Growth")
 
-st.markdown("""
+growth = tables["top_countries_growth"]
+longest = growth["period_years"].max()
+recent = growth[growth["period_years"] < longest]
+long_term = growth[growth["period_years"] == longest]
+
+st.markdown(f"""
 <div style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -420,34 +549,33 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 20px;
 ">
-<p>When looking at which countries have seen the fastest rise in microplastic contamination, a mix of European and Asian nations stand out. <strong>Belgium, Croatia, Laos, Myanmar, and Vietnam</strong> all show strong growth over time. </p>
+<p>When looking at which countries have seen the fastest rise in microplastic contamination, {len(growth)} nations stand out. <strong>{and_list(growth.index)}</strong> all show strong growth over time. </p>
 </div>
 """, unsafe_allow_html=True)
 
-st.markdown("""
-<table style="
-    font-family: 'Arial', sans-serif;
-    border-collapse: collapse;
-    width: 100%;
-    margin-bottom: 20px;
-">
-    <tr style="background-color:#f2f2f2;">
-        <th style="border: 1px solid #ddd; padding: 8px;">Country</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Starting Year</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">1990 Value (μg/kg)</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">2018 Value (μg/kg)</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Period (Years)</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Growth Rate</th>
-    </tr>
-    <tr><td>Croatia</td><td>2010</td><td>1861.64</td><td>2582.07</td><td>8</td><td>4.17%</td></tr>
-    <tr><td>Laos</td><td>1990</td><td>713.83</td><td>1923.90</td><td>28</td><td>3.60%</td></tr>
-    <tr><td>Belgium</td><td>2010</td><td>1734.37</td><td>2280.74</td><td>8</td><td>3.48%</td></tr>
-    <tr><td>Myanmar</td><td>1990</td><td>493.48</td><td>1232.89</td><td>28</td><td>3.32%</td></tr>
-    <tr><td>Vietnam</td><td>1990</td><td>639.51</td><td>1449.62</td><td>28</td><td>2.97%</td></tr>
-</table>
-""", unsafe_allow_html=True)
-
-import streamlit as st
+st.markdown(html_table(
+    [
+        [
+            country,
+            f"{row['starting_year']:.0f}",
+            f"{row['first_value']:.2f}",
+            f"{row['last_value']:.2f}",
+            f"{row['period_years']:.0f}",
+            f"{row['growth_rate']:.2%}",
+        ]
+        for country, row in tables["top_countries_growth"].iterrows()
+    ],
+    ["Country", "Starting Year", "Start Value (μg/kg)", f"{growth['finishing_year'].max():.0f} Value (μg/kg)", "Period (Years)", "Growth Rate"],
+    style="width: 100%; margin-bottom: 20px;",
+), unsafe_allow_html=True)
+
+if len(recent):
+    growth_periods = (
+        f"<strong>{and_list(recent.index)}</strong> show very steep rises despite having <strong>shorter time periods "
+        f"(since {recent['starting_year'].min():.0f})</strong>, while {and_list(long_term.index)} grow over {longest:.0f} years."
+    )
+else:
+    growth_periods = f"All of them grow over the full {longest:.0f} years."
 
 st.markdown("""
 <style>
@@ -469,43 +597,33 @@ st.markdown("""
 </style>
 
 <p class="custom-text">
-<strong>Croatia and Belgium</strong> show very steep rises despite having <strong>shorter time periods (since 2010)</strong>, while Laos, Myanmar, and Vietnam have steadier but long-term growth across nearly three decades.</p>
+""" + growth_periods + """</p>
 """, unsafe_allow_html=True)
 
-st.markdown("""
-<table style="
-    font-family: 'Arial', sans-serif;
-    border-collapse: collapse;
-    width: 100%;
-    margin-bottom: 20px;
-">
-    <tr style="background-color:#f2f2f2;">
-        <th style="border: 1px solid #ddd; padding: 8px;">Country</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Food Category</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Start Year</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">End Year</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Start Value (μg/kg)</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">End Value (μg/kg)</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">Period (Years)</th>
-        <th style="border: 1px solid #ddd; padding: 8px;">CAGR</th>
-    </tr>
-    <tr><td>Belgium</td><td>Other Starchy Vegetables</td><td>2010</td><td>2018</td><td>0.99</td><td>3.45</td><td>8</td><td>16.95%</td></tr>
-    <tr><td>Belgium</td><td>Milk</td><td>2010</td><td>2018</td><td>161.73</td><td>504.71</td><td>8</td><td>15.29%</td></tr>
-    <tr><td>Belgium</td><td>Fruits</td><td>2010</td><td>2018</td><td>155.18</td><td>335.40</td><td>8</td><td>10.11%</td></tr>
-    <tr><td>Croatia</td><td>Non-Starchy Vegetables</td><td>2010</td><td>2018</td><td>210.14</td><td>835.42</td><td>8</td><td>18.83%</td></tr>
-    <tr><td>Croatia</td><td>Processed Meats</td><td>2010</td><td>2018</td><td>54.05</td><td>76.23</td><td>8</td><td>4.39%</td></tr>
-    <tr><td>Croatia</td><td>Unprocessed Red Meats</td><td>2010</td><td>2018</td><td>121.65</td><td>171.55</td><td>8</td><td>4.39%</td></tr>
-    <tr><td>Laos</td><td>Added Sugars</td><td>1990</td><td>2018</td><td>5.97</td><td>110.00</td><td>28</td><td>10.97%</td></tr>
-    <tr><td>Laos</td><td>Non-Starchy Vegetables</td><td>1990</td><td>2018</td><td>42.30</td><td>629.29</td><td>28</td><td>10.12%</td></tr>
-    <tr><td>Laos</td><td>Nuts and Seeds</td><td>1990</td><td>2018</td><td>2.49</td><td>14.77</td><td>28</td><td>6.56%</td></tr>
-    <tr><td>Myanmar</td><td>Processed Meats</td><td>1990</td><td>2018</td><td>3.83</td><td>46.85</td><td>28</td><td>9.36%</td></tr>
-    <tr><td>Myanmar</td><td>Unprocessed Red Meats</td><td>1990</td><td>2018</td><td>10.91</td><td>133.51</td><td>28</td><td>9.36%</td></tr>
-    <tr><td>Myanmar</td><td>Eggs</td><td>1990</td><td>2018</td><td>2.14</td><td>25.89</td><td>28</td><td>9.32%</td></tr>
-    <tr><td>Vietnam</td><td>Nuts and Seeds</td><td>1990</td><td>2018</td><td>2.68</td><td>32.47</td><td>28</td><td>9.31%</td></tr>
-    <tr><td>Vietnam</td><td>Shellfish</td><td>1990</td><td>2018</td><td>3.10</td><td>28.05</td><td>28</td><td>8.19%</td></tr>
-    <tr><td>Vietnam</td><td>Cheese</td><td>1990</td><td>2018</td><td>0.05</td><td>0.38</td><td>28</td><td>7.20%</td></tr>
-</table>
-""", unsafe_allow_html=True)
+drivers = tables["top_drivers_cagr"]
+fastest = drivers.loc[drivers["CAGR"].idxmax()]
+
+def driver_item(country, rows):
+    foods = [f"{category_name(row['food_category'])} ({row['CAGR']:.2%})" for _, row in rows.iterrows()]
+    return f"<li><strong>{country}</strong>: {and_list(foods)}</li>"
+
+st.markdown(html_table(
+    [
+        [
+            row["country"],
+            category_label(row["food_category"]),
+            row["start_year"],
+            row["end_year"],
+            f"{row['start_value']:.2f}",
+            f"{row['end_value']:.2f}",
+            row["period_years"],
+            f"{row['CAGR']:.2%}",
+        ]
+        for _, row in drivers.iterrows()
+    ],
+    ["Country", "Food Category", "Start Year", "End Year", "Start Value (μg/kg)", "End Value (μg/kg)", "Period (Years)", "CAGR"],
+    style="width: 100%; margin-bottom: 20px;",
+), unsafe_allow_html=True)
 
 st.markdown("""
 <style>
@@ -523,20 +641,36 @@ st.markdown("""
 </p>
 
 <p class="custom-text">
-Examining the fastest-growing microplastic contributors reveals some interesting patterns. Both Belgium and Croatia show particularly high growth in <strong>vegetables</strong>, with Belgium’s <strong>other starchy vegetables</strong> (CAGR 16.95%) and Croatia’s <strong>non-starchy vegetables</strong> (CAGR 18.83%) leading the way, suggesting that shifts in vegetable consumption or processing practices may strongly influence microplastic exposure in Europe.
-</p>
-
-<p class="custom-text">
-Meanwhile, animal-derived products like <strong>milk</strong> in Belgium (CAGR 15.29%) and <strong>processed/unprocessed meats</strong> in Croatia also show noticeable growth, highlighting that both plant and animal food chains are important contributors.
+Examining the fastest-growing microplastic contributors shows which foods drive the growth in each country. The steepest rise of all is """
+f"<strong>{category_name(fastest['food_category'])}</strong> in {fastest['country']} (CAGR {fastest['CAGR']:.2%})."
+"""
 </p>
 
-<p class="custom-text">
-In Asia, Laos exhibits striking increases in <strong>non-starchy vegetables</strong> and <strong>added sugars</strong>, while Myanmar and Vietnam show steady growth across <strong>meats, eggs, nuts, and shellfish</strong>, suggesting a more widespread pattern of contamination across multiple food categories.
-</p>
+<ul class="custom-list">
+""" + "".join(driver_item(country, rows) for country, rows in drivers.groupby("country", sort=False)) + """
+</ul>
 
 """, unsafe_allow_html=True)
 
-st.subheader("➡️ Africa Has the Most Concentrated Contamination, Driven by Refined Grains")
+continent_names = {
+    "AF": "Africa",
+    "AS": "Asia",
+    "EU": "Europe",
+    "NA": "North America",
+    "OC": "Oceania",
+    "SA": "South America",
+}
+continent_shares = tables["continent_max_share"]["max_share"]
+first, second, third = [(continent_names.get(code, code), share) for code, share in continent_shares.head(3).items()]
+
+concentration = tables["concentration_metrics"]
+top10_categories = tables["top10_contributors"]["top_category"]
+category_counts = tables["top_category_counts"]["countries"]
+# the category that leads in most of the 10 most concentrated countries, and the continent most of them are in
+leading = top10_categories.value_counts()
+top10_continents = concentration.head(10)["continent"].value_counts()
+
+st.subheader(f"➡️ {first[0]} Has the Most Concentrated Contamination, Driven by {category_label(leading.index[0])}")
 
 st.markdown("""
 <p style="
@@ -550,60 +684,36 @@ To better understand the sources of microplastic contamination, we examined whet
 </p>
 """, unsafe_allow_html=True)
 
+def concentration_table(metrics):
+    return html_table(
+        [
+            [country, f"{row['mean_per_category']:.2f}", f"{row['std_per_category']:.2f}", f"{row['max_share']:.3f}"]
+            for country, row in metrics.iterrows()
+        ],
+        ["Country", "Mean per Category", "Std per Category", "Max Share"],
+    )
+
 col1, col2 = st.columns(2)
 
 with col1:
-    st.markdown("""
-    <div style="margin-right: 10px;">
-    <p style="text-align:center; font-size:16px; font-weight:bold;">10 Countries with Most Concentrated Contamination</p>
-    <table style="font-family: Arial, sans-serif; border-collapse: collapse; width: 100%;">
-        <tr style="background-color:#f2f2f2;">
-            <th style="border:1px solid #ddd; padding:8px;">Country</th>
-            <th style="border:1px solid #ddd; padding:8px;">Mean per Category</th>
-            <th style="border:1px solid #ddd; padding:8px;">Std per Category</th>
-            <th style="border:1px solid #ddd; padding:8px;">Max Share</th>
-        </tr>
-        <tr><td>Congo</td><td>77.87</td><td>187.06</td><td>0.579</td></tr>
-        <tr><td>Angola</td><td>73.77</td><td>156.07</td><td>0.516</td></tr>
-        <tr><td>Togo</td><td>59.50</td><td>131.59</td><td>0.508</td></tr>
-        <tr><td>Zimbabwe</td><td>44.61</td><td>89.75</td><td>0.486</td></tr>
-        <tr><td>Madagascar</td><td>57.75</td><td>111.78</td><td>0.461</td></tr>
-        <tr><td>Cote D'Ivoire</td><td>85.96</td><td>189.79</td><td>0.450</td></tr>
-        <tr><td>Tanzania</td><td>72.91</td><td>134.99</td><td>0.445</td></tr>
-        <tr><td>Cambodia</td><td>47.70</td><td>89.21</td><td>0.442</td></tr>
-        <tr><td>Ethiopia</td><td>43.65</td><td>81.71</td><td>0.425</td></tr>
-        <tr><td>Niger</td><td>58.81</td><td>107.94</td><td>0.421</td></tr>
-    </table>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(
+        '<div style="margin-right: 10px;">'
+        '<p style="text-align:center; font-size:16px; font-weight:bold;">10 Countries with Most Concentrated Contamination</p>'
+        + concentration_table(concentration.head(10))
+        + "</div>",
+        unsafe_allow_html=True,
+    )
 
 with col2:
-    st.markdown("""
-    <div style="margin-left: 10px;">
-    <p style="text-align:center; font-size:16px; font-weight:bold;">10 Countries with Most Widespread Contamination</p>
-    <table style="font-family: Arial, sans-serif; border-collapse: collapse; width: 100%;">
-        <tr style="background-color:#f2f2f2;">
-            <th style="border:1px solid #ddd; padding:8px;">Country</th>
-            <th style="border:1px solid #ddd; padding:8px;">Mean per Category</th>
-            <th style="border:1px solid #ddd; padding:8px;">Std per Category</th>
-            <th style="border:1px solid #ddd; padding:8px;">Max Share</th>
-        </tr>
-        <tr><td>Spain</td><td>121.87</td><td>138.59</td><td>0.197</td></tr>
-        <tr><td>Slovenia</td><td>108.51</td><td>119.82</td><td>0.196</td></tr>
-        <tr><td>Colombia</td><td>87.90</td><td>98.54</td><td>0.195</td></tr>
-        <tr><td>Cameroon</td><td>97.52</td><td>122.31</td><td>0.194</td></tr>
-        <tr><td>Ukraine</td><td>133.36</td><td>152.04</td><td>0.188</td></tr>
-        <tr><td>Trinidad And Tobago</td><td>72.12</td><td>75.42</td><td>0.184</td></tr>
-        <tr><td>Russia</td><td>120.85</td><td>122.18</td><td>0.178</td></tr>
-        <tr><td>Cuba</td><td>102.70</td><td>114.18</td><td>0.171</td></tr>
-        <tr><td>Belgium</td><td>111.89</td><td>108.68</td><td>0.157</td></tr>
-        <tr><td>Barbados</td><td>139.17</td><td>130.91</td><td>0.147</td></tr>
-    </table>
-    </div>
-    """, unsafe_allow_html=True)
-
-
-st.markdown("""
+    st.markdown(
+        '<div style="margin-left: 10px;">'
+        '<p style="text-align:center; font-size:16px; font-weight:bold;">10 Countries with Most Widespread Contamination</p>'
+        + concentration_table(concentration.tail(10))
+        + "</div>",
+        unsafe_allow_html=True,
+    )
+
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -612,28 +722,36 @@ st.markdown("""
     margin-top: 14px;
     margin-bottom: 20px;
 ">
-It seems that the countries with the most concentrated contamination are mostly <strong>African</strong>. To investigate this further, we calculated Max Share for each continent. Africa ranks highest with an average share of <strong>33.9%</strong>, meaning that in African countries (within our dataset), the single most contaminated category accounts for about one-third of total microplastic intake. In comparison, the figure is <strong>28.7% in Asia and 27.7% in Oceania</strong>.<br>
+{top10_continents.iloc[0]} of the 10 countries with the most concentrated contamination are in <strong>{continent_names.get(top10_continents.index[0], top10_continents.index[0])}</strong>. To investigate this further, we calculated Max Share for each continent. {first[0]} ranks highest with an average share of <strong>{first[1]:.1%}</strong>, meaning that in its countries (within our dataset), the single most contaminated category accounts for {first[1]:.0%} of total microplastic intake on average. In comparison, the figure is <strong>{second[1]:.1%} in {second[0]} and {third[1]:.1%} in {third[0]}</strong>.<br>
 </p>
 """, unsafe_allow_html=True)
 
 # Continent-level table
 st.markdown('<p style="text-align:center; font-size:16px; font-weight:bold;">Average Share of Most Contaminated Food Category per Continent</p>', unsafe_allow_html=True)
-st.markdown("""
-<table style="font-family: Arial, sans-serif; border-collapse: collapse; width:50%; margin:auto;">
-    <tr style="background-color:#f2f2f2;">
-        <th style="border:1px solid #ddd; padding:8px;">Continent</th>
-        <th style="border:1px solid #ddd; padding:8px;">Max Share</th>
-    </tr>
-    <tr><td>Africa (AF)</td><td>0.339</td></tr>
-    <tr><td>Asia (AS)</td><td>0.287</td></tr>
-    <tr><td>Oceania (OC)</td><td>0.277</td></tr>
-    <tr><td>Europe (EU)</td><td>0.260</td></tr>
-    <tr><td>North America (NA)</td><td>0.245</td></tr>
-    <tr><td>South America (SA)</td><td>0.242</td></tr>
-</table>
-""", unsafe_allow_html=True)
-
-st.markdown("""
+st.markdown(html_table(
+    [[f"{continent_names.get(code, code)} ({code})", f"{share:.3f}"] for code, share in continent_shares.items()],
+    ["Continent", "Max Share"],
+    style="width:50%; margin:auto;",
+), unsafe_allow_html=True)
+
+top10 = tables["top10_contributors"]
+lead = leading.index[0]
+# countries where the leading category is more than half of the total
+dominated = top10[(top10["top_category"] == lead) & (top10["share"] > 0.5)].index
+lead_notes = ""
+if lead == global_leader:
+    lead_notes += f" As noted earlier, {category_name(lead)} are also the largest contributor to microplastics globally."
+lead_notes += (
+    f" They are the biggest source in <strong>{category_counts.get(lead, 0) / category_counts.sum():.0%} of countries</strong> in our dataset."
+)
+if len(dominated):
+    lead_notes += (
+        f" For instance, in <strong>{and_list(dominated)}</strong>, {category_name(lead)} account for "
+        "<strong>more than 50%</strong> of total contamination (μg/kg)."
+    )
+count_leaders = [(category_name(category), count) for category, count in category_counts.head(3).items()]
+
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -642,17 +760,25 @@ st.markdown("""
     margin-top: 14px;
     margin-bottom: 20px;
 ">
-Looking at the top 10 countries with the most concentrated microplastic contamination, we found that in 9 out of 10 of them, the leading category is <strong>refined grains</strong>. As noted earlier, refined grains are also the largest contributor to microplastics globally. They are the biggest source in <strong>41% of countries</strong> in our dataset and are particularly dominant in several African nations. For instance, in <strong>Congo, Angola, and Togo</strong>, refined grains account for <strong>more than 50%</strong> of total contamination (μg/kg). This contamination often originates during <strong>milling, drying, and packaging processes</strong>.<br>
-Finally, we checked which category is the biggest contributor across all countries. On average, <strong>refined grains top the list in 44 countries</strong>, followed by <strong>milk (32 countries)</strong> and <strong>non-starchy vegetables (16 countries)</strong>.
+Looking at the top 10 countries with the most concentrated microplastic contamination, we found that in {leading.iloc[0]} out of {len(top10_categories)} of them, the leading category is <strong>{category_name(lead)}</strong>.{lead_notes}<br>
+Finally, we checked which category is the biggest contributor across all countries. <strong>{count_leaders[0][0].capitalize()} top the list in {count_leaders[0][1]} countries</strong>, followed by <strong>{count_leaders[1][0]} ({count_leaders[1][1]} countries)</strong> and <strong>{count_leaders[2][0]} ({count_leaders[2][1]} countries)</strong>.
 </p>
 """, unsafe_allow_html=True)
 
 display_chart("output/8_biggest_contributors_count.png")
 
-st.subheader("➡️ Milk is a Strong Predictor of Totals")
+# the food categories by their correlation with the total (year is not a food category)
+with_total = tables["correlation_with_total"]["correlation"].drop("year", errors="ignore").sort_values(ascending=False)
+strongest = with_total.head(3)
+strongest_names = [category_name(category) for category in strongest.index]
+# among the five strongest: the ones that are also among the five most contaminated, and the others ("swing factors")
+most_contaminated = set(category_averages.nlargest(5).index)
+central = [category for category in with_total.head(5).index if category in most_contaminated]
+swing = [category for category in with_total.head(5).index if category not in most_contaminated]
 
+st.subheader(f"➡️ {category_label(strongest.index[0])}: the Strongest Predictor of Totals")
 
-st.markdown("""
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -660,13 +786,39 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 20px;
 ">
-To complement the main results, we also examined how individual food groups correlate with the overall level of microplastic contamination. This perspective highlights which categories tend to move in step with total contamination and therefore act as key drivers of variation across countries and years. The strongest correlations were found for <strong>milk, unprocessed red meats, and potatoes (correlations above 0.65)</strong>.
+To complement the main results, we also examined how individual food groups correlate with the overall level of microplastic contamination. This perspective highlights which categories tend to move in step with total contamination and therefore act as key drivers of variation across countries and years. The strongest correlations were found for <strong>{strongest_names[0]}, {strongest_names[1]}, and {strongest_names[2]} (correlations above {int(strongest.min() * 20) / 20:.2f})</strong>.
 </p>      
 """, unsafe_allow_html=True)
 
 display_chart("output/7_intermediate_correlation_of_microplastics.png")
 
-st.markdown("""
+correlation_notes = []
+if central:
+    correlation_notes.append(
+        f"<strong>{category_name(central[0]).capitalize()}</strong> stands out in particular: it is not only among the "
+        f"most contaminated categories on average, but also highly predictive of total contamination levels "
+        f"({with_total[central[0]]:.2f})."
+    )
+if with_total[global_leader] < 0.3:
+    correlation_notes.append(
+        f"By contrast, <strong>{category_name(global_leader)}</strong>, despite the highest average contamination, show "
+        f"little correlation with totals ({with_total[global_leader]:.2f}), suggesting they are consistently contaminated "
+        "across countries rather than driving cross-country differences."
+    )
+
+summary = "Taken together, this indicates that "
+if central:
+    summary += f"some foods (such as {and_list(category_name(c) for c in central)}) are both highly contaminated and central to overall exposure patterns"
+if central and swing:
+    summary += ", while "
+if swing:
+    summary += (
+        f"others (like {and_list(category_name(c) for c in swing)}) function more as <strong>“swing factors”</strong>: "
+        "they may not always be the most contaminated foods, but where they are elevated, they strongly boost the "
+        "overall contamination totals"
+    )
+
+st.markdown(f"""
 <p style="
     font-family: 'Arial', sans-serif;
     color: #2e3d49;
@@ -674,7 +826,7 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 20px;
 ">
-<strong>Milk</strong> stands out in particular: it is not only among the most contaminated categories on average, but also highly predictive of total contamination levels. <strong>Non-starchy vegetables</strong> show a similar, though slightly weaker, pattern. By contrast, <strong>refined grains</strong>, despite their high average contamination, show little correlation with totals, suggesting they are consistently contaminated across countries rather than driving cross-country differences.
+{" ".join(correlation_notes)}
 </p>      
                
 <p style="
@@ -684,7 +836,7 @@ st.markdown("""
     line-height: 1.7;
     margin-bottom: 20px;
 ">
-Taken together, this indicates that some foods (such as milk and non-starchy vegetables) are both highly contaminated and central to overall exposure patterns, while others (like red meats and potatoes) function more as <strong>“swing factors”</strong>: they may not always be the most contaminated foods, but where they are elevated, they strongly boost the overall contamination totals.
+{summary}.
 </p>
 """, unsafe_allow_html=True)
 
@@ -712,4 +864,12 @@ and pointing to areas for further research. One promising avenue is the use of
 which could help predict how microplastic levels might evolve over time and inform 
 more proactive interventions.
 </p>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# full runs of the page (fragment reruns of the charts are timed by their own names)
+timing.record("page (full run)", time.perf_counter() - page_start)
+
+# ?timings=1 shows how long every section took so far (in this process, all sessions)
+if st.query_params.get("timings"):
+    with st.expander("⏱️ Section timings"):
+        st.dataframe(timing.summary().round(1))
@@ -0,0 +1,177 @@
+"""
+Deferred chart rendering.
+
+The analysis functions in main.py compute their data and hand the drawing to submit_chart().
+Outside of collect_charts() a chart is drawn right away, so calling an analysis function from a notebook works as before.
+Inside collect_charts() the charts are only queued, and render_charts() draws them afterwards,
+optionally in a process pool (matplotlib is not thread-safe, so we use processes and not threads).
+
+Every queued chart is a node of a small build graph. Its key hashes the data and options it is drawn from
+and the source code of its render function. render_charts() keeps the keys of the charts it drew in a manifest
+and skips every chart whose file still exists under the same key, so a run without changes draws nothing.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from dataset import atomic_write
+
+# list of queued (name, render_fn, args, kwargs) while collect_charts() is active, None otherwise
+_queue = None
+
+MANIFEST_NAME = ".build_manifest.json"
+
+# bump to invalidate every chart at once, e.g. after changing the shared plot style
+BUILD_VERSION = "1"
+
+
+def submit_chart(name, render_fn, *args, **kwargs):
+    """
+    Draw a chart now, or queue it if charts are being collected.
+
+    Parameters:
+        name (str): Output file of the chart, used to report timings and to drop duplicates.
+        render_fn (callable): Module-level function that draws and saves the chart (it has to be picklable).
+        *args, **kwargs: Data and options for render_fn.
+    """
+    if _queue is None:
+        render_fn(*args, **kwargs)
+        return
+    # the same file may be requested more than once (e.g. top 3 and later top 10 categories), the last request wins
+    _queue[:] = [job for job in _queue if job[0] != name]
+    _queue.append((name, render_fn, args, kwargs))
+
+
+@contextmanager
+def collect_charts():
+    """Queue every submit_chart() inside the block and yield the list of queued jobs."""
+    global _queue
+    previous, _queue = _queue, []
+    try:
+        yield _queue
+    finally:
+        _queue = previous
+
+
+def _fingerprint(value, digest):
+    # feed a stable representation of a chart input into the hash
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode())
+            digest.update(repr(list(value.dtypes.astype(str))).encode())
+        else:
+            digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(repr(value.index.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}[{len(value)}]".encode())
+        for item in value:
+            _fingerprint(item, digest)
+    elif isinstance(value, dict):
+        digest.update(f"dict[{len(value)}]".encode())
+        for key in sorted(value):
+            digest.update(repr(key).encode())
+            _fingerprint(value[key], digest)
+    else:
+        digest.update(repr(value).encode())
+
+
+def node_key(render_fn, args, kwargs):
+    """Content hash of a chart: its render function's code, its data and its options."""
+    digest = hashlib.sha256()
+    digest.update(BUILD_VERSION.encode())
+    digest.update(f"{render_fn.__module__}.{render_fn.__qualname__}".encode())
+    digest.update(inspect.getsource(render_fn).encode())
+    _fingerprint(list(args), digest)
+    _fingerprint(kwargs, digest)
+    return digest.hexdigest()
+
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    with atomic_write(path) as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _render_job(job):
+    name, render_fn, args, kwargs = job
+
+    # charts are only ever saved to files, so workers never need a GUI backend
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    start = time.perf_counter()
+    render_fn(*args, **kwargs)
+    return name, time.perf_counter() - start
+
+
+def render_charts(jobs, n_jobs=1, manifest_dir=None, force=False):
+    """
+    Render queued charts, in parallel processes if n_jobs > 1.
+
+    Parameters:
+        jobs (list): Queued charts from collect_charts().
+        n_jobs (int): Number of processes to render in.
+        manifest_dir (str): Directory of the build manifest. Without it every chart is drawn.
+        force (bool): Draw every chart even if it is up to date.
+
+    Returns:
+        list: (name, seconds) for every chart in queue order, seconds is None for charts that were up to date.
+    """
+    manifest_path = os.path.join(manifest_dir, MANIFEST_NAME) if manifest_dir else None
+    manifest = _load_manifest(manifest_path) if manifest_path else {}
+
+    keys = {job[0]: node_key(job[1], job[2], job[3]) for job in jobs}
+    stale = [
+        job
+        for job in jobs
+        if force
+        or manifest_path is None
+        or manifest.get(job[0]) != keys[job[0]]
+        or not os.path.exists(job[0])
+    ]
+
+    if n_jobs <= 1 or len(stale) <= 1:
+        rendered = [_render_job(job) for job in stale]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(stale))) as pool:
+            rendered = list(pool.map(_render_job, stale))
+
+    if manifest_path and stale:
+        manifest.update({name: keys[name] for name, _ in rendered})
+        _save_manifest(manifest_path, manifest)
+
+    seconds = dict(rendered)
+    return [(job[0], seconds.get(job[0])) for job in jobs]
+
+
+def print_render_report(timings, wall_seconds, n_jobs):
+    drawn = sum(seconds is not None for _, seconds in timings)
+    print(
+        f"\nRendered {drawn} of {len(timings)} figures in {wall_seconds:.2f} s with {n_jobs} job(s):"
+    )
+    for name, seconds in timings:
+        if seconds is None:
+            print(f"  up to date  {name}")
+        else:
+            print(f"  {seconds:8.2f} s  {name}")
@@ -0,0 +1,238 @@
+"""
+Out-of-core aggregation for CSVs that do not fit in memory.
+
+The CSV is read in chunks and every chunk is reduced to small partial aggregates
+(count, sum, sum of squared deviations, min and max of every value column per year and per country).
+Partial aggregates are mergeable, so the memory needed only depends on the number of years and countries,
+never on the number of rows. Means, standard deviations and the describe() style tables used by main.py
+are derived from the merged state.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataset import COUNTRY_COLUMN, YEAR_COLUMN
+
+GROUP_KEYS = (YEAR_COLUMN, COUNTRY_COLUMN)
+# m2 is the sum of squared deviations from the group mean. Unlike a raw sum of squares it does not lose
+# all its digits to cancellation when the values are large and the spread is small.
+PARTIAL_STATS = ("count", "sum", "m2", "min", "max")
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _partials(values, keys):
+    grouped = values.groupby(keys, sort=False)
+    return pd.concat(
+        {
+            "count": grouped.count().astype("float64"),
+            "sum": grouped.sum(),
+            "m2": grouped.var(ddof=0) * grouped.count(),
+            "min": grouped.min(),
+            "max": grouped.max(),
+        },
+        axis=1,
+    )
+
+
+def _merge_partials(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    index = left.index.union(right.index)
+    left = left.reindex(index)
+    right = right.reindex(index)
+
+    left_count, right_count = left["count"].fillna(0), right["count"].fillna(0)
+    left_sum, right_sum = left["sum"].fillna(0), right["sum"].fillna(0)
+    count = left_count + right_count
+
+    # Chan et al.: M2 of the union = both M2s + the spread between the two group means
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = right_sum / right_count - left_sum / left_count
+        between = (delta**2 * left_count * right_count / count).fillna(0)
+
+    merged = {
+        "count": count,
+        "sum": left_sum + right_sum,
+        "m2": left["m2"].fillna(0) + right["m2"].fillna(0) + between,
+    }
+    # fmin/fmax ignore the NaN of a group that only one side has seen
+    merged["min"] = pd.DataFrame(
+        np.fmin(left["min"].to_numpy(), right["min"].to_numpy()),
+        index=index,
+        columns=left["min"].columns,
+    )
+    merged["max"] = pd.DataFrame(
+        np.fmax(left["max"].to_numpy(), right["max"].to_numpy()),
+        index=index,
+        columns=left["max"].columns,
+    )
+    return pd.concat(merged, axis=1)
+
+
+def _pooled_m2(partial):
+    # M2 of all groups together: within-group M2 plus the spread of the group means around the overall mean
+    count = partial["count"]
+    overall_mean = partial["sum"].sum() / count.sum()
+    between = (count * (partial["sum"] / count - overall_mean) ** 2).sum()
+    return partial["m2"].sum() + between
+
+
+class StreamingAggregates:
+    """
+    Mergeable per-year and per-country partial aggregates of every value column.
+
+    Parameters:
+        columns (list): All columns of the CSV in file order (kept so positional slices like columns[2:-1] still work).
+    """
+
+    def __init__(self, columns):
+        self.columns = pd.Index(columns)
+        self.value_columns = [col for col in columns if col not in GROUP_KEYS]
+        self.rows = 0
+        self._partials = {key: None for key in GROUP_KEYS}
+
+    @classmethod
+    def from_chunk(cls, chunk):
+        """Reduce one chunk of rows to its partial aggregates."""
+        aggregates = cls(list(chunk.columns))
+        values = chunk[aggregates.value_columns].astype("float64")
+        for key in GROUP_KEYS:
+            aggregates._partials[key] = _partials(values, chunk[key])
+        aggregates.rows = len(chunk)
+        return aggregates
+
+    def update(self, chunk):
+        """Fold a chunk of rows into the aggregates."""
+        self.merge(StreamingAggregates.from_chunk(chunk))
+        return self
+
+    def merge(self, other):
+        """Fold another StreamingAggregates (e.g. from another file or worker) into this one."""
+        if list(other.columns) != list(self.columns):
+            raise ValueError("Cannot merge aggregates of files with different columns")
+        for key in GROUP_KEYS:
+            self._partials[key] = _merge_partials(self._partials[key], other._partials[key])
+        self.rows += other.rows
+        return self
+
+    def to_dict(self):
+        """Plain-JSON representation of the aggregates (see from_dict)."""
+        partials = {}
+        for key, partial in self._partials.items():
+            if partial is None:
+                continue
+            partials[key] = {
+                "index": partial.index.tolist(),
+                "stats": {
+                    stat: partial[stat][self.value_columns].to_numpy().tolist()
+                    for stat in PARTIAL_STATS
+                },
+            }
+        return {"columns": list(self.columns), "rows": self.rows, "partials": partials}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild aggregates from to_dict() output."""
+        aggregates = cls(data["columns"])
+        aggregates.rows = data["rows"]
+        for key, partial in data["partials"].items():
+            aggregates._partials[key] = pd.concat(
+                {
+                    stat: pd.DataFrame(
+                        np.asarray(values, dtype="float64").reshape(-1, len(aggregates.value_columns)),
+                        index=pd.Index(partial["index"], name=key),
+                        columns=aggregates.value_columns,
+                    )
+                    for stat, values in partial["stats"].items()
+                },
+                axis=1,
+            )
+        return aggregates
+
+    def _partial(self, by):
+        if by not in GROUP_KEYS:
+            raise ValueError(f"Aggregates are kept per {GROUP_KEYS}, not per {by!r}")
+        partial = self._partials[by]
+        if partial is None:
+            raise ValueError("No rows have been aggregated yet")
+        return partial.sort_index()
+
+    def _overall(self):
+        # every row has exactly one year, so the per-year partials add up to the whole table
+        partial = self._partial(YEAR_COLUMN)
+        totals = {
+            "count": partial["count"].sum(),
+            "sum": partial["sum"].sum(),
+            "m2": _pooled_m2(partial),
+            "min": partial["min"].min(),
+            "max": partial["max"].max(),
+        }
+        return pd.concat({stat: series.to_frame().T for stat, series in totals.items()}, axis=1)
+
+    @staticmethod
+    def _finalize(partial, stat):
+        count = partial["count"]
+        if stat in ("count", "sum", "min", "max"):
+            return partial[stat]
+        if stat == "mean":
+            return partial["sum"] / count
+        if stat in ("var", "std"):
+            # sample variance (ddof=1) like pandas
+            var = (partial["m2"] / (count - 1)).where(count > 1)
+            return var if stat == "var" else np.sqrt(var)
+        raise ValueError(
+            f"{stat!r} cannot be derived from streaming aggregates, use one of count, sum, mean, std, var, min, max"
+        )
+
+    def stat(self, by, stat):
+        """
+        One statistic per group.
+
+        Parameters:
+            by (str): "year" or "country".
+            stat (str): "count", "sum", "mean", "std", "var", "min" or "max".
+
+        Returns:
+            pd.DataFrame: Groups as index, value columns as columns.
+        """
+        result = self._finalize(self._partial(by), stat)
+        result.index.name = by
+        return result
+
+    def overall(self, stat):
+        """One statistic per value column over all rows, see stat()."""
+        return self._finalize(self._overall(), stat).iloc[0]
+
+    def describe(self, by, column):
+        """
+        Like df.groupby(by)[column].describe(), limited to the statistics that can be merged
+        (count, mean, std, min and max, no quantiles).
+        """
+        return pd.DataFrame(
+            {stat: self.stat(by, stat)[column] for stat in ("count", "mean", "std", "min", "max")}
+        )
+
+
+def aggregate_csv(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Aggregate a CSV with the dataset's columns without ever holding more than one chunk in memory.
+
+    Parameters:
+        filepath (str or Path): Path to the CSV file.
+        chunk_size (int): Number of rows read per chunk.
+
+    Returns:
+        StreamingAggregates: The merged aggregates of the whole file.
+    """
+    aggregates = None
+    for chunk in pd.read_csv(filepath, chunksize=chunk_size):
+        if aggregates is None:
+            aggregates = StreamingAggregates(list(chunk.columns))
+        aggregates.update(chunk)
+    if aggregates is None:
+        raise ValueError(f"{filepath} does not contain any rows")
+    return aggregates
@@ -0,0 +1,63 @@
+"""
+Wall-clock timings of the app's page sections.
+
+The pages wrap their sections in timed(name); the durations of the last runs of every section are kept in memory
+(shared by all sessions of the process) and summary() turns them into a small table, which the Insights page shows
+when it is opened with ?timings=1.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# runs kept per section, older ones are dropped
+KEEP_RUNS = 200
+
+_samples = defaultdict(lambda: deque(maxlen=KEEP_RUNS))
+_lock = threading.Lock()
+
+
+def record(name, seconds):
+    """Add one duration to a section."""
+    with _lock:
+        _samples[name].append(seconds)
+
+
+@contextmanager
+def timed(name):
+    """Record how long the body of the with-block takes under the given section name."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def summary():
+    """
+    Timings of every section recorded so far.
+
+    Returns:
+        pd.DataFrame: One row per section with the number of runs and the last, median and 90th percentile
+        duration in milliseconds.
+    """
+    with _lock:
+        samples = {name: np.array(runs) * 1000 for name, runs in _samples.items()}
+    return pd.DataFrame(
+        {
+            "runs": [len(ms) for ms in samples.values()],
+            "last_ms": [ms[-1] for ms in samples.values()],
+            "p50_ms": [np.percentile(ms, 50) for ms in samples.values()],
+            "p90_ms": [np.percentile(ms, 90) for ms in samples.values()],
+        },
+        index=pd.Index(list(samples), name="section"),
+    )
+
+
+def reset():
+    with _lock:
+        _samples.clear()
@@ -0,0 +1,108 @@
+"""
+Linear trends of many series at once.
+
+np.polyfit fits one series per call. Here every series is a row of one (series × years) matrix and the least-squares
+line of all of them comes out of a few sums over the year axis (closed form, no loop and no matrix solve),
+so fitting every country × category series of the dataset takes a few milliseconds.
+
+Missing years are NaN and are simply left out of their series' fit, like dropping them before calling polyfit.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataset import TOTAL_COLUMN
+
+TREND_COLUMNS = ["slope_per_year", "intercept", "r_squared", "slope_se", "intercept_se", "n_years"]
+
+
+def fit_lines(years, values):
+    """
+    Least-squares line y = intercept + slope * year for every series.
+
+    Parameters:
+        years (array-like): Year of every column, shape (n_years,).
+        values (np.ndarray): Series along the last axis, shape (..., n_years). NaN marks a missing year.
+
+    Returns:
+        dict: TREND_COLUMNS -> array of shape values.shape[:-1]. A series needs 2 years for a slope and 3 for
+        standard errors, otherwise those are NaN. R² is NaN for a flat series.
+    """
+    x = np.asarray(years, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(y)
+    n = present.sum(axis=-1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # center x and y per series, the sums then stay small and the slope stays exact for years around 2000
+        x_mean = np.where(present, x, 0).sum(axis=-1) / n
+        y_mean = np.nansum(y, axis=-1) / n
+        dx = np.where(present, x - x_mean[..., np.newaxis], 0)
+        dy = np.where(present, y - y_mean[..., np.newaxis], 0)
+
+        sxx = (dx * dx).sum(axis=-1)
+        sxy = (dx * dy).sum(axis=-1)
+        syy = (dy * dy).sum(axis=-1)
+
+        slope = np.where((n >= 2) & (sxx > 0), sxy / sxx, np.nan)
+        intercept = y_mean - slope * x_mean
+
+        # residuals from the centered values (syy - slope * sxy loses precision for nearly perfect fits)
+        residuals = dy - slope[..., np.newaxis] * dx
+        sse = (residuals * residuals).sum(axis=-1)
+        r_squared = np.where(syy > 0, 1 - sse / syy, np.nan)
+        variance = np.where(n > 2, sse / (n - 2), np.nan)
+        slope_se = np.sqrt(variance / sxx)
+        intercept_se = np.sqrt(variance * (1 / n + x_mean**2 / sxx))
+
+    return {
+        "slope_per_year": slope,
+        "intercept": intercept,
+        "r_squared": r_squared,
+        "slope_se": slope_se,
+        "intercept_se": intercept_se,
+        "n_years": n,
+    }
+
+
+def fit_columns(frame):
+    """
+    Trend of every column of a year-indexed table, e.g. the yearly sums of all food categories.
+
+    Parameters:
+        frame (pd.DataFrame): Years as index, one series per column.
+
+    Returns:
+        pd.DataFrame: One row per column with TREND_COLUMNS.
+    """
+    fits = fit_lines(frame.index.to_numpy(), frame.to_numpy(dtype=np.float64).T)
+    return pd.DataFrame(fits, index=frame.columns)[TREND_COLUMNS]
+
+
+def country_trends(cube):
+    """
+    Trend of every country × category series of a PanelCube (total_ug_per_kg included, if the cube has it).
+
+    Returns:
+        pd.DataFrame: One row per country and food category with TREND_COLUMNS, in the same long layout as
+        PanelCube.growth().
+    """
+    values = cube.values
+    categories = list(cube.categories)
+    if cube.total is not None:
+        values = np.concatenate([values, cube.total[:, :, np.newaxis]], axis=2)
+        categories.append(TOTAL_COLUMN)
+
+    # (countries, years, categories) -> (countries, categories, years), the years are the fitted axis
+    fits = fit_lines(cube.years.to_numpy(), np.moveaxis(values, 1, -1))
+
+    n_countries, n_categories = len(cube.countries), len(categories)
+    table = pd.DataFrame(
+        {
+            "country": np.repeat(cube.countries.to_numpy(), n_categories),
+            "food_category": np.tile(categories, n_countries),
+        }
+    )
+    for column in TREND_COLUMNS:
+        table[column] = fits[column].ravel()
+    return table
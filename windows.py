@@ -0,0 +1,124 @@
+"""
+Share, rank and growth comparisons of the food categories between any two years.
+
+A YearWindows is built once from the per-year category totals (summed over all countries). It keeps those totals and
+their running sums over the years, so comparing any (start_year, end_year) pair is a lookup of two rows plus a few
+operations per category, however many rows the dataset has. The same running sums give each category's share of a
+whole window of years (e.g. 2000-2010 together) as a difference of two rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dataset import TOTAL_COLUMN
+
+WINDOW_COLUMNS = [
+    "start_share",
+    "end_share",
+    "start_rank",
+    "end_rank",
+    "rank_change",
+    "share_change_percent",
+    "cagr_percent",
+    "window_share",
+]
+
+
+class YearWindows:
+    """
+    Per-year category totals with their running sums.
+
+    Parameters:
+        yearly (pd.DataFrame): Years as index, food categories as columns, each cell the sum over all countries.
+        total (pd.Series): Optional per-year total_ug_per_kg sum used as the denominator of the shares.
+            Without it the shares are relative to the sum of the given categories.
+    """
+
+    def __init__(self, yearly, total=None):
+        yearly = yearly.sort_index()
+        self.years = yearly.index.to_numpy().astype(np.int64)
+        self.categories = pd.Index(yearly.columns)
+        self.totals = yearly.to_numpy(dtype=np.float64)
+        if total is None:
+            denominator = self.totals.sum(axis=1)
+        else:
+            denominator = pd.Series(total).reindex(yearly.index).to_numpy(dtype=np.float64)
+        self.denominator = denominator
+
+        # row i holds the sum of the first i years, so a window [a, b] is cumulative[b + 1] - cumulative[a]
+        self.cumulative = np.vstack([np.zeros((1, len(self.categories))), np.cumsum(self.totals, axis=0)])
+        self.cumulative_denominator = np.concatenate([[0.0], np.cumsum(self.denominator)])
+
+    @classmethod
+    def from_cube(cls, cube):
+        """Build the windows from a PanelCube (sums over its countries, NaN country-years count as 0)."""
+        yearly = pd.DataFrame(
+            np.nansum(cube.values.astype(np.float64), axis=0), index=cube.years, columns=list(cube.categories)
+        )
+        total = None
+        if cube.total is not None:
+            total = pd.Series(np.nansum(cube.total.astype(np.float64), axis=0), index=cube.years, name=TOTAL_COLUMN)
+        return cls(yearly, total)
+
+    def _position(self, year):
+        position = np.searchsorted(self.years, year)
+        if position >= len(self.years) or self.years[position] != year:
+            raise ValueError(f"No data for {year}, the years are {list(self.years)}")
+        return position
+
+    def shares(self, year):
+        """Share (%) of every category in one year's total."""
+        position = self._position(year)
+        return pd.Series(self.totals[position] / self.denominator[position] * 100, index=self.categories)
+
+    def query(self, start_year, end_year):
+        """
+        Compare the categories between two years.
+
+        Parameters:
+            start_year (int): First year of the window (must be a year of the data).
+            end_year (int): Last year of the window (must be a year of the data, after start_year).
+
+        Returns:
+            pd.DataFrame: One row per category with
+                start_share / end_share: share (%) of the yearly total in the start and end year,
+                start_rank / end_rank: rank by share in that year (1 = largest),
+                rank_change: start_rank - end_rank (positive = the category moved up),
+                share_change_percent: relative change of the share (%),
+                cagr_percent: compound annual growth rate of the category total (%),
+                window_share: share (%) of the category in the sum of all years from start to end.
+        """
+        start, end = self._position(start_year), self._position(end_year)
+        if end <= start:
+            raise ValueError(f"end_year ({end_year}) must come after start_year ({start_year})")
+
+        start_share = self.totals[start] / self.denominator[start] * 100
+        end_share = self.totals[end] / self.denominator[end] * 100
+        start_rank = pd.Series(start_share).rank(ascending=False).to_numpy()
+        end_rank = pd.Series(end_share).rank(ascending=False).to_numpy()
+
+        window_totals = self.cumulative[end + 1] - self.cumulative[start]
+        window_denominator = self.cumulative_denominator[end + 1] - self.cumulative_denominator[start]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share_change = (end_share - start_share) / start_share * 100
+            first, last = self.totals[start], self.totals[end]
+            cagr = np.where(
+                first > 0,
+                ((last / first) ** (1 / (end_year - start_year)) - 1) * 100,
+                np.nan,
+            )
+
+        return pd.DataFrame(
+            {
+                "start_share": start_share,
+                "end_share": end_share,
+                "start_rank": start_rank,
+                "end_rank": end_rank,
+                "rank_change": start_rank - end_rank,
+                "share_change_percent": share_change,
+                "cagr_percent": cagr,
+                "window_share": window_totals / window_denominator * 100,
+            },
+            index=self.categories,
+        )